@@ -2,14 +2,25 @@ from __future__ import annotations
 import os
 import re
 import json
+import hashlib
+from collections import OrderedDict
+
 import pygame
 
 from . import config as cfg
+from . import pak
+from .atlas import load_atlas_sprites
+
+
+def _load_surface(path: str) -> pygame.Surface:
+    """画像をデコードする（.pak にあればそこから、無ければ通常のファイルから）"""
+    with pak.open(path) as f:
+        return pygame.image.load(f, os.path.basename(path))
 
 
 def load_image(path: str) -> pygame.Surface:
     """画像を読み込んで convert_alpha して返す"""
-    return pygame.image.load(path).convert_alpha()
+    return _load_surface(path).convert_alpha()
 
 
 def scale_nearest(img: pygame.Surface, scale: int) -> pygame.Surface:
@@ -20,130 +31,152 @@ def scale_nearest(img: pygame.Surface, scale: int) -> pygame.Surface:
 
 def safe_sound(path: str):
     try:
-        if os.path.exists(path):
-            return pygame.mixer.Sound(path)
+        if pak.isfile(path):
+            with pak.open(path) as f:
+                return pygame.mixer.Sound(file=f)
     except Exception:
         pass
     return None
 
 
 
-def load_atlas_sprites(assets_root: str) -> dict[str, pygame.Surface]:
-    """アトラス方式（atlas.png + atlas_map.json）からスプライトを切り出す。
-
-    置き場所（v0.1）:
-      assets/sprite/atlas.png
-      assets/sprite/atlas_map.json
-
-    atlas_map.json の slots には以下のような形式でタイル座標が入る:
-      "body_idle": {"col": 0, "row": 0}
-
-    ここで返す辞書キーは slots のキー名をそのまま使う。
-    """
-    atlas_png = os.path.join(assets_root, "sprite", "atlas.png")
-    atlas_map = os.path.join(assets_root, "sprite", "atlas_map.json")
-    if not (os.path.exists(atlas_png) and os.path.exists(atlas_map)):
-        return {}
+def legacy_img_files() -> dict[str, str]:
+    """状態別の立ち絵（assets/img）: sprite key -> path"""
+    return {
+        "idle":   os.path.join(cfg.IMG_DIR, "girl_idle.png"),
+        "sleep":  os.path.join(cfg.IMG_DIR, "girl_sleep.png"),
+        "music":  os.path.join(cfg.IMG_DIR, "girl_music.png"),
+        "grumpy": os.path.join(cfg.IMG_DIR, "girl_grumpy.png"),
+    }
 
-    try:
-        with open(atlas_map, "r", encoding="utf-8") as f:
-            m = json.load(f)
-        tile_w, tile_h = m.get("tile_size", [64, 64])
-        slots = m.get("slots", {})
-        atlas = load_image(atlas_png)
-    except Exception:
-        return {}
 
-    out: dict[str, pygame.Surface] = {}
-    for name, pos in slots.items():
-        try:
-            col = int(pos.get("col"))
-            row = int(pos.get("row"))
-            rect = pygame.Rect(col * tile_w, row * tile_h, tile_w, tile_h)
-            surf = pygame.Surface((tile_w, tile_h), pygame.SRCALPHA)
-            surf.blit(atlas, (0, 0), rect)
-            out[name] = surf
-        except Exception:
-            continue
-    return out
+def split_sprite_files() -> dict[str, str]:
+    """assets/sprite の分割PNG（存在するものだけ）: sprite key -> path
 
-def load_sprites(scale: int = 3) -> dict[str, pygame.Surface]:
-    """
-    既存：状態別の立ち絵（idle/sleep/music/grumpy）
-    追加：瞬き/口パク用の body/face（存在しなければロードしない）
-    追加：表情差分 face_{normal/smile/trouble}（存在しなければロードしない）
+    ここに載るキーは atlas の同名スロットより優先される。
+    load_sprites とホットリロード（hotreload.py）の両方がこの対応表を使う。
     """
-    sprites_raw: dict[str, pygame.Surface] = {
-        "idle":   load_image(os.path.join(cfg.IMG_DIR, "girl_idle.png")),
-        "sleep":  load_image(os.path.join(cfg.IMG_DIR, "girl_sleep.png")),
-        "music":  load_image(os.path.join(cfg.IMG_DIR, "girl_music.png")),
-        "grumpy": load_image(os.path.join(cfg.IMG_DIR, "girl_grumpy.png")),
-    }
-
     # assets_root は assets/img の1つ上（= assets）
     assets_root = os.path.dirname(cfg.IMG_DIR)
-
-    # ---- atlas (optional) ----
-    # atlas があればまず切り出して埋める（不足分は従来の分割PNGで補完する）
-    atlas_sprites_raw = load_atlas_sprites(assets_root)
-    sprites_raw.update(atlas_sprites_raw)
+    sprite_dir = os.path.join(assets_root, "sprite")
+    out: dict[str, str] = {}
 
     # ---- body ----
-    body_path = os.path.join(assets_root, "sprite", "body_idle.png")
-    if os.path.exists(body_path):
-        sprites_raw["body_idle"] = load_image(body_path)
+    body_path = os.path.join(sprite_dir, "body_idle.png")
+    if pak.isfile(body_path):
+        out["body_idle"] = body_path
 
     # ---- body walk frames (optional) ----
     # Put files like assets/sprite/body_walk_0.png, body_walk_1.png ...
     walk_re = re.compile(r"^body_walk_(\d+)\.png$", re.IGNORECASE)
-    sprite_dir = os.path.join(assets_root, "sprite")
-    if os.path.isdir(sprite_dir):
+    if pak.isdir(sprite_dir):
         walk_files = []
-        for fn in os.listdir(sprite_dir):
+        for fn in pak.listdir(sprite_dir):
             m2 = walk_re.match(fn)
             if m2:
                 walk_files.append((int(m2.group(1)), fn))
         for idx, fn in sorted(walk_files, key=lambda t: t[0]):
-            p = os.path.join(sprite_dir, fn)
-            try:
-                sprites_raw[f"body_walk_{idx}"] = load_image(p)
-            except Exception:
-                pass
+            out[f"body_walk_{idx}"] = os.path.join(sprite_dir, fn)
 
     # ---- face base expressions ----
     for name in ("normal", "smile", "trouble"):
-        p = os.path.join(assets_root, "sprite", "face", f"{name}.png")
-        if os.path.exists(p):
-            sprites_raw[f"face_{name}"] = load_image(p)
-
+        p = os.path.join(sprite_dir, "face", f"{name}.png")
+        if pak.isfile(p):
+            out[f"face_{name}"] = p
 
     # ---- clothes ----
-    clothes_dir = os.path.join(assets_root, "sprite", "clothes")
-    if os.path.isdir(clothes_dir):
-        for fn in os.listdir(clothes_dir):
+    clothes_dir = os.path.join(sprite_dir, "clothes")
+    if pak.isdir(clothes_dir):
+        for fn in pak.listdir(clothes_dir):
             if not fn.lower().endswith(".png"):
                 continue
             oid = os.path.splitext(fn)[0]
-            try:
-                sprites_raw[f"clothes_{oid}"] = load_image(os.path.join(clothes_dir, fn))
-            except Exception:
-                pass
+            out[f"clothes_{oid}"] = os.path.join(clothes_dir, fn)
 
     # ---- overlays ----
-    blink_p = os.path.join(assets_root, "sprite", "face", "blink.png")
-    mouth_p = os.path.join(assets_root, "sprite", "face", "mouth.png")
-    if os.path.exists(blink_p):
-        sprites_raw["face_blink"] = load_image(blink_p)
-    if os.path.exists(mouth_p):
-        sprites_raw["face_mouth"] = load_image(mouth_p)
+    blink_p = os.path.join(sprite_dir, "face", "blink.png")
+    mouth_p = os.path.join(sprite_dir, "face", "mouth.png")
+    if pak.isfile(blink_p):
+        out["face_blink"] = blink_p
+    if pak.isfile(mouth_p):
+        out["face_mouth"] = mouth_p
+    return out
 
-    return {k: scale_nearest(v, scale) for k, v in sprites_raw.items()}
 
+def load_sprites(scale: int = 3, stats: dict | None = None) -> dict[str, pygame.Surface]:
+    """
+    既存：状態別の立ち絵（idle/sleep/music/grumpy）
+    追加：瞬き/口パク用の body/face（存在しなければロードしない）
+    追加：表情差分 face_{normal/smile/trouble}（存在しなければロードしない）
+
+    デコード前にキーごとの読み込み元を1つに決める（分割PNG > atlas スロット）。
+    分割PNGで埋まるスロットは atlas から切り出さない。
+    stats を渡すと、スキップした atlas スロット数や共有で節約したバイト数を書き込む。
+    """
+    sprites_raw: dict[str, pygame.Surface] = {
+        k: load_image(p) for k, p in legacy_img_files().items()
+    }
+
+    # assets_root は assets/img の1つ上（= assets）
+    assets_root = os.path.dirname(cfg.IMG_DIR)
+
+    # ---- resolve sources: split PNGs win over atlas slots ----
+    split_files = split_sprite_files()
 
-def load_clothes_offsets(scale: int = 3) -> dict[str, tuple[int, int]]:
+    # ---- atlas (optional) ----
+    # 分割PNGが無いスロットだけ切り出す
+    atlas_sprites_raw = load_atlas_sprites(assets_root, skip=split_files.keys(), stats=stats)
+    sprites_raw.update(atlas_sprites_raw)
+
+    # ---- split PNGs (body / walk / face / clothes / overlays) ----
+    for k, p in split_files.items():
+        try:
+            sprites_raw[k] = load_image(p)
+        except Exception:
+            pass
+
+    return scale_unique(sprites_raw, scale, stats)
+
+
+def _pixel_hash(surf: pygame.Surface) -> bytes:
+    tobytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(surf.get_size()).encode("ascii"))
+    h.update(tobytes(surf, "RGBA"))
+    return h.digest()
+
+
+def scale_unique(sprites_raw: dict[str, pygame.Surface], scale: int, stats: dict | None = None) -> dict[str, pygame.Surface]:
+    """ニアレストで拡大しつつ、ピクセル内容が同じ画像は 1 枚の Surface を共有する。
+
+    （空の予約スロットや、atlas と同じ絵の別キーなど）
+    stats: unique / shared / bytes_saved を書き込む。
+    """
+    by_hash: dict[bytes, pygame.Surface] = {}
+    out: dict[str, pygame.Surface] = {}
+    shared = 0
+    saved = 0
+    for k, v in sprites_raw.items():
+        h = _pixel_hash(v)
+        surf = by_hash.get(h)
+        if surf is None:
+            surf = scale_nearest(v, scale)
+            by_hash[h] = surf
+        else:
+            shared += 1
+            saved += _surface_bytes(surf)
+        out[k] = surf
+    if stats is not None:
+        stats["unique"] = len(by_hash)
+        stats["shared"] = shared
+        stats["bytes_saved"] = saved
+    return out
+
+
+def load_clothes_offsets(scale: int = 3, path: str | None = None) -> dict[str, tuple[int, int]]:
     """衣装(clothes_*)の描画オフセットをJSONから読む。
 
-    置き場所: assets/sprite/clothes/offsets.json
+    置き場所: assets/sprite/clothes/offsets.json（path で別の場所も指定できる）
 
     形式(どちらでもOK):
       {"normal": [0, 0], "alt": [1, -2]}
@@ -151,14 +184,15 @@ def load_clothes_offsets(scale: int = 3) -> dict[str, tuple[int, int]]:
 
     数値は「元画像(スケール前)のピクセル」を想定し、ここで scale 倍する。
     """
-    # assets_root は assets/img の1つ上（= assets）
-    assets_root = os.path.dirname(cfg.IMG_DIR)
-    path = os.path.join(assets_root, "sprite", "clothes", "offsets.json")
-    if not os.path.exists(path):
+    if path is None:
+        # assets_root は assets/img の1つ上（= assets）
+        assets_root = os.path.dirname(cfg.IMG_DIR)
+        path = os.path.join(assets_root, "sprite", "clothes", "offsets.json")
+    if not pak.isfile(path):
         return {}
 
     try:
-        with open(path, "r", encoding="utf-8") as f:
+        with pak.open(path, "r") as f:
             raw = json.load(f)
     except Exception:
         return {}
@@ -181,22 +215,6 @@ def load_clothes_offsets(scale: int = 3) -> dict[str, tuple[int, int]]:
     return out
 
 
-def load_sounds(mixer_ok: bool) -> dict[str, object]:
-    if not mixer_ok:
-        return {}
-    sounds = {
-        "snack": safe_sound(os.path.join(cfg.SFX_DIR, "se_snack.wav")),
-        "pet":   safe_sound(os.path.join(cfg.SFX_DIR, "se_pet.wav")),
-        "off":   safe_sound(os.path.join(cfg.SFX_DIR, "se_lights_off.wav")),
-        "on":    safe_sound(os.path.join(cfg.SFX_DIR, "se_lights_on.wav")),
-        "talk":  safe_sound(os.path.join(cfg.SFX_DIR, "se_talk.wav")),
-    }
-    for k, v in sounds.items():
-        if v:
-            v.set_volume(0.30 if k in ("pet", "talk") else 0.35)
-    return sounds
-
-
 def list_background_image_ids() -> list[str]:
     """assets/background 内の画像ファイルを自動検出して id(拡張子なし) を返す。
 
@@ -204,12 +222,12 @@ def list_background_image_ids() -> list[str]:
     """
     assets_root = os.path.dirname(cfg.IMG_DIR)
     bg_dir = os.path.join(assets_root, "background")
-    if not os.path.isdir(bg_dir):
+    if not pak.isdir(bg_dir):
         return []
 
     exts = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
     ids: list[str] = []
-    for fn in os.listdir(bg_dir):
+    for fn in pak.listdir(bg_dir):
         ext = os.path.splitext(fn)[1].lower()
         if ext in exts:
             ids.append(os.path.splitext(fn)[0])
@@ -221,51 +239,195 @@ def list_background_image_ids() -> list[str]:
     return ids
 
 
-def load_background_images(scale: int = 1, thumb_size: tuple[int, int] = (40, 40)) -> tuple[dict[str, pygame.Surface], dict[str, pygame.Surface]]:
-    """背景画像を読み込み、(images, thumbs) を返す。
+def _find_background_path(bg_dir: str, bid: str) -> str | None:
+    for ext in (".png", ".jpg", ".jpeg", ".webp", ".bmp"):
+        p = os.path.join(bg_dir, bid + ext)
+        if pak.isfile(p):
+            return p
+    return None
 
-    - images: id -> pygame.Surface (convert)
-    - thumbs: id -> pygame.Surface (smoothscale)
 
-    ※ 背景は基本「写真/イラスト」想定なので smoothscale を使う。
-    """
-    assets_root = os.path.dirname(cfg.IMG_DIR)
-    bg_dir = os.path.join(assets_root, "background")
-    if not os.path.isdir(bg_dir):
-        return {}, {}
+def _cover_crop(img: pygame.Surface, size: tuple[int, int]) -> pygame.Surface:
+    """画像をウィンドウ全体を覆うサイズ（cover）に縮小し、中央で切り抜く。"""
+    sw, sh = size
+    iw, ih = img.get_size()
+    if iw <= 0 or ih <= 0:
+        return pygame.Surface((sw, sh))
+    s = max(sw / iw, sh / ih)
+    nw = max(sw, int(round(iw * s)))
+    nh = max(sh, int(round(ih * s)))
+    if (nw, nh) != (iw, ih):
+        img = pygame.transform.smoothscale(img, (nw, nh))
+    out = pygame.Surface((sw, sh))
+    out.blit(img, (0, 0), pygame.Rect((nw - sw) // 2, (nh - sh) // 2, sw, sh))
+    return out
 
-    exts = [".png", ".jpg", ".jpeg", ".webp", ".bmp"]
 
-    images: dict[str, pygame.Surface] = {}
-    thumbs: dict[str, pygame.Surface] = {}
+class BackgroundCache:
+    """assets/background の背景画像を遅延ロードする。
 
-    for bid in list_background_image_ids():
-        path = None
-        for ext in exts:
-            p = os.path.join(bg_dir, bid + ext)
-            if os.path.exists(p):
-                path = p
-                break
-        if not path:
-            continue
-        try:
-            img = pygame.image.load(path).convert()  # 背景はα無しでOK
-            if scale and scale != 1:
-                w, h = img.get_size()
-                img = pygame.transform.smoothscale(img, (max(1, int(w * scale)), max(1, int(h * scale))))
-            images[bid] = img
+    - 起動時はサムネだけ作る（元画像はサムネ生成後すぐ捨てる）
+    - フル画像は選択されたときに読み込み、その場でウィンドウの cover サイズへ縮小
+    - 縮小済み画像は小さな LRU に入れ、合計バイト数が budget を超えたら古い順に捨てる
 
-            tw, th = thumb_size
+    高解像度の壁紙を大量に置いても、常駐メモリは budget 程度に収まる。
+    """
+
+    def __init__(
+        self,
+        cover_size: tuple[int, int] = (cfg.W, cfg.H),
+        thumb_size: tuple[int, int] = (40, 40),
+        budget_bytes: int = cfg.BG_CACHE_BUDGET_BYTES,
+    ):
+        assets_root = os.path.dirname(cfg.IMG_DIR)
+        self.bg_dir = os.path.join(assets_root, "background")
+        self.cover_size = (int(cover_size[0]), int(cover_size[1]))
+        self.thumb_size = thumb_size
+        self.budget_bytes = int(budget_bytes)
+        self.paths: dict[str, str] = {}
+        self.thumbs: dict[str, pygame.Surface] = {}
+        # id -> (path, mtime) last processed, also when decoding failed, so a
+        # broken file is not retried on every reload_changed() poll
+        self.sources: dict[str, tuple[str, float]] = {}
+        self._lru: OrderedDict[str, pygame.Surface] = OrderedDict()
+        self._bytes = 0
+
+    def ids(self) -> list[str]:
+        return list(self.paths.keys())
+
+    def scan(self) -> list[str]:
+        """背景 id とパスだけ列挙する（デコードしない）。
+
+        起動直後の1フレーム目用。選択中の背景は get() で読めるが、サムネは
+        load_thumbs() まで空のまま。
+        """
+        if pak.isdir(self.bg_dir):
+            for bid in list_background_image_ids():
+                path = _find_background_path(self.bg_dir, bid)
+                if path:
+                    self.paths.setdefault(bid, path)
+        return self.ids()
+
+    def load_thumbs(self) -> dict[str, pygame.Surface]:
+        """背景 id を列挙してサムネを作る。戻り値: id -> サムネ Surface
+
+        LRU はそのまま残す（1フレーム目に get() で読んだ背景を二重にデコードしない）。
+        """
+        self.paths = {}
+        self.thumbs = {}
+        self.sources = {}
+        if not pak.isdir(self.bg_dir):
+            self.clear()
+            return self.thumbs
+
+        for bid in list_background_image_ids():
+            path = _find_background_path(self.bg_dir, bid)
+            if path:
+                self._load_thumb(bid, path)
+        # 消えた背景の LRU エントリだけ捨てる
+        for bid in [b for b in self._lru if b not in self.paths]:
+            self._bytes -= _surface_bytes(self._lru.pop(bid))
+        return self.thumbs
+
+    def _load_thumb(self, bid: str, path: str):
+        tw, th = self.thumb_size
+        try:
+            self.sources[bid] = (path, pak.getmtime(path))
+            img = _load_surface(path)
             w0, h0 = img.get_size()
             if w0 > 0 and h0 > 0:
                 s = min(tw / w0, th / h0)
                 nw = max(1, int(w0 * s))
                 nh = max(1, int(h0 * s))
-                thumbs[bid] = pygame.transform.smoothscale(img, (nw, nh))
+                self.thumbs[bid] = pygame.transform.smoothscale(img.convert(), (nw, nh))
+            self.paths[bid] = path
         except Exception:
             pass
+        # フル解像度の img はここで参照が切れて解放される
+
+    def reload_changed(self) -> set[str]:
+        """追加・削除・更新された背景だけ反映する（ホットリロード用）。
+
+        更新された id は LRU から捨ててサムネを作り直す。戻り値: 変化した id
+        """
+        if not pak.isdir(self.bg_dir):
+            return set()
+        current: dict[str, str] = {}
+        for bid in list_background_image_ids():
+            path = _find_background_path(self.bg_dir, bid)
+            if path:
+                current[bid] = path
+
+        changed: set[str] = set()
+        for bid in list(self.sources.keys()):
+            if bid not in current:
+                changed.add(bid)
+                self._drop(bid)
+        for bid, path in current.items():
+            try:
+                m = pak.getmtime(path)
+            except Exception:
+                continue
+            if self.sources.get(bid) == (path, m):
+                continue
+            changed.add(bid)
+            self._drop(bid)
+            self._load_thumb(bid, path)
+
+        if changed:
+            # keep list_background_image_ids() order ("default" first)
+            self.paths = {bid: self.paths[bid] for bid in current if bid in self.paths}
+        return changed
+
+    def _drop(self, bid: str):
+        self.paths.pop(bid, None)
+        self.thumbs.pop(bid, None)
+        self.sources.pop(bid, None)
+        old = self._lru.pop(bid, None)
+        if old is not None:
+            self._bytes -= _surface_bytes(old)
+
+    def get(self, bid: str) -> pygame.Surface | None:
+        """cover サイズに縮小済みの背景を返す（未ロードならここでデコード）。"""
+        surf = self._lru.get(bid)
+        if surf is not None:
+            self._lru.move_to_end(bid)
+            return surf
+
+        path = self.paths.get(bid)
+        if not path:
+            return None
+        try:
+            img = _load_surface(path).convert()  # 背景はα無しでOK
+            surf = _cover_crop(img, self.cover_size)
+        except Exception:
+            # 壊れた画像は以後スキップ（sources は残すので、ファイルが更新されるまで再読込しない）
+            self.paths.pop(bid, None)
+            try:
+                self.sources[bid] = (path, pak.getmtime(path))
+            except Exception:
+                pass
+            return None
+
+        self._lru[bid] = surf
+        self._bytes += _surface_bytes(surf)
+        # 直近の1枚は必ず残す（budget が極端に小さくても表示は維持する）
+        while self._bytes > self.budget_bytes and len(self._lru) > 1:
+            _, old = self._lru.popitem(last=False)
+            self._bytes -= _surface_bytes(old)
+        return surf
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self._bytes = 0
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._bytes
+
 
-    return images, thumbs
+def _surface_bytes(surf: pygame.Surface) -> int:
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
 
 
 def make_theme_thumbs(thumb_size: tuple[int, int] = (40, 40)) -> dict[str, pygame.Surface]:
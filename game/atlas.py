@@ -10,24 +10,50 @@ import json
 import os
 import pygame
 
+from . import pak
 from .image_utils import load_image
 
 
-def load_atlas_sprites(assets_root: str) -> dict[str, pygame.Surface]:
+def load_atlas_sprites(assets_root: str, skip=None, stats: dict | None = None) -> dict[str, pygame.Surface]:
     """Load sprites from assets/sprite/atlas.png + atlas_map.json.
 
     Returns: slot_name -> Surface (tile_size).
     """
-    atlas_png = os.path.join(assets_root, "sprite", "atlas.png")
-    atlas_map = os.path.join(assets_root, "sprite", "atlas_map.json")
-    if not (os.path.exists(atlas_png) and os.path.exists(atlas_map)):
+    return load_atlas_dir(os.path.join(assets_root, "sprite"), skip=skip, stats=stats)
+
+
+def load_atlas_dir(atlas_dir: str, skip=None, stats: dict | None = None) -> dict[str, pygame.Surface]:
+    """Load sprites from <atlas_dir>/atlas.png + atlas_map.json.
+
+    Used both for assets/sprite and for character packs
+    (assets/characters/<id>/ with asset_spec "atlas_v0.1").
+
+    skip: slot names provided by another source. They are not sliced, and
+    atlas.png is not decoded at all when every slot is skipped.
+    stats: if given, "atlas_slots_skipped" is set to the number of map slots
+    that `skip` actually overrode.
+
+    Returns: slot_name -> Surface (tile_size).
+    """
+    if stats is not None:
+        stats["atlas_slots_skipped"] = 0
+    atlas_png = os.path.join(atlas_dir, "atlas.png")
+    atlas_map = os.path.join(atlas_dir, "atlas_map.json")
+    if not (pak.isfile(atlas_png) and pak.isfile(atlas_map)):
         return {}
 
     try:
-        with open(atlas_map, "r", encoding="utf-8") as f:
+        with pak.open(atlas_map, "r") as f:
             m = json.load(f)
         tile_w, tile_h = m.get("tile_size", [64, 64])
         slots = m.get("slots", {})
+        if skip:
+            kept = {k: v for k, v in slots.items() if k not in skip}
+            if stats is not None:
+                stats["atlas_slots_skipped"] = len(slots) - len(kept)
+            slots = kept
+        if not slots:
+            return {}
         atlas = load_image(atlas_png)
     except Exception:
         return {}
@@ -0,0 +1,161 @@
+"""audio.py
+Channel-pooled SFX engine.
+
+- Each category (voice / ui / ambient) owns reserved mixer channels, so a
+  burst of UI clicks can never cut off her voice and vice versa.
+- Sounds are decoded lazily on first play (startup only records paths).
+- Volumes (cfg.SFX_BASE_VOLUME x sfx_scale) are recomputed only when
+  sfx_scale or sfx_muted actually changes, not on every trigger.
+- Rapid re-triggers of the same key inside cfg.SFX_MIN_INTERVAL_SEC are
+  dropped; when a category has no free channel, the oldest voice in that
+  category is stolen (Channel.play replaces it, no explicit stop()).
+- stats() returns play / drop / steal counts, active voices and the
+  main-thread cost of play() calls (latency).
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import pygame
+
+from . import config as cfg
+from .assets import safe_sound
+
+
+SFX_FILES = {
+    "snack": "se_snack.wav",
+    "pet":   "se_pet.wav",
+    "off":   "se_lights_off.wav",
+    "on":    "se_lights_on.wav",
+    "talk":  "se_talk.wav",
+}
+
+
+class AudioEngine:
+    def __init__(self, mixer_ok: bool, sfx_dir: str = cfg.SFX_DIR):
+        self.enabled = bool(mixer_ok)
+        self.paths = {k: os.path.join(sfx_dir, fn) for k, fn in SFX_FILES.items()}
+        # key -> Sound (None = missing / failed, don't retry)
+        self.sounds: dict[str, pygame.mixer.Sound | None] = {}
+        # registered (generated) sounds: key -> base volume key / category
+        self.base_keys: dict[str, str] = {}
+        self.categories: dict[str, str] = {}
+        self.scale = 1.0
+        self.muted = False
+
+        # category -> [(channel, started_at)]
+        self.pools: dict[str, list[list]] = {}
+        self.last_play_at: dict[str, float] = {}
+
+        self.plays = 0
+        self.dropped = 0
+        self.steals = 0
+        self.decode_ms = 0.0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+        if self.enabled:
+            self._reserve_channels()
+
+    def _reserve_channels(self):
+        total = sum(int(n) for n in cfg.AUDIO_CHANNELS.values())
+        try:
+            if pygame.mixer.get_num_channels() < total:
+                pygame.mixer.set_num_channels(total)
+            pygame.mixer.set_reserved(total)
+            i = 0
+            for cat, n in cfg.AUDIO_CHANNELS.items():
+                self.pools[cat] = [[pygame.mixer.Channel(i + j), 0.0] for j in range(int(n))]
+                i += int(n)
+        except Exception:
+            self.enabled = False
+
+    # ---- volume ----
+    def set_volume(self, scale: float, muted: bool):
+        """Apply sfx_scale / sfx_muted. No-op unless something changed."""
+        scale = max(0.0, min(1.0, float(scale)))
+        muted = bool(muted)
+        if scale == self.scale and muted == self.muted:
+            return
+        self.scale = scale
+        self.muted = muted
+        for key, snd in self.sounds.items():
+            if snd is not None:
+                snd.set_volume(self._volume(key))
+
+    def _volume(self, key: str) -> float:
+        return cfg.SFX_BASE_VOLUME.get(self.base_keys.get(key, key), 0.3) * self.scale
+
+    def register(self, key: str, snd: pygame.mixer.Sound, base_key: str = "talk", category: str = "voice"):
+        """Add a generated Sound (e.g. voice blips) under the same volume/channel rules."""
+        self.base_keys[key] = base_key
+        self.categories[key] = category
+        snd.set_volume(self._volume(key))
+        self.sounds[key] = snd
+
+    # ---- decode ----
+    def _get(self, key: str) -> pygame.mixer.Sound | None:
+        if key in self.sounds:
+            return self.sounds[key]
+        t0 = time.perf_counter()
+        path = self.paths.get(key)
+        snd = safe_sound(path) if path else None
+        if snd is not None:
+            snd.set_volume(self._volume(key))
+        self.sounds[key] = snd
+        self.decode_ms += (time.perf_counter() - t0) * 1000.0
+        return snd
+
+    # ---- playback ----
+    def play(self, key: str, now: float | None = None, rate_limit: bool = True) -> bool:
+        """Trigger a sound. Returns True if it actually started.
+
+        rate_limit=False is for callers that already pace their triggers
+        (voice blips are scheduled per syllable).
+        """
+        if not self.enabled or self.muted:
+            return False
+        t0 = time.perf_counter()
+        if now is None:
+            now = time.time()
+
+        last = self.last_play_at.get(key, 0.0)
+        if rate_limit and now - last < float(cfg.SFX_MIN_INTERVAL_SEC):
+            self.dropped += 1
+            return False
+
+        snd = self._get(key)
+        pool = self.pools.get(self.categories.get(key) or cfg.SFX_CATEGORY.get(key, "ui"))
+        if snd is None or not pool:
+            return False
+
+        slot = next((s for s in pool if not s[0].get_busy()), None)
+        if slot is None:
+            # voice stealing: reuse the channel that started longest ago
+            slot = min(pool, key=lambda s: s[1])
+            self.steals += 1
+        slot[0].play(snd)
+        slot[1] = now
+        self.last_play_at[key] = now
+        self.plays += 1
+
+        self.last_latency_ms = (time.perf_counter() - t0) * 1000.0
+        self.max_latency_ms = max(self.max_latency_ms, self.last_latency_ms)
+        return True
+
+    def active_voices(self) -> int:
+        return sum(1 for pool in self.pools.values() for s in pool if s[0].get_busy())
+
+    def stats(self) -> dict:
+        return {
+            "voices": self.active_voices(),
+            "channels": sum(len(p) for p in self.pools.values()),
+            "plays": self.plays,
+            "dropped": self.dropped,
+            "steals": self.steals,
+            "decoded": sum(1 for s in self.sounds.values() if s is not None),
+            "decode_ms": self.decode_ms,
+            "latency_ms": self.last_latency_ms,
+            "max_latency_ms": self.max_latency_ms,
+        }
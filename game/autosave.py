@@ -0,0 +1,180 @@
+"""autosave.py
+Background save worker.
+
+The main loop used to call model.save(g) (json.dump straight over
+save.json) on the main thread every 5 seconds and after most clicks.
+AutoSaver moves the disk work off the frame:
+
+- request(g) only takes a snapshot (model.save_dict, a deep copy) on the
+  main thread and hands it to the worker. Requests arriving while the worker
+  is busy are coalesced: only the newest snapshot is written.
+- The worker splits the snapshot into shards (model.split_save: hot meters /
+  timers / position, cold settings / progress), serializes each one and
+  writes only the shards whose bytes changed since the last write (dirty
+  tracking without hooks in the model). A periodic autosave therefore
+  rewrites save.hot.json (a few hundred bytes) and nothing else.
+- The manifest (save.json) is written once, after all shards exist, so an
+  old single-file save stays readable until the split is complete.
+- Writes go through model.write_atomic (temp file + fsync + rename).
+- stats() reports the main-thread request cost, the worker write latency
+  and the bytes written by the last save.
+
+request_file(path, data) queues other small files (history.bin) on the
+same worker, coalesced per path.
+
+flush() / close() wait for the pending snapshot (used when quitting).
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+
+from . import config as cfg
+from .model import HOT_SHARD, dumps_save, manifest_for, save_dict, shard_path, split_save, write_atomic
+
+
+def _file_digest(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).digest()
+    except OSError:
+        return None
+
+
+class AutoSaver:
+    def __init__(self, path: str = cfg.SAVE_PATH):
+        self.path = path
+        self._cv = threading.Condition()
+        self._pending: dict | None = None
+        self._files: dict[str, bytes] = {}
+        self._busy = False
+        self._closed = False
+        # shard name (or "manifest") -> digest of the bytes last written
+        self._digests: dict[str, bytes] = {}
+
+        self.requests = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error = ""
+        self.request_ms = 0.0
+        self.write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.last_bytes = 0
+        self.shard_writes: dict[str, int] = {}
+
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    # ---- main thread ----
+    def request(self, g):
+        """Queue a save of the current state. Never touches the disk."""
+        t0 = time.perf_counter()
+        snap = save_dict(g)
+        with self._cv:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = snap
+            self.requests += 1
+            self._cv.notify()
+        self.request_ms = (time.perf_counter() - t0) * 1000.0
+
+    def request_file(self, path: str, data: bytes):
+        """Queue an atomic write of ready-made bytes (newest data per path wins)."""
+        with self._cv:
+            self._files[path] = data
+            self._cv.notify()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until everything requested so far is on disk."""
+        end = time.monotonic() + timeout
+        with self._cv:
+            while self._pending is not None or self._files or self._busy:
+                left = end - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cv.wait(left)
+        return True
+
+    def close(self, timeout: float = 2.0):
+        self.flush(timeout)
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join(timeout)
+
+    # ---- worker ----
+    def _run(self):
+        while True:
+            with self._cv:
+                while self._pending is None and not self._files and not self._closed:
+                    self._cv.wait()
+                if self._pending is None and not self._files and self._closed:
+                    return
+                snap, self._pending = self._pending, None
+                files, self._files = self._files, {}
+                self._busy = True
+            try:
+                if snap is not None:
+                    self._write(snap)
+                for path, data in files.items():
+                    self._write_file(path, data)
+            finally:
+                with self._cv:
+                    self._busy = False
+                    self._cv.notify_all()
+
+    def _write(self, snap: dict):
+        t0 = time.perf_counter()
+        files = [
+            (name, shard_path(self.path, name), dumps_save(part, compact=(name == HOT_SHARD)))
+            for name, part in split_save(snap).items()
+        ]
+        files.append(("manifest", self.path, dumps_save(manifest_for(self.path))))
+        written = 0
+        try:
+            for name, path, data in files:
+                digest = hashlib.blake2b(data, digest_size=16).digest()
+                if name not in self._digests:
+                    # first save this run: compare with what is already on disk
+                    self._digests[name] = _file_digest(path)
+                if digest == self._digests[name]:
+                    continue
+                write_atomic(path, data)
+                self._digests[name] = digest
+                self.shard_writes[name] = self.shard_writes.get(name, 0) + 1
+                written += len(data)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            return
+        if not written:
+            self.skipped += 1
+            return
+        self.writes += 1
+        self.last_bytes = written
+        self.write_ms = (time.perf_counter() - t0) * 1000.0
+        self.max_write_ms = max(self.max_write_ms, self.write_ms)
+
+    def _write_file(self, path: str, data: bytes):
+        try:
+            write_atomic(path, data)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "request_ms": self.request_ms,
+            "write_ms": self.write_ms,
+            "max_write_ms": self.max_write_ms,
+            "last_bytes": self.last_bytes,
+            "shard_writes": dict(self.shard_writes),
+        }
@@ -0,0 +1,158 @@
+"""bgm.py
+Ambient music layer for the "music" state.
+
+- Tracks are read from assets/bgm/ (or the mounted .pak) and streamed with
+  pygame.mixer.music, so only a small decode buffer is resident no matter
+  how long the track is. Nothing here creates a Sound object.
+- Starts when she enters the "music" state, keeps going for
+  cfg.BGM_LINGER_SEC afterwards (the state itself only lasts a few
+  seconds), and stops while she sleeps or sound is muted.
+- Volume = cfg.BGM_BASE_VOLUME x sfx_scale (x cfg.BGM_LIGHTS_OFF_SCALE with
+  the lights off). Changes are ramped over cfg.BGM_FADE_SEC.
+- pygame.mixer.music is a single stream, so a track change is a fade-out
+  followed by a fade-in of the next track (not an overlapping mix).
+- Stopping fades out and then pauses, so the next music state resumes the
+  same track where it left off.
+"""
+from __future__ import annotations
+
+import os
+
+import pygame
+
+from . import config as cfg
+from . import pak
+
+
+def list_tracks(bgm_dir: str = cfg.BGM_DIR) -> list[str]:
+    if not pak.isdir(bgm_dir):
+        return []
+    exts = tuple(e.lower() for e in cfg.BGM_EXTS)
+    return [os.path.join(bgm_dir, fn) for fn in sorted(pak.listdir(bgm_dir)) if fn.lower().endswith(exts)]
+
+
+class AmbientMusic:
+    def __init__(self, mixer_ok: bool, bgm_dir: str = cfg.BGM_DIR):
+        self.bgm_dir = bgm_dir
+        self.tracks = list_tracks(bgm_dir)
+        self.enabled = bool(mixer_ok) and bool(self.tracks)
+
+        self.index = -1
+        self._src = None           # file object kept alive while streaming
+        self.loaded = False
+        self.playing = False       # unpaused (may be fading)
+        self.started_at = 0.0
+        self.switching = False     # fading out before the next track
+        self.want_until = 0.0      # linger deadline
+
+        self.volume = 0.0          # volume currently applied to the stream
+        self._applied = -1.0
+
+    # ---- stream control ----
+    def _load_next(self, now: float) -> bool:
+        if not self.tracks:
+            return False
+        for _ in range(len(self.tracks)):
+            self.index = (self.index + 1) % len(self.tracks)
+            path = self.tracks[self.index]
+            old = self._src
+            try:
+                self._src = pak.open(path, "rb")
+                pygame.mixer.music.load(self._src, os.path.basename(path))
+            except Exception:
+                self._src = old
+                continue
+            if old is not None:
+                try:
+                    old.close()
+                except Exception:
+                    pass
+            self._apply(0.0)
+            self.volume = 0.0
+            pygame.mixer.music.play()
+            self.loaded = True
+            self.playing = True
+            self.started_at = now
+            return True
+        self.enabled = False  # nothing decodable
+        return False
+
+    def _apply(self, vol: float):
+        if abs(vol - self._applied) < 0.004:
+            return
+        self._applied = vol
+        try:
+            pygame.mixer.music.set_volume(vol)
+        except Exception:
+            pass
+
+    # ---- per frame ----
+    def update(self, g, now: float, dt: float):
+        if not self.enabled:
+            return
+        asleep = g.sleep_stage == "sleep" or g.state == "sleep"
+        muted = g.sfx_muted
+        if g.state == "music" and not asleep:
+            self.want_until = now + float(cfg.BGM_LINGER_SEC)
+        want = now < self.want_until and not asleep and not muted
+
+        target = 0.0
+        if want and not self.switching:
+            scale = max(0.0, min(1.0, g.sfx_scale))
+            target = float(cfg.BGM_BASE_VOLUME) * scale
+            if g.lights_off:
+                target *= float(cfg.BGM_LIGHTS_OFF_SCALE)
+
+        if want and not self.playing:
+            if self.loaded:
+                pygame.mixer.music.unpause()
+                self.playing = True
+            elif not self._load_next(now):
+                return
+
+        if self.playing:
+            if not self.switching and not pygame.mixer.music.get_busy():
+                # track ended on its own: next one fades in from silence
+                self._load_next(now)
+            elif want and not self.switching and now - self.started_at >= float(cfg.BGM_TRACK_MAX_SEC) and len(self.tracks) > 1:
+                self.switching = True
+                target = 0.0
+
+        # ramp toward the target volume
+        step = float(cfg.BGM_BASE_VOLUME) * dt / max(0.05, float(cfg.BGM_FADE_SEC))
+        if self.volume < target:
+            self.volume = min(target, self.volume + step)
+        else:
+            self.volume = max(target, self.volume - step)
+        self._apply(self.volume)
+
+        if self.playing and self.volume <= 0.0:
+            if self.switching:
+                self.switching = False
+                self._load_next(now)
+            elif not want:
+                pygame.mixer.music.pause()
+                self.playing = False
+
+    def stop(self):
+        if self.loaded:
+            try:
+                pygame.mixer.music.stop()
+                pygame.mixer.music.unload()
+            except Exception:
+                pass
+        if self._src is not None:
+            try:
+                self._src.close()
+            except Exception:
+                pass
+        self._src = None
+        self.loaded = False
+        self.playing = False
+
+    def status(self) -> str:
+        if not self.enabled:
+            return "off"
+        name = os.path.basename(self.tracks[self.index]) if self.index >= 0 else "-"
+        state = "switch" if self.switching else ("play" if self.playing else "pause")
+        return f"{state} {name} vol:{self.volume:.2f}"
@@ -0,0 +1,181 @@
+"""characters.py
+Character pack registry (assets/characters/<id>/)
+
+- Index packs by reading only meta.json (no image decode at startup)
+- Load the selected pack through the loader for its asset_spec
+    "v0.1"        : split parts (body/ clothes/ face/)
+    "atlas_v0.1"  : atlas.png + atlas_map.json
+- Normalise pack slot names to the sprite keys render.py expects
+
+The built-in character (cfg.DEFAULT_CHARACTER) is the legacy
+assets/sprite + assets/img set, loaded by assets.load_sprites.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+
+import pygame
+
+from . import config as cfg
+from . import pak
+from .assets import load_sprites, load_clothes_offsets, load_image, scale_unique
+from .atlas import load_atlas_dir
+
+
+@dataclass
+class CharacterPack:
+    id: str
+    path: str
+    asset_spec: str
+    author: str = ""
+    notes: str = ""
+    voice: str = ""     # cfg.VOICE_PRESETS key ("" = default)
+
+
+def _load_split_v0_1(pack_dir: str) -> dict[str, pygame.Surface]:
+    """asset_spec "v0.1": body/ clothes/ face/ の分割PNGを atlas と同じスロット名で返す。
+
+    Animations are horizontal sprite sheets of square frames (walk: 3 frames).
+    """
+    out: dict[str, pygame.Surface] = {}
+    for part in ("body", "clothes"):
+        part_dir = os.path.join(pack_dir, part)
+        if not pak.isdir(part_dir):
+            continue
+        for fn in pak.listdir(part_dir):
+            name, ext = os.path.splitext(fn)
+            if ext.lower() != ".png":
+                continue
+            try:
+                img = load_image(os.path.join(part_dir, fn))
+            except Exception:
+                continue
+            w, h = img.get_size()
+            frames = w // h if h > 0 else 0
+            if name == "walk" and frames > 1:
+                for i in range(frames):
+                    out[f"{part}_walk_{i}"] = img.subsurface(pygame.Rect(i * h, 0, h, h)).copy()
+            else:
+                out[f"{part}_{name}"] = img
+
+    face_dir = os.path.join(pack_dir, "face")
+    if pak.isdir(face_dir):
+        for fn in pak.listdir(face_dir):
+            name, ext = os.path.splitext(fn)
+            if ext.lower() != ".png":
+                continue
+            try:
+                out[name] = load_image(os.path.join(face_dir, fn))
+            except Exception:
+                continue
+    return out
+
+
+SPEC_LOADERS = {
+    "v0.1": _load_split_v0_1,
+    "atlas_v0.1": load_atlas_dir,
+}
+
+
+def _slots_to_sprites(slots: dict[str, pygame.Surface]) -> dict[str, pygame.Surface]:
+    """Map pack slot names (asset spec v0.1) to the keys used by render.py.
+
+    body_*            -> as is ("sleep" also gets body_sleep for the state fallback)
+    clothes_idle      -> clothes_normal
+    eye_open+mouth_0  -> face_normal
+    eye_close         -> face_blink
+    mouth_1           -> face_mouth
+    """
+    out: dict[str, pygame.Surface] = {}
+    for k, v in slots.items():
+        if k.startswith("body_") or k.startswith("clothes_"):
+            out[k] = v
+    if "clothes_idle" in slots:
+        out["clothes_normal"] = out.pop("clothes_idle")
+    if "body_idle" in slots:
+        out["idle"] = slots["body_idle"]
+    if "body_sleep" in slots:
+        out["sleep"] = slots["body_sleep"]
+
+    eye_open = slots.get("eye_open")
+    mouth_0 = slots.get("mouth_0")
+    if eye_open is not None or mouth_0 is not None:
+        base = (eye_open or mouth_0).copy()
+        if eye_open is not None and mouth_0 is not None:
+            base.blit(mouth_0, (0, 0))
+        out["face_normal"] = base
+    if "eye_close" in slots:
+        out["face_blink"] = slots["eye_close"]
+    mouth = slots.get("mouth_1") or slots.get("mouth_2")
+    if mouth is not None:
+        out["face_mouth"] = mouth
+    return out
+
+
+class CharacterRegistry:
+    """assets/characters 以下のキャラパックを meta.json だけ読んで索引する。
+
+    画像は load() で選択中のパックだけデコードする。切替時は呼び出し側が
+    前のパックの Surface 辞書を捨てる（clear）ことで解放される。
+    """
+
+    def __init__(self, root: str = cfg.CHARACTERS_DIR):
+        self.root = root
+        self.packs: dict[str, CharacterPack] = {}
+        self.scan()
+
+    def scan(self):
+        packs: dict[str, CharacterPack] = {}
+        if pak.isdir(self.root):
+            for pid in sorted(pak.listdir(self.root)):
+                meta_path = os.path.join(self.root, pid, "meta.json")
+                if not pak.isfile(meta_path):
+                    continue
+                try:
+                    with pak.open(meta_path, "r") as f:
+                        meta = json.load(f)
+                except Exception:
+                    continue
+                if not isinstance(meta, dict):
+                    continue
+                spec = str(meta.get("asset_spec", ""))
+                if spec not in SPEC_LOADERS or pid == cfg.DEFAULT_CHARACTER:
+                    continue
+                packs[pid] = CharacterPack(
+                    id=pid,
+                    path=os.path.join(self.root, pid),
+                    asset_spec=spec,
+                    author=str(meta.get("author", "")),
+                    notes=str(meta.get("notes", "")),
+                    voice=str(meta.get("voice", "")),
+                )
+        self.packs = packs
+
+    def list_ids(self) -> list[str]:
+        """Built-in character first, then packs by folder name."""
+        return [cfg.DEFAULT_CHARACTER, *self.packs.keys()]
+
+    def get(self, pack_id: str) -> CharacterPack | None:
+        return self.packs.get(pack_id)
+
+    def load(self, pack_id: str, scale: int = 3, stats: dict | None = None) -> tuple[dict[str, pygame.Surface], dict[str, tuple[int, int]]]:
+        """Decode one character. Returns (sprites, clothes_offsets).
+
+        Unknown ids fall back to the built-in character.
+        stats: see assets.scale_unique (identical frames share one surface).
+        """
+        pack = self.packs.get(pack_id)
+        if pack is None:
+            return load_sprites(scale=scale, stats=stats), load_clothes_offsets(scale=scale)
+
+        raw = _slots_to_sprites(SPEC_LOADERS[pack.asset_spec](pack.path))
+        sprites = scale_unique(raw, scale, stats)
+
+        offsets = load_clothes_offsets(scale=scale, path=os.path.join(pack.path, "clothes", "offsets.json"))
+        # the custom menu lists outfits from the offsets keys
+        for k in sprites:
+            if k.startswith("clothes_") and not k.startswith(("clothes_walk_", "clothes_sleep")):
+                offsets.setdefault(k[len("clothes_"):], (0, 0))
+        return sprites, offsets
@@ -0,0 +1,52 @@
+"""clock.py
+Session clock + RNG shared by the behaviour code (sim / dialogue / topics / main).
+
+Behaviour used to call time.time() and the global `random` directly, so no
+session could be reproduced. Everything that decides what she does now goes
+through these two objects instead:
+
+- clock: time in whole milliseconds, advanced once per frame by tick().
+  Every read inside a frame returns the same value. A recording stores the
+  per-frame deltas and a replay feeds them back (game/replay.py), so the
+  replayed run sees exactly the same floats.
+- rng: one random.Random. Seeded from the OS by default; a recording stores
+  the seed and a replay re-seeds it.
+
+Audio / profiling timings keep using time.perf_counter(): they never change
+behaviour.
+"""
+from __future__ import annotations
+
+import random
+import time
+
+
+class SessionClock:
+    def __init__(self, now_ms: int | None = None):
+        self.ms = int(round(time.time() * 1000.0)) if now_ms is None else int(now_ms)
+
+    def time(self) -> float:
+        """Current frame time (seconds since the epoch, like time.time())."""
+        return self.ms / 1000.0
+
+    def reset(self, now_ms: int):
+        self.ms = int(now_ms)
+
+    def tick(self, delta_ms: int | None = None) -> int:
+        """Start a new frame. Wall clock by default, or a given (recorded) delta.
+
+        Returns the delta in ms. A wall clock stepping backwards gives 0, not
+        a negative frame.
+        """
+        if delta_ms is None:
+            delta_ms = max(0, int(round(time.time() * 1000.0)) - self.ms)
+        self.ms += int(delta_ms)
+        return int(delta_ms)
+
+
+clock = SessionClock()
+rng = random.Random()
+
+
+def seed(value: int):
+    rng.seed(int(value))
@@ -0,0 +1,304 @@
+"""companions.py
+Other characters sharing the room with her (⚙ → FRIENDS).
+
+The main Girl stays a scalar dataclass: the save, topics and every UI
+handler hang off `g`. Companions are a struct-of-arrays instead, one NumPy
+array per field and one row per companion, so the fixed-step update
+(meters + wandering, the rules of sim.step_sim / sim.step_move) is a
+handful of array ops whether there are 2 or 10 of them.
+
+Discrete behaviour (idle state picks, sleep stages, lines, blinks) is rare
+per companion. next_at() is the earliest deadline over all rows, armed as
+one "companions" timer on g.rt.timers, and run() visits only the due rows.
+
+Each companion has its own sleep stage and line. Lines come from the pack's
+own lines.json (assets/characters/<id>/lines.json, same format as
+assets/dialogue) when it has one, otherwise from the shared dialogue. The
+lights and the sleep-ready time are the room's (g.lights_off /
+g.sleep_ready_at).
+
+Only the pack ids are saved (Girl.companions); meters start fresh.
+Needs NumPy; without it FRIENDS just says so.
+"""
+from __future__ import annotations
+
+import os
+
+from . import config as cfg
+from .clock import rng
+from .dialogue import Dialogue
+from .sim import GRUMPY_AT, MUSIC_CHANCE, SLEEP_POSE_AT, meter_rates
+
+try:
+    import numpy as np
+except Exception:  # optional dependency
+    np = None
+
+# state / sleep stage codes (index the rate table)
+STATES = ("idle", "music", "grumpy", "sleep")
+IDLE, MUSIC, GRUMPY, SLEEP = range(4)
+STAGES = ("awake", "drowsy", "sleep")
+AWAKE, DROWSY, ASLEEP = range(3)
+
+_FLOATS = (
+    "x", "x_prev", "vx", "walk_until", "next_walk_at",
+    "state_until", "stage_until", "line_until", "next_beat",
+    "blink_until", "next_blink", "depth",
+)
+_INTS = ("state", "stage", "facing")
+_INF = float("inf")
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _rate_table(lights_off: bool):
+    """(state code, [hunger, mood, sleepiness]) per-second rates."""
+    return np.array([meter_rates(code == SLEEP, STATES[code], lights_off) for code in range(len(STATES))])
+
+
+class Companions:
+    def __init__(self, seed: int):
+        self.ids: list[str] = []
+        self.lines: list[str] = []
+        self._dlg: list[Dialogue] = []
+        self._pack_dlg: dict[str, Dialogue | None] = {}
+        self.events = 0
+        # progress to the next fixed step (main loop), for x interpolation
+        self.alpha = 1.0
+        if np is None:
+            return
+        self._np_rng = np.random.default_rng(int(seed))
+        self._rates = (_rate_table(False), _rate_table(True))
+        # (n, 3): hunger / mood / sleepiness
+        self.meters = np.zeros((0, 3))
+        for name in _FLOATS:
+            setattr(self, name, np.zeros(0))
+        for name in _INTS:
+            setattr(self, name, np.zeros(0, dtype=np.int8))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- roster ----
+    def dialogue_for(self, pack_dir: str | None, shared: Dialogue) -> Dialogue:
+        """The pack's own lines.json if it has one (loose files only), else `shared`."""
+        if not pack_dir:
+            return shared
+        if pack_dir not in self._pack_dlg:
+            path = os.path.join(pack_dir, "lines.json")
+            self._pack_dlg[pack_dir] = Dialogue(path) if os.path.isfile(path) else None
+        return self._pack_dlg[pack_dir] or shared
+
+    def add(self, pack_id: str, now: float, dlg: Dialogue):
+        if np is None:
+            return
+        n = len(self.ids)
+        self.ids.append(pack_id)
+        self.lines.append("")
+        self._dlg.append(dlg)
+        bound = max(0, (cfg.RIGHT_PANEL_W // 2) - int(cfg.WALK_MARGIN_PX))
+        row = {
+            "x": rng.uniform(-bound, bound),
+            "walk_until": now,
+            "next_walk_at": now + rng.uniform(2.0, cfg.WALK_REST_MIN_SEC),
+            "state_until": now + rng.uniform(0.5, 2.0),
+            "next_beat": now + rng.uniform(cfg.COMPANION_BEAT_MIN_SEC, cfg.COMPANION_BEAT_MAX_SEC),
+            "next_blink": now + rng.uniform(2.5, 5.0),
+            # golden-ratio spread: rows never pile up at one depth
+            "depth": ((n + 1) * 0.6180339887) % 1.0,
+        }
+        row["x_prev"] = row["x"]
+        for name in _FLOATS:
+            setattr(self, name, np.append(getattr(self, name), row.get(name, 0.0)))
+        self.facing = np.append(self.facing, np.int8(1 if rng.random() < 0.5 else -1))
+        self.state = np.append(self.state, np.int8(IDLE))
+        self.stage = np.append(self.stage, np.int8(AWAKE))
+        start = [rng.uniform(55.0, 85.0), rng.uniform(50.0, 80.0), rng.uniform(10.0, 30.0)]
+        self.meters = np.vstack([self.meters, start])
+
+    def clear(self):
+        if np is None:
+            return
+        self.ids.clear()
+        self.lines.clear()
+        self._dlg.clear()
+        self.meters = self.meters[:0]
+        for name in _FLOATS + _INTS:
+            setattr(self, name, getattr(self, name)[:0])
+
+    def reload_dialogue(self):
+        for d in self._pack_dlg.values():
+            if d is not None:
+                d.load_if_needed()
+
+    # ---- fixed step (vectorised) ----
+    def step(self, now: float, dt: float, lights_off: bool):
+        """Meters + wandering for every companion, one cfg.SIM_HZ step."""
+        if not self.ids:
+            return
+        code = np.where(self.stage == ASLEEP, SLEEP, self.state)
+        self.meters += self._rates[1 if lights_off else 0].take(code, axis=0) * dt
+        np.clip(self.meters, 0.0, 100.0, out=self.meters)
+        self._move(now, dt)
+
+    def _rest(self, n: int):
+        return self._np_rng.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC, n)
+
+    def _move(self, now: float, dt: float):
+        n = len(self.ids)
+        self.x_prev[:] = self.x
+        # no walking while sleepy / asleep, or while a line is showing (sim.step_move)
+        still = (self.stage != AWAKE) | (self.state == SLEEP)
+        talking = ~still & (self.line_until > now)
+        rest = now + self._rest(n)
+        self.vx[still | talking] = 0.0
+        self.next_walk_at = np.where(still & (self.next_walk_at < now), rest, self.next_walk_at)
+        self.next_walk_at = np.where(talking, np.maximum(self.next_walk_at, rest), self.next_walk_at)
+
+        free = ~(still | talking)
+        walking = free & (self.vx != 0.0) & (now < self.walk_until)
+        self.x += np.where(walking, self.vx * dt, 0.0)
+        bound = float(max(0, (cfg.RIGHT_PANEL_W // 2) - int(cfg.WALK_MARGIN_PX)))
+        lo = self.x < -bound
+        hi = self.x > bound
+        self.x[lo] = -bound
+        self.x[hi] = bound
+        self.vx[lo] = np.abs(self.vx[lo])
+        self.vx[hi] = -np.abs(self.vx[hi])
+
+        # walk over: rest; rest over: start a walk in a random direction
+        done = free & (self.vx != 0.0) & (now >= self.walk_until)
+        self.vx[done] = 0.0
+        self.next_walk_at[done] = rest[done]
+        start = free & (self.vx == 0.0) & ~done & (now >= self.next_walk_at)
+        if start.any():
+            k = int(start.sum())
+            sign = np.where(self._np_rng.random(k) < 0.5, -1.0, 1.0)
+            self.vx[start] = sign * float(cfg.WALK_SPEED_PX_PER_SEC)
+            self.walk_until[start] = now + self._np_rng.uniform(cfg.WALK_MIN_SEC, cfg.WALK_MAX_SEC, k)
+        moving = self.vx != 0.0
+        self.facing[moving] = np.where(self.vx[moving] < 0.0, -1, 1)
+
+    # ---- discrete behaviour (due rows only) ----
+    def next_at(self, now: float) -> float:
+        """Earliest deadline over all rows (inf if none)."""
+        if not self.ids:
+            return _INF
+        t = min(
+            float(self.state_until.min()),
+            float(self.next_beat.min()),
+            float(self.next_blink.min()),
+        )
+        drowsy = self.stage == DROWSY
+        if drowsy.any():
+            t = min(t, float(self.stage_until[drowsy].min()))
+        # bubbles closing / eyes opening wake an idle loop too
+        for arr in (self.line_until, self.blink_until):
+            ahead = arr[arr > now]
+            if ahead.size:
+                t = min(t, float(ahead.min()))
+        return t
+
+    def run(self, now: float, lights_off: bool, sleep_ready_at: float) -> int:
+        """Handle every row with something due. Returns how many rows were visited."""
+        if not self.ids:
+            return 0
+        due = (
+            (self.state_until <= now) | (self.next_beat <= now) | (self.next_blink <= now)
+            | ((self.stage == DROWSY) & (self.stage_until <= now))
+        )
+        rows = np.flatnonzero(due).tolist()
+        for i in rows:
+            if self.next_blink[i] <= now:
+                if self.stage[i] != ASLEEP:
+                    self.blink_until[i] = now + 0.12
+                self.next_blink[i] = now + rng.uniform(3.0, 6.0)
+            if self.stage[i] == DROWSY and self.stage_until[i] <= now:
+                self._finish_drowsy(i, now, lights_off)
+            if self.state_until[i] <= now:
+                self._pick_state(i, now)
+            if self.next_beat[i] <= now:
+                self._beat(i, now, lights_off, sleep_ready_at)
+        self.events += len(rows)
+        return len(rows)
+
+    def _say(self, i: int, now: float, text: str, t=(2.5, 5.0)):
+        self.lines[i] = text
+        self.line_until[i] = now + rng.uniform(*t)
+
+    def _talking(self, i: int, now: float) -> bool:
+        return bool(self.lines[i]) and now < self.line_until[i]
+
+    def _pick_state(self, i: int, now: float):
+        """sim.pick_idle_state for one row (they speak up less often than she does)."""
+        h, m, s = self.meters[i]
+        if self.stage[i] == ASLEEP or s >= SLEEP_POSE_AT:
+            self.state[i] = SLEEP
+        elif h <= GRUMPY_AT or m <= GRUMPY_AT:
+            self.state[i] = GRUMPY
+        else:
+            self.state[i] = MUSIC if rng.random() < MUSIC_CHANCE else IDLE
+        self.state_until[i] = now + rng.uniform(cfg.IDLE_MIN_SEC, cfg.IDLE_MAX_SEC)
+        if self.state[i] != SLEEP and not self._talking(i, now) and rng.random() < float(cfg.COMPANION_TALK_CHANCE):
+            self._say(i, now, self._dlg[i].pick(STATES[self.state[i]]) or "……")
+
+    def _finish_drowsy(self, i: int, now: float, lights_off: bool):
+        """sim.step_sleep_system for one row."""
+        if now < self.line_until[i]:
+            self.stage_until[i] = self.line_until[i]
+            return
+        if lights_off:
+            self.stage[i] = ASLEEP
+            self.state[i] = SLEEP
+        else:
+            self.stage[i] = AWAKE
+        self.stage_until[i] = 0.0
+
+    def _drowsy(self, i: int, now: float, dur: float, tag: str, fallback: str):
+        self.stage[i] = DROWSY
+        self.stage_until[i] = now + dur
+        self._say(i, now, self._dlg[i].pick(tag) or fallback, (dur, dur))
+
+    def _beat(self, i: int, now: float, lights_off: bool, sleep_ready_at: float):
+        """The sleep half of main.on_idle_beat for one row (walks come from step)."""
+        stage = self.stage[i]
+        if stage == ASLEEP or self.state[i] == SLEEP:
+            p_wake = float(cfg.WAKE_CHANCE_DARK_WHILE_SLEEPING if lights_off else cfg.WAKE_CHANCE_BRIGHT_WHILE_SLEEPING)
+            p_talk = float(cfg.SLEEP_TALK_CHANCE_DARK if lights_off else cfg.SLEEP_TALK_CHANCE_BRIGHT)
+            r = rng.random()
+            if stage == ASLEEP and r < p_wake:
+                self._drowsy(i, now, rng.uniform(cfg.WAKE_DROWSY_MIN_SEC, cfg.WAKE_DROWSY_MAX_SEC), "wake", "ん……")
+            elif stage == ASLEEP and r < p_wake + p_talk and not self._talking(i, now):
+                self._say(i, now, self._dlg[i].pick("sleep_talk") or "……zzz……",
+                          (cfg.SLEEP_TALK_MIN_SEC, cfg.SLEEP_TALK_MAX_SEC))
+            self.next_beat[i] = now + rng.uniform(cfg.SLEEP_SILENT_BEAT_MIN_SEC, cfg.SLEEP_SILENT_BEAT_MAX_SEC)
+            return
+        if stage == AWAKE and lights_off:
+            p_sleep = float(cfg.SLEEP_CHANCE_DARK_READY if now >= sleep_ready_at else cfg.SLEEP_CHANCE_DARK_PRE_READY)
+            if rng.random() < p_sleep:
+                self._drowsy(i, now, rng.uniform(cfg.DROWSY_MIN_SEC, cfg.DROWSY_MAX_SEC), "pre_sleep", "ふぁ……")
+        self.next_beat[i] = now + rng.uniform(cfg.COMPANION_BEAT_MIN_SEC, cfg.COMPANION_BEAT_MAX_SEC)
+
+    # ---- render / main loop helpers ----
+    def busy(self, now: float) -> bool:
+        """Someone is walking or talking (the loop must keep drawing)."""
+        if not self.ids:
+            return False
+        return bool((self.vx != 0.0).any() or (self.line_until > now).any())
+
+    def eyes_closed(self, i: int, now: float) -> bool:
+        return self.stage[i] == ASLEEP or self.state[i] == SLEEP or now < self.blink_until[i]
+
+    def line(self, i: int, now: float) -> str:
+        return self.lines[i] if self._talking(i, now) else ""
+
+    def draw_order(self) -> list[int]:
+        """Back rows first (larger depth = further back)."""
+        return np.argsort(-self.depth, kind="stable").tolist() if self.ids else []
+
+    def stats(self) -> dict:
+        n = len(self.ids)
+        asleep = int((self.stage == ASLEEP).sum()) if n else 0
+        return {"n": n, "asleep": asleep, "events": self.events}
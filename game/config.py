@@ -5,12 +5,47 @@ import os
 # A slightly vertical "toy" aspect ratio (tamagotchi-ish).
 W, H = 360, 320
 FPS = 60
+# Behaviour / meters run at a fixed rate, independent of FPS (main loop
+# accumulator). Walking x is interpolated between steps when drawing.
+SIM_HZ = 10
+SIM_MAX_STEPS = 8     # per frame; a longer stall drops the backlog
+# --sim-process (game/simproc.py): behaviour, dialogue reloads and saves run
+# in a worker process; the window reads its state from shared memory.
+SIM_PROCESS = False
+SIM_PROC_LINE_BYTES = 512    # UTF-8 bytes of the current line in the shared block
+
+# Timed behaviours run from game/scheduler.py. With nothing moving on screen
+# the loop sleeps until input / the next timer, but at most this long
+# (and never past (SIM_MAX_STEPS - 1) / SIM_HZ, see the main loop).
+IDLE_WAIT_MAX_SEC = 0.5
+IDLE_BEAT_RETRY_SEC = 0.25   # idle beat blocked (menu open / walking): look again after this
 
 SAVE_PATH = "save.json"
+# Conversation journal (game/journal.py): append-only, not part of save.json.
+JOURNAL_PATH = "journal.jsonl"
+JOURNAL_MEMORY = 120                  # entries kept in memory for the journal panel
+JOURNAL_SEGMENT_BYTES = 256 * 1024    # live file is gzipped into a segment past this
+JOURNAL_MAX_SEGMENTS = 0              # 0 = keep every segment
+# Meter history (game/history.py): fixed-size ring buffers, binary file.
+HISTORY_PATH = "history.bin"
+HISTORY_SAMPLE_SEC = 10.0             # meters are sampled this often
+HISTORY_FLUSH_SEC = 600.0             # history.bin is rewritten (by the save worker) this often
+# (label, bucket seconds, buckets kept): each level is downsampled from the one above
+HISTORY_LEVELS = (
+    ("24h", 60, 1440),
+    ("30d", 3600, 720),
+    ("3y", 86400, 1095),
+)
+HISTORY_COLUMNS = 96                  # sparkline width in samples (min/max per column)
 
 ASSETS = "assets"
+# Optional single-file archive of assets/ (tools/build_pak.py).
+# Mounted at startup if present; loose files are the fallback.
+ASSETS_PAK = "assets.pak"
 IMG_DIR = os.path.join(ASSETS, "img")
 SFX_DIR = os.path.join(ASSETS, "sfx")
+BGM_DIR = os.path.join(ASSETS, "bgm")
+FONTS_DIR = os.path.join(ASSETS, "fonts")  # optional bundled fonts (tried first)
 DLG_PATH = os.path.join(ASSETS, "dialogue", "lines.json")
 TOPICS_PATH = os.path.join(ASSETS, "dialogue", "topics.json")
 
@@ -19,6 +54,11 @@ SNACKS_DIR = os.path.join(ASSETS, "snacks")
 SNACKS_PATH = os.path.join(SNACKS_DIR, "snacks.json")
 SNACKS_ICON_DIR = os.path.join(SNACKS_DIR, "icons")
 
+# Character packs (assets/characters/<id>/meta.json)
+CHARACTERS_DIR = os.path.join(ASSETS, "characters")
+# Built-in character: assets/sprite + assets/img (load_sprites)
+DEFAULT_CHARACTER = "default"
+
 # Snack UI
 SNACK_MENU_COLS = 4
 SNACK_MENU_ROWS = 1
@@ -36,6 +76,10 @@ SNACK_HUNGER_RECOVER = 18
 PET_MOOD_RECOVER     = 12
 LIGHTS_OFF_SLEEP_RECOVER = 0.8
 
+# Time away (closed app / suspended PC) longer than this is applied with
+# sim.fast_forward in one go instead of frame steps.
+CATCHUP_MIN_SEC = 30.0
+
 IDLE_MIN_SEC = 4
 IDLE_MAX_SEC = 9
 
@@ -48,6 +92,26 @@ BG_THEMES = [
     {"name": "sky",      "bg": (22, 28, 36)},
 ]
 
+# Background images are decoded on selection, downscaled to the window
+# (cover) size and kept in a small LRU. This caps its total pixel bytes.
+BG_CACHE_BUDGET_BYTES = 2 * 1024 * 1024
+
+# Sprite / background hot reload: how often source files are stat'ed.
+ASSET_RELOAD_INTERVAL_SEC = 1.0
+
+# Staged startup (game/startup.py): deferred stages run after the first frame,
+# this many ms of them per frame at most (at least one stage per frame).
+STARTUP_STAGE_BUDGET_MS = 8.0
+
+# Japanese font discovery (game/fonts.py). The resolved path is cached so
+# later launches skip the search. A font must provide this share of the
+# probe characters to be picked.
+FONT_CACHE_PATH = "font_cache.json"
+FONT_PROBE_TEXT = "あアーン漢字表示、。"
+FONT_MIN_COVERAGE = 1.0
+# Rendered text surfaces kept per font chain (game/fontchain.py).
+TEXT_CACHE_MAX = 256
+
 SFX_BASE_VOLUME = {
     "snack": 0.35,
     "pet":   0.30,
@@ -56,6 +120,43 @@ SFX_BASE_VOLUME = {
     "talk":  0.30,
 }
 
+# Reserved mixer channels per SFX category (audio.AudioEngine).
+AUDIO_CHANNELS = {
+    "voice":   1,
+    "ui":      2,
+    "ambient": 1,
+}
+SFX_CATEGORY = {
+    "talk":  "voice",
+    "snack": "ui",
+    "pet":   "ui",
+    "off":   "ambient",
+    "on":    "ambient",
+}
+# Re-triggering the same SFX faster than this is dropped (click spam).
+SFX_MIN_INTERVAL_SEC = 0.08
+
+# ---- voice blips (game/voice.py, needs NumPy) ----
+# Per-character "animalese" style blips generated from the line text.
+# Character packs may pick a preset with "voice" in meta.json.
+VOICE_ENABLED = True
+VOICE_PRESETS = {
+    "default": {"pitch": 520.0, "spread": 0.16, "blip_sec": 0.070, "gap_sec": 0.030, "attack_sec": 0.008, "decay_sec": 0.035},
+    "low":     {"pitch": 340.0, "spread": 0.12, "blip_sec": 0.080, "gap_sec": 0.035, "attack_sec": 0.010, "decay_sec": 0.045},
+    "high":    {"pitch": 720.0, "spread": 0.20, "blip_sec": 0.060, "gap_sec": 0.025, "attack_sec": 0.006, "decay_sec": 0.028},
+}
+VOICE_MAX_BLIPS = 28          # long lines stop blipping after this many syllables
+VOICE_MOUTH_THRESHOLD = 0.35  # envelope level above which the mouth is open
+
+# ---- ambient BGM (game/bgm.py) ----
+# Streamed with pygame.mixer.music from assets/bgm/ (never fully decoded).
+BGM_EXTS = (".ogg", ".mp3", ".wav", ".flac")
+BGM_BASE_VOLUME = 0.30        # x sfx_scale
+BGM_LIGHTS_OFF_SCALE = 0.40   # quieter while the lights are off
+BGM_FADE_SEC = 1.5            # fade in / out (track changes fade out, then in)
+BGM_LINGER_SEC = 20.0         # keep playing this long after the "music" state ends
+BGM_TRACK_MAX_SEC = 240.0     # rotate to the next track after this long
+
 # X movement (right panel wandering)
 WALK_SPEED_PX_PER_SEC = 22.0
 
@@ -108,6 +209,20 @@ WAKE_DROWSY_MAX_SEC = 1.4
 
 
 
+# ---- companions (game/companions.py, needs NumPy) ----
+# Other character packs wandering the same panel (⚙ → FRIENDS).
+COMPANION_MAX = 10
+COMPANION_SCALE = 2              # sprite scale (she is 3): they stand further back
+COMPANION_BACK_PX = 28           # the farthest row stands this much higher up
+COMPANION_TALK_CHANCE = 0.3      # chance to say something on an idle state change
+COMPANION_BEAT_MIN_SEC = 3.0     # sleep decisions (doze off in the dark / wake / sleep talk)
+COMPANION_BEAT_MAX_SEC = 8.0
+COMPANION_BUBBLE_MAX_W = 110
+
+# Composited character frames kept by render.py, per character pack (one pose each)
+COMPOSITE_CACHE_MAX = 128
+
+
 # Atlas/animation rules
 FACE_DURING_WALK = False  # v0.1: walk中は表情パーツを重ねない
 CLOTHES_WALK_ANIM = True  # clothes_walk_* があれば歩行に合わせて切替
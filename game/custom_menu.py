@@ -1,7 +1,7 @@
 """custom_menu.py
-Unified Custom Menu (衣装 + 背景) v0.2
+Unified Custom Menu (衣装 + 背景 + キャラ) v0.2
 
-- Top buttons (right aligned): BG / CLOTH
+- Top buttons (right aligned): BG / CLOTH / CHAR
   - Clicking a tab opens the menu.
   - Clicking the same tab again closes it.
 - Menu content: tabbed grid
@@ -10,6 +10,8 @@ Unified Custom Menu (衣装 + 背景) v0.2
 Notes:
   Emoji rendering is unreliable depending on the bundled font.
   This module uses ASCII labels by default to avoid mojibake.
+  (main.py now passes FontChain fonts, which fall back per glyph to symbol
+  fonts when installed; the labels stay ASCII so they look the same everywhere.)
 
 This module is intentionally standalone to avoid touching legacy ui.py menus.
 """
@@ -29,8 +31,8 @@ def draw_top_buttons(screen: pygame.Surface, font_ui: pygame.font.Font, g, cfg)
     gap = int(getattr(cfg, "CUSTOM_MENU_BTN_GAP", 6))
     margin_r = int(getattr(cfg, "CUSTOM_MENU_BTN_MARGIN_R", 8))
 
-    # Right aligned two buttons.
-    x = int(getattr(cfg, "W", 800)) - margin_r - (size * 2 + gap)
+    # Right aligned three buttons.
+    x = int(getattr(cfg, "W", 800)) - margin_r - (size * 3 + gap * 2)
 
     def draw_btn(label: str) -> pygame.Rect:
         nonlocal x
@@ -45,23 +47,24 @@ def draw_top_buttons(screen: pygame.Surface, font_ui: pygame.font.Font, g, cfg)
     btns = {
         "bg": draw_btn("BG"),
         "clothes": draw_btn("CL"),
+        "char": draw_btn("CH"),
     }
-    g._custom_btns = btns
+    g.rt.custom_btns = btns
     return btns
 
 
 def _current_bg_value(g, cfg) -> str:
     """Return current background selection as custom-menu key."""
-    mode = getattr(g, "bg_mode", "theme")
+    mode = g.bg_mode
     if mode == "image":
-        bid = getattr(g, "bg_image_id", "") or ""
+        bid = g.bg_image_id or ""
         return f"img:{bid}" if bid else ""
     # theme
     try:
         themes = getattr(cfg, "BG_THEMES", []) or []
         if not themes:
             return ""
-        idx = int(getattr(g, "bg_index", 0)) % len(themes)
+        idx = int(g.bg_index) % len(themes)
         name = str(themes[idx].get("name", "theme"))
         return f"theme:{name}"
     except Exception:
@@ -78,19 +81,20 @@ def _panel_rect(cfg) -> pygame.Rect:
 
 
 def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Font, font_ui: pygame.font.Font,
-                     bg_thumbs: dict[str, pygame.Surface], clothes_ids: list[str]) -> None:
-    if getattr(g, "ui_mode", "main") != "custom":
-        g._custom_item_rects = []
+                     bg_thumbs: dict[str, pygame.Surface], clothes_ids: list[str],
+                     char_ids: list[str] | None = None) -> None:
+    if g.rt.ui_mode != "custom":
+        g.rt.custom_item_rects = []
         return
 
     panel = _panel_rect(cfg)
     pygame.draw.rect(screen, (28, 28, 36), panel, 0, 14)
     pygame.draw.rect(screen, (70, 70, 90), panel, 2, 14)
 
-    tab = getattr(g, "custom_tab", "clothes")
+    tab = g.rt.custom_tab
     title = font_ui.render("カスタム", True, (235, 235, 245))
     # Avoid emoji to prevent mojibake depending on the font.
-    sub = font_small.render(("服" if tab == "clothes" else "背景"), True, (200, 200, 215))
+    sub = font_small.render({"clothes": "服", "char": "キャラ"}.get(tab, "背景"), True, (200, 200, 215))
     screen.blit(title, (panel.x + 14, panel.y + 10))
     screen.blit(sub, (panel.x + 14, panel.y + 10 + title.get_height() + 2))
 
@@ -111,6 +115,9 @@ def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Fon
     if tab == "bg":
         for key in sorted(bg_thumbs.keys()):
             items.append(("bg", key))
+    elif tab == "char":
+        for pid in (char_ids or []):
+            items.append(("char", pid))
     else:
         for cid in clothes_ids:
             items.append(("clothes", cid))
@@ -121,16 +128,10 @@ def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Fon
     total_rows = (len(items) + cols - 1) // cols
     max_scroll = max(0, total_rows - visible_rows)
 
-    if tab == "bg":
-        scroll = int(getattr(g, "custom_scroll_bg", 0))
-    else:
-        scroll = int(getattr(g, "custom_scroll_clothes", 0))
+    scroll_attr = {"bg": "custom_scroll_bg", "char": "custom_scroll_char"}.get(tab, "custom_scroll_clothes")
+    scroll = int(getattr(g.rt, scroll_attr))
     scroll = max(0, min(scroll, max_scroll))
-
-    if tab == "bg":
-        g.custom_scroll_bg = scroll
-    else:
-        g.custom_scroll_clothes = scroll
+    setattr(g.rt, scroll_attr, scroll)
 
     start_i = scroll * cols
     end_i = start_i + (visible_rows * cols)
@@ -158,7 +159,7 @@ def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Fon
 
     _draw_scroll_btn(rect_up, scroll > 0, True)
     _draw_scroll_btn(rect_dn, scroll < max_scroll, False)
-    g._custom_scroll_btns = {"up": rect_up, "down": rect_dn, "tab": tab, "max": max_scroll}
+    g.rt.custom_scroll_btns = {"up": rect_up, "down": rect_dn, "tab": tab, "max": max_scroll}
 
     rects: list[tuple[tuple[str, str], pygame.Rect]] = []
     for idx, it in enumerate(visible_items):
@@ -171,7 +172,9 @@ def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Fon
         selected = False
         if it[0] == "bg":
             selected = (_current_bg_value(g, cfg) == it[1])
-        if it[0] == "clothes" and getattr(g, "outfit", "normal") == it[1]:
+        if it[0] == "clothes" and g.outfit == it[1]:
+            selected = True
+        if it[0] == "char" and g.character == it[1]:
             selected = True
 
         frame_col = (220, 220, 245) if selected else (90, 90, 110)
@@ -200,7 +203,7 @@ def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Fon
             ib = pygame.Rect(img_rect.x + 12, img_rect.y + 12, img_rect.w - 24, img_rect.h - 24)
             pygame.draw.rect(screen, (45, 45, 58), ib, 0, 10)
             pygame.draw.rect(screen, (90, 90, 110), ib, 2, 10)
-            ic = font_ui.render("CL", True, (235, 235, 245))
+            ic = font_ui.render("CH" if it[0] == "char" else "CL", True, (235, 235, 245))
             screen.blit(ic, ic.get_rect(center=ib.center))
 
         label = font_small.render(name, True, (235, 235, 245))
@@ -208,5 +211,5 @@ def draw_custom_menu(screen: pygame.Surface, g, cfg, font_small: pygame.font.Fon
 
         rects.append((it, r))
 
-    g._custom_item_rects = rects
+    g.rt.custom_item_rects = rects
 
@@ -0,0 +1,176 @@
+"""fontchain.py
+Per-glyph font fallback for text rendering.
+
+FontChain wraps an ordered list of fonts (CJK font first, then symbol /
+emoji fonts from fonts.resolve_fallback_fonts(), then pygame's default
+font) and quacks like pygame.font.Font for what this project uses:
+render() / size() / get_linesize() / get_height() / get_ascent().
+
+- Each character is assigned to the first font in the chain that has a real
+  glyph for it (not .notdef). The answer is cached per (chain, codepoint) at
+  module level, so the 16px and 14px chains over the same files share it and
+  each code point is probed once per process.
+- A string is split into runs of consecutive characters using the same font,
+  rendered run by run and blitted onto one surface on a common baseline.
+- Rendered surfaces are kept in a small LRU keyed by (text, antialias,
+  color, background): the HUD / buttons / bubble redraw the same strings
+  every frame, so steady state is a dict lookup per label.
+
+Callers must treat returned surfaces as read-only (they are shared).
+"""
+from __future__ import annotations
+
+import unicodedata
+from collections import OrderedDict
+
+import pygame
+
+from . import config as cfg
+from .fonts import glyph_signature, NOTDEF_PROBE
+
+# (chain paths, char) -> index into the chain
+_GLYPH_INDEX: dict[tuple[tuple, str], int] = {}
+
+
+class FontChain:
+    def __init__(self, paths: list[str | None], size: int, cache_max: int | None = None):
+        self.paths: tuple = ()
+        self.fonts: list[pygame.font.Font] = []
+        for p in paths:
+            try:
+                f = pygame.font.Font(p, size)
+            except Exception:
+                continue
+            self.fonts.append(f)
+            self.paths += (p,)
+        if not self.fonts:
+            self.fonts = [pygame.font.Font(None, size)]
+            self.paths = (None,)
+        self.primary = self.fonts[0]
+        self._notdef: list[tuple | None] = [None] * len(self.fonts)
+        self.cache_max = int(cfg.TEXT_CACHE_MAX if cache_max is None else cache_max)
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # ---- glyph resolution ----
+    def _has_glyph(self, i: int, ch: str) -> bool:
+        f = self.fonts[i]
+        if self._notdef[i] is None:
+            self._notdef[i] = glyph_signature(f, NOTDEF_PROBE)
+        try:
+            return glyph_signature(f, ch) != self._notdef[i]
+        except Exception:
+            return False
+
+    def font_index(self, ch: str) -> int:
+        key = (self.paths, ch)
+        idx = _GLYPH_INDEX.get(key)
+        if idx is None:
+            # nobody has it: keep the primary font's tofu
+            idx = next((i for i in range(len(self.fonts)) if self._has_glyph(i, ch)), 0)
+            _GLYPH_INDEX[key] = idx
+        return idx
+
+    def runs(self, text: str) -> list[tuple[int, str]]:
+        """Split text into (font index, substring) runs."""
+        out: list[tuple[int, str]] = []
+        cur = 0
+        buf = ""
+        for ch in text:
+            # spaces / combining marks stay with the surrounding run
+            if ch.isspace() or (buf and _is_combining(ch)):
+                idx = cur
+            elif len(self.fonts) == 1:
+                idx = 0
+            else:
+                idx = self.font_index(ch)
+            if buf and idx != cur:
+                out.append((cur, buf))
+                buf = ""
+            cur = idx
+            buf += ch
+        if buf:
+            out.append((cur, buf))
+        return out
+
+    # ---- pygame.font.Font compatible API ----
+    def render(self, text, antialias, color, background=None) -> pygame.Surface:
+        text = str(text)
+        key = (text, bool(antialias), tuple(color), tuple(background) if background is not None else None)
+        surf = self._surfaces.get(key)
+        if surf is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+
+        runs = self.runs(text)
+        if len(runs) <= 1:
+            f = self.fonts[runs[0][0]] if runs else self.primary
+            surf = f.render(text, antialias, color, background) if background is not None else f.render(text, antialias, color)
+        else:
+            parts = []
+            for idx, s in runs:
+                f = self.fonts[idx]
+                img = f.render(s, antialias, color, background) if background is not None else f.render(s, antialias, color)
+                parts.append((f.get_ascent(), img))
+            ascent = max(a for a, _ in parts)
+            w = sum(img.get_width() for _, img in parts)
+            h = max(ascent - a + img.get_height() for a, img in parts)
+            surf = pygame.Surface((w, h), pygame.SRCALPHA)
+            if background is not None:
+                surf.fill(background)
+            x = 0
+            for a, img in parts:
+                surf.blit(img, (x, ascent - a))
+                x += img.get_width()
+
+        self._surfaces[key] = surf
+        while len(self._surfaces) > self.cache_max:
+            self._surfaces.popitem(last=False)
+        return surf
+
+    def size(self, text) -> tuple[int, int]:
+        runs = self.runs(str(text))
+        if len(runs) <= 1:
+            return (self.fonts[runs[0][0]] if runs else self.primary).size(str(text))
+        w = 0
+        h = 0
+        for idx, s in runs:
+            sw, sh = self.fonts[idx].size(s)
+            w += sw
+            h = max(h, sh)
+        return w, h
+
+    def get_linesize(self) -> int:
+        return self.primary.get_linesize()
+
+    def get_height(self) -> int:
+        return self.primary.get_height()
+
+    def get_ascent(self) -> int:
+        return self.primary.get_ascent()
+
+    def get_descent(self) -> int:
+        return self.primary.get_descent()
+
+    def __getattr__(self, name):
+        # anything else (set_bold, metrics, ...) goes to the primary font
+        if name == "primary":
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    def stats(self) -> dict:
+        return {
+            "fonts": len(self.fonts),
+            "glyphs": sum(1 for k in _GLYPH_INDEX if k[0] == self.paths),
+            "surfaces": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _is_combining(ch: str) -> bool:
+    # combining marks, ZWJ and variation selectors belong to the previous glyph
+    return unicodedata.combining(ch) != 0 or ch in "\u200d\ufe0e\ufe0f"
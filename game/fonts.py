@@ -0,0 +1,251 @@
+"""fonts.py
+Cached discovery of a Japanese-capable (CJK) font.
+
+pygame.font.SysFont builds its font table by scanning every system font
+(fc-list on Linux), which costs hundreds of ms at startup and still picks a
+font without Japanese glyphs. resolve_cjk_font() instead:
+
+1. reads cfg.FONT_CACHE_PATH; if the cached path still exists with the same
+   mtime/size, it is used as is (no scan, no probing)
+2. otherwise tries assets/fonts/ (bundled fonts), then known per-platform
+   paths (Meiryo / Hiragino / Noto CJK / IPA / Takao ...), then font files
+   whose names look CJK under the platform font folders
+3. probes each candidate's glyph coverage for cfg.FONT_PROBE_TEXT and keeps
+   the first one that covers at least cfg.FONT_MIN_COVERAGE
+4. writes the result (path, mtime, size, coverage) back to the cache.
+   "Nothing found" is cached too, keyed by the font folder trees (folder
+   count + newest folder mtime), so a machine without CJK fonts does not
+   rescan every launch but notices a font installed into any subfolder.
+
+Returns None when no CJK font exists; callers fall back to pygame's bundled
+default font (pygame.font.Font(None, size)), which needs no scan either.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import pygame
+
+from . import config as cfg
+
+_CACHE_VERSION = 2
+
+_WINDOWS_FONTS = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")
+
+KNOWN_FONTS = {
+    "win32": [
+        os.path.join(_WINDOWS_FONTS, "meiryo.ttc"),
+        os.path.join(_WINDOWS_FONTS, "YuGothM.ttc"),
+        os.path.join(_WINDOWS_FONTS, "msgothic.ttc"),
+        os.path.join(_WINDOWS_FONTS, "BIZ-UDGothicR.ttc"),
+    ],
+    "darwin": [
+        "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
+        "/System/Library/Fonts/Hiragino Sans GB.ttc",
+        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+        "/Library/Fonts/Arial Unicode.ttf",
+    ],
+    "linux": [
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+        "/usr/share/fonts/opentype/noto/NotoSansJP-Regular.otf",
+        "/usr/share/fonts/truetype/fonts-japanese-gothic.ttf",
+        "/usr/share/fonts/opentype/ipafont-gothic/ipag.ttf",
+        "/usr/share/fonts/truetype/takao-gothic/TakaoGothic.ttf",
+        "/usr/share/fonts/truetype/vlgothic/VL-Gothic-Regular.ttf",
+        "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    ],
+}
+
+FONT_DIRS = {
+    "win32": [_WINDOWS_FONTS],
+    "darwin": ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")],
+    "linux": ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"), os.path.expanduser("~/.local/share/fonts")],
+}
+
+# lower-case file name fragments that usually mean Japanese / CJK glyphs
+_CJK_HINTS = ("cjk", "jp", "japan", "gothic", "mincho", "meiryo", "yugo", "hiragino", "ipa", "takao", "vl-gothic", "droidsansfallback", "wqy", "sourcehan", "unicode")
+_FONT_EXTS = (".ttf", ".ttc", ".otf")
+
+# a code point no font provides: renders as the font's .notdef glyph
+NOTDEF_PROBE = "\U0010FFFD"
+
+# symbol / emoji fonts appended after the CJK font (game/fontchain.py)
+FALLBACK_FONTS = {
+    "win32": [
+        os.path.join(_WINDOWS_FONTS, "seguisym.ttf"),
+        os.path.join(_WINDOWS_FONTS, "seguiemj.ttf"),
+        os.path.join(_WINDOWS_FONTS, "arialuni.ttf"),
+    ],
+    "darwin": [
+        "/System/Library/Fonts/Apple Symbols.ttf",
+        "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+    ],
+    "linux": [
+        "/usr/share/fonts/truetype/noto/NotoSansSymbols2-Regular.ttf",
+        "/usr/share/fonts/truetype/noto/NotoEmoji-Regular.ttf",
+        "/usr/share/fonts/truetype/ancient-scripts/Symbola_hint.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ],
+}
+
+
+def _platform_key() -> str:
+    if sys.platform.startswith("win"):
+        return "win32"
+    if sys.platform == "darwin":
+        return "darwin"
+    return "linux"
+
+
+def _bundled_fonts() -> list[str]:
+    d = cfg.FONTS_DIR
+    if not os.path.isdir(d):
+        return []
+    return [os.path.join(d, fn) for fn in sorted(os.listdir(d)) if fn.lower().endswith(_FONT_EXTS)]
+
+
+def _hinted_fonts(dirs: list[str]) -> list[str]:
+    out: list[str] = []
+    for root_dir in dirs:
+        if not os.path.isdir(root_dir):
+            continue
+        for root, _, files in os.walk(root_dir):
+            for fn in files:
+                low = fn.lower()
+                if low.endswith(_FONT_EXTS) and any(h in low for h in _CJK_HINTS):
+                    out.append(os.path.join(root, fn))
+    return sorted(out)
+
+
+def _dirs_signature(dirs: list[str]) -> dict[str, list]:
+    """Font folder -> [number of folders under it, newest folder mtime].
+
+    Package managers install into existing subfolders (fonts-noto-cjk writes
+    /usr/share/fonts/opentype/noto), which leaves the top folder's mtime
+    alone, so the whole tree is walked. Only folders are stat'ed, not files.
+    """
+    sig: dict[str, list] = {}
+    for d in [cfg.FONTS_DIR, *dirs]:
+        try:
+            newest = os.path.getmtime(d)
+        except OSError:
+            continue
+        count = 1
+        for root, subdirs, _ in os.walk(d):
+            for sd in subdirs:
+                try:
+                    newest = max(newest, os.path.getmtime(os.path.join(root, sd)))
+                except OSError:
+                    continue
+                count += 1
+        sig[d] = [count, newest]
+    return sig
+
+
+def glyph_signature(font: pygame.font.Font, ch: str) -> tuple:
+    """Size + pixels of one rendered glyph (compare against .notdef to detect tofu)."""
+    surf = font.render(ch, False, (255, 255, 255), (0, 0, 0))
+    return surf.get_size(), pygame.image.tobytes(surf, "RGB")
+
+
+def glyph_coverage(path: str, text: str | None = None) -> float:
+    """Fraction of the characters in `text` that the font provides (0.0 on error).
+
+    SDL_ttf reports metrics for missing glyphs too, so a character counts as
+    missing when it renders exactly like a code point no font has (.notdef).
+    """
+    chars = [c for c in dict.fromkeys(cfg.FONT_PROBE_TEXT if text is None else text) if not c.isspace()]
+    if not chars:
+        return 0.0
+    try:
+        f = pygame.font.Font(path, 16)
+        notdef = glyph_signature(f, NOTDEF_PROBE)
+        return sum(1 for c in chars if glyph_signature(f, c) != notdef) / len(chars)
+    except Exception:
+        return 0.0
+
+
+def _read_cache(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+        return {}
+    if data.get("platform") != _platform_key() or data.get("probe") != cfg.FONT_PROBE_TEXT:
+        return {}
+    return data
+
+
+def _write_cache(path: str, data: dict):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception:
+        pass
+
+
+def _cache_hit(data: dict, dirs: list[str]) -> tuple[bool, str | None]:
+    font_path = data.get("path")
+    if font_path:
+        try:
+            st = os.stat(font_path)
+        except OSError:
+            return False, None
+        if st.st_mtime == data.get("mtime") and st.st_size == data.get("size"):
+            return True, font_path
+        return False, None
+    if font_path == "" and data.get("dirs") == _dirs_signature(dirs):
+        return True, None
+    return False, None
+
+
+def resolve_cjk_font(cache_path: str = cfg.FONT_CACHE_PATH, stats: dict | None = None) -> str | None:
+    """Path of a font that renders Japanese, or None. See the module docstring."""
+    key = _platform_key()
+    dirs = FONT_DIRS.get(key, [])
+
+    hit, font_path = _cache_hit(_read_cache(cache_path), dirs)
+    if stats is not None:
+        stats["font_cache_hit"] = hit
+    if hit:
+        return font_path
+
+    probed = 0
+    found = None
+    coverage = 0.0
+    seen: set[str] = set()
+    for cand_list in (_bundled_fonts, lambda: KNOWN_FONTS.get(key, []), lambda: _hinted_fonts(dirs)):
+        for p in cand_list():
+            if p in seen or not os.path.isfile(p):
+                continue
+            seen.add(p)
+            probed += 1
+            coverage = glyph_coverage(p)
+            if coverage >= float(cfg.FONT_MIN_COVERAGE):
+                found = p
+                break
+        if found:
+            break
+    if stats is not None:
+        stats["fonts_probed"] = probed
+
+    data = {"version": _CACHE_VERSION, "platform": key, "probe": cfg.FONT_PROBE_TEXT}
+    if found:
+        st = os.stat(found)
+        data.update({"path": found, "mtime": st.st_mtime, "size": st.st_size, "coverage": round(coverage, 3)})
+    else:
+        data.update({"path": "", "dirs": _dirs_signature(dirs)})
+    _write_cache(cache_path, data)
+    return found
+
+
+def resolve_fallback_fonts() -> list[str]:
+    """Existing symbol / emoji fonts for this platform (no probing: the chain checks glyphs lazily)."""
+    return [p for p in FALLBACK_FONTS.get(_platform_key(), []) if os.path.isfile(p)]
@@ -0,0 +1,232 @@
+"""history.py
+Meter history (hunger / mood / sleepiness / affection) in fixed-size ring buffers.
+
+Levels come from cfg.HISTORY_LEVELS, e.g. per minute for 24h, per hour for
+30 days, per day for 3 years. Every level stores, per bucket and meter, the
+mean / min / max in array('f') rings, plus the bucket number in an
+array('i'):
+
+- slot = bucket % size, so a write is O(1) and nothing ever grows
+- a slot whose stamp is not the expected bucket is a gap (app was closed)
+- when a bucket closes, its mean / min / max are folded into the open bucket
+  of the next level (min/max bucket downsampling: spikes survive)
+
+Meters are sampled every cfg.HISTORY_SAMPLE_SEC. update() is a float
+compare on most frames.
+
+dumps() / load() use a small binary file (header + raw arrays, including
+the open accumulators so a restart does not lose the current hour / day).
+Memory and disk size depend only on the level sizes, not on uptime.
+"""
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from array import array
+
+from . import config as cfg
+
+METERS = ("hunger", "mood", "sleepiness", "affection")
+
+_MAGIC = b"EGH1"
+# magic, byte order ('l'/'b'), level count, meter count
+_HEADER = struct.Struct("<4scBB")
+# bucket seconds, buckets kept, open bucket, open sample count
+_LEVEL_HEADER = struct.Struct("<iiiI")
+
+
+class _Level:
+    __slots__ = ("name", "step", "size", "stamp", "avg", "lo", "hi", "open_bucket", "acc_n", "acc_sum", "acc_lo", "acc_hi")
+
+    def __init__(self, name: str, step: int, size: int):
+        self.name = name
+        self.step = int(step)
+        self.size = int(size)
+        n = len(METERS)
+        self.stamp = array("i", [-1]) * self.size
+        self.avg = [array("f", [0.0]) * self.size for _ in range(n)]
+        self.lo = [array("f", [0.0]) * self.size for _ in range(n)]
+        self.hi = [array("f", [0.0]) * self.size for _ in range(n)]
+        # open (not yet closed) bucket
+        self.open_bucket = -1
+        self.acc_n = 0
+        self.acc_sum = array("d", [0.0]) * n
+        self.acc_lo = array("f", [0.0]) * n
+        self.acc_hi = array("f", [0.0]) * n
+
+    def add(self, bucket: int, avg, lo, hi, weight: int = 1):
+        """Fold one sample (or a closed bucket of the level below) into `bucket`.
+
+        Returns the closed (bucket, avg, lo, hi, n) when `bucket` starts a new
+        one, else None.
+        """
+        closed = None
+        if bucket != self.open_bucket:
+            if self.acc_n:
+                closed = self._close()
+            self.open_bucket = bucket
+            self.acc_n = 0
+            for i in range(len(METERS)):
+                self.acc_sum[i] = 0.0
+                self.acc_lo[i] = lo[i]
+                self.acc_hi[i] = hi[i]
+        self.acc_n += weight
+        for i in range(len(METERS)):
+            self.acc_sum[i] += avg[i] * weight
+            if lo[i] < self.acc_lo[i]:
+                self.acc_lo[i] = lo[i]
+            if hi[i] > self.acc_hi[i]:
+                self.acc_hi[i] = hi[i]
+        return closed
+
+    def _close(self):
+        b = self.open_bucket
+        slot = b % self.size
+        n = self.acc_n
+        avg = [s / n for s in self.acc_sum]
+        self.stamp[slot] = b
+        for i in range(len(METERS)):
+            self.avg[i][slot] = avg[i]
+            self.lo[i][slot] = self.acc_lo[i]
+            self.hi[i][slot] = self.acc_hi[i]
+        return b, avg, list(self.acc_lo), list(self.acc_hi), n
+
+    def window(self, meter: int, end_bucket: int) -> list[tuple[float, float, float] | None]:
+        """Closed buckets (end_bucket - size, end_bucket], oldest first. None = gap."""
+        out: list[tuple[float, float, float] | None] = []
+        avg, lo, hi = self.avg[meter], self.lo[meter], self.hi[meter]
+        for b in range(end_bucket - self.size + 1, end_bucket + 1):
+            slot = b % self.size
+            if self.stamp[slot] == b:
+                out.append((avg[slot], lo[slot], hi[slot]))
+            else:
+                out.append(None)
+        return out
+
+
+class MeterHistory:
+    def __init__(self, path: str = cfg.HISTORY_PATH, levels=None):
+        self.path = path
+        self.levels = [_Level(*lv) for lv in (levels or cfg.HISTORY_LEVELS)]
+        self.next_sample_at = 0.0
+        # bumped whenever a bucket closes (panel caches key on it)
+        self.version = 0
+
+    # ---- recording ----
+    def update(self, g, now: float):
+        if now < self.next_sample_at:
+            return
+        self.next_sample_at = now + float(cfg.HISTORY_SAMPLE_SEC)
+        self.record(now, [g.hunger, g.mood, g.sleepiness, float(g.affection)])
+
+    def record(self, now: float, values: list[float]):
+        sample = (values, values, values, 1)
+        for lv in self.levels:
+            closed = lv.add(int(now // lv.step), *sample)
+            if closed is None:
+                return
+            self.version += 1
+            # the next level receives the closed bucket (mean weighted by samples)
+            _, avg, lo, hi, n = closed
+            sample = (avg, lo, hi, n)
+
+    # ---- reading ----
+    def level(self, name: str) -> _Level:
+        for lv in self.levels:
+            if lv.name == name:
+                return lv
+        return self.levels[0]
+
+    def columns(self, name: str, meter: str, n: int, now: float) -> list[tuple[float, float, float] | None]:
+        """Downsample a whole level into n columns of (mean, min, max), oldest first.
+
+        The open bucket is included so the graph reaches "now".
+        """
+        lv = self.level(name)
+        mi = METERS.index(meter)
+        cur = int(now // lv.step)
+        data = lv.window(mi, cur)
+        first = cur - lv.size + 1
+        if lv.acc_n and first <= lv.open_bucket <= cur:
+            data[lv.open_bucket - first] = (lv.acc_sum[mi] / lv.acc_n, lv.acc_lo[mi], lv.acc_hi[mi])
+        n = max(1, min(int(n), len(data)))
+        out: list[tuple[float, float, float] | None] = []
+        per = len(data) / n
+        for c in range(n):
+            chunk = [d for d in data[int(c * per):int((c + 1) * per)] if d is not None]
+            if not chunk:
+                out.append(None)
+                continue
+            out.append((
+                sum(d[0] for d in chunk) / len(chunk),
+                min(d[1] for d in chunk),
+                max(d[2] for d in chunk),
+            ))
+        return out
+
+    # ---- persistence ----
+    def dumps(self) -> bytes:
+        order = b"l" if sys.byteorder == "little" else b"b"
+        parts = [_HEADER.pack(_MAGIC, order, len(self.levels), len(METERS))]
+        for lv in self.levels:
+            parts.append(_LEVEL_HEADER.pack(lv.step, lv.size, lv.open_bucket, lv.acc_n))
+            parts.append(lv.acc_sum.tobytes())
+            parts.append(lv.acc_lo.tobytes())
+            parts.append(lv.acc_hi.tobytes())
+            parts.append(lv.stamp.tobytes())
+            for arrs in (lv.avg, lv.lo, lv.hi):
+                for a in arrs:
+                    parts.append(a.tobytes())
+        return b"".join(parts)
+
+    def load(self) -> bool:
+        """Read self.path. Levels whose step / size changed in config are dropped."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            magic, order, n_levels, n_meters = _HEADER.unpack_from(data, 0)
+        except (OSError, struct.error):
+            return False
+        if magic != _MAGIC or n_meters != len(METERS):
+            return False
+        swap = order != (b"l" if sys.byteorder == "little" else b"b")
+        off = _HEADER.size
+        by_step = {(lv.step, lv.size): lv for lv in self.levels}
+        try:
+            for _ in range(n_levels):
+                step, size, open_bucket, acc_n = _LEVEL_HEADER.unpack_from(data, off)
+                off += _LEVEL_HEADER.size
+                tmp = _Level("", step, size)
+                arrays = [tmp.acc_sum, tmp.acc_lo, tmp.acc_hi, tmp.stamp, *tmp.avg, *tmp.lo, *tmp.hi]
+                for a in arrays:
+                    nbytes = len(a) * a.itemsize
+                    chunk = data[off:off + nbytes]
+                    if len(chunk) != nbytes:
+                        return False
+                    a[:] = array(a.typecode, chunk)
+                    if swap:
+                        a.byteswap()
+                    off += nbytes
+                lv = by_step.get((step, size))
+                if lv is None:
+                    continue
+                lv.stamp, lv.avg, lv.lo, lv.hi = tmp.stamp, tmp.avg, tmp.lo, tmp.hi
+                lv.acc_sum, lv.acc_lo, lv.acc_hi = tmp.acc_sum, tmp.acc_lo, tmp.acc_hi
+                lv.open_bucket, lv.acc_n = open_bucket, acc_n
+        except struct.error:
+            return False
+        self.version += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "levels": len(self.levels),
+            "buckets": sum(sum(1 for s in lv.stamp if s >= 0) for lv in self.levels),
+            "bytes": sum(
+                _LEVEL_HEADER.size + len(lv.stamp) * 4 + len(METERS) * (8 + 4 + 4 + lv.size * 3 * 4)
+                for lv in self.levels
+            ) + _HEADER.size,
+        }
@@ -0,0 +1,190 @@
+"""hotreload.py
+Incremental asset hot reload (sprites / clothes offsets / backgrounds).
+
+Dialogue / Topics / Snacks reload their JSON via load_if_needed(). Sprites
+used to change only on restart. AssetHotReload watches the mtime of every
+sprite source file and re-decodes only the entries whose file changed,
+patching the live sprites / clothes_offsets dicts in place so render.py and
+the menus see the new surfaces on the next frame.
+
+- Built-in character: per file (assets/img, assets/sprite split PNGs,
+  atlas.png/atlas_map.json, clothes/offsets.json)
+- Character packs: any change under the pack folder reloads that pack
+  (an atlas pack is a single image anyway)
+- Backgrounds: delegated to BackgroundCache.reload_changed()
+
+Checks are throttled to cfg.ASSET_RELOAD_INTERVAL_SEC.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+
+import pygame
+
+from . import config as cfg
+from . import pak
+from .assets import (
+    BackgroundCache,
+    legacy_img_files,
+    split_sprite_files,
+    load_atlas_sprites,
+    load_clothes_offsets,
+    load_image,
+    scale_nearest,
+)
+from .characters import CharacterRegistry
+
+
+@dataclass
+class ReloadReport:
+    sprites: set[str] = field(default_factory=set)      # changed / removed sprite keys
+    offsets: bool = False                                # clothes_offsets was patched
+    backgrounds: set[str] = field(default_factory=set)  # changed / added / removed bg ids
+
+    def __bool__(self) -> bool:
+        return bool(self.sprites or self.offsets or self.backgrounds)
+
+
+class AssetHotReload:
+    def __init__(
+        self,
+        sprites: dict[str, pygame.Surface],
+        clothes_offsets: dict[str, tuple[int, int]],
+        registry: CharacterRegistry,
+        bg_cache: BackgroundCache | None = None,
+        scale: int = 3,
+        character: str = cfg.DEFAULT_CHARACTER,
+        interval: float = cfg.ASSET_RELOAD_INTERVAL_SEC,
+    ):
+        self.sprites = sprites
+        self.clothes_offsets = clothes_offsets
+        self.registry = registry
+        self.bg_cache = bg_cache
+        self.scale = scale
+        self.interval = float(interval)
+        self.next_check_at = 0.0
+        self.character = character
+        # watched path -> mtime
+        self.mtimes: dict[str, float] = {}
+        # sprite key -> single-file source (built-in character only)
+        self.files: dict[str, str] = {}
+        self.reset(character)
+
+    # ---- bookkeeping ----
+    def reset(self, character: str):
+        """Re-snapshot mtimes (call after switching characters)."""
+        self.character = character
+        self.files = self._file_map()
+        self.mtimes = self._scan()
+
+    def _assets_root(self) -> str:
+        return os.path.dirname(cfg.IMG_DIR)
+
+    def _atlas_paths(self) -> tuple[str, str]:
+        d = os.path.join(self._assets_root(), "sprite")
+        return os.path.join(d, "atlas.png"), os.path.join(d, "atlas_map.json")
+
+    def _offsets_path(self) -> str:
+        pack = self.registry.get(self.character)
+        if pack is not None:
+            return os.path.join(pack.path, "clothes", "offsets.json")
+        return os.path.join(self._assets_root(), "sprite", "clothes", "offsets.json")
+
+    def _file_map(self) -> dict[str, str]:
+        if self.registry.get(self.character) is not None:
+            return {}
+        return {**legacy_img_files(), **split_sprite_files()}
+
+    def _watched_paths(self) -> list[str]:
+        pack = self.registry.get(self.character)
+        if pack is None:
+            return [*self.files.values(), *self._atlas_paths(), self._offsets_path()]
+        out: list[str] = []
+        if pak.isdir(pack.path):
+            for fn in pak.listdir(pack.path):
+                p = os.path.join(pack.path, fn)
+                if pak.isdir(p):
+                    out.extend(os.path.join(p, c) for c in pak.listdir(p))
+                else:
+                    out.append(p)
+        return out
+
+    def _scan(self) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for p in self._watched_paths():
+            try:
+                out[p] = pak.getmtime(p)
+            except Exception:
+                continue
+        return out
+
+    # ---- polling ----
+    def poll(self, now: float) -> ReloadReport:
+        report = ReloadReport()
+        if now < self.next_check_at:
+            return report
+        self.next_check_at = now + self.interval
+
+        if self.bg_cache is not None:
+            report.backgrounds = self.bg_cache.reload_changed()
+
+        old_files = self.files
+        self.files = self._file_map()
+        cur = self._scan()
+        changed = {p for p, m in cur.items() if self.mtimes.get(p) != m}
+        changed |= {p for p in self.mtimes if p not in cur}
+        self.mtimes = cur
+        if not changed:
+            return report
+
+        if self.registry.get(self.character) is not None:
+            self._reload_pack(report)
+        else:
+            self._reload_builtin(changed, old_files, report)
+        return report
+
+    def _put(self, key: str, raw: pygame.Surface, report: ReloadReport):
+        self.sprites[key] = scale_nearest(raw, self.scale)
+        report.sprites.add(key)
+
+    def _reload_builtin(self, changed: set[str], old_files: dict[str, str], report: ReloadReport):
+        atlas = None
+        if any(p in changed for p in self._atlas_paths()):
+            # single files win over atlas slots (same resolution as load_sprites)
+            atlas = load_atlas_sprites(self._assets_root(), skip=self.files.keys())
+            for k, v in atlas.items():
+                self._put(k, v, report)
+
+        for k, p in self.files.items():
+            if p in changed or old_files.get(k) != p:
+                try:
+                    self._put(k, load_image(p), report)
+                except Exception:
+                    continue
+
+        # a split file was removed: fall back to the atlas slot, or drop the key
+        for k in old_files.keys() - self.files.keys():
+            if atlas is None:
+                atlas = load_atlas_sprites(self._assets_root(), skip=self.files.keys())
+            if k in atlas:
+                self._put(k, atlas[k], report)
+            else:
+                self.sprites.pop(k, None)
+                report.sprites.add(k)
+
+        if self._offsets_path() in changed:
+            self.clothes_offsets.clear()
+            self.clothes_offsets.update(load_clothes_offsets(scale=self.scale))
+            report.offsets = True
+
+    def _reload_pack(self, report: ReloadReport):
+        new_sprites, new_offsets = self.registry.load(self.character, scale=self.scale)
+        if not new_sprites:
+            return
+        report.sprites = set(self.sprites.keys()) | set(new_sprites.keys())
+        self.sprites.clear()
+        self.sprites.update(new_sprites)
+        self.clothes_offsets.clear()
+        self.clothes_offsets.update(new_offsets)
+        report.offsets = True
@@ -6,15 +6,18 @@ from __future__ import annotations
 import os
 import pygame
 
+from . import pak
+
 
 def load_image(path: str) -> pygame.Surface:
-    """Load an image with alpha. Raises if pygame can't load it."""
-    return pygame.image.load(path).convert_alpha()
+    """Load an image with alpha (from a mounted .pak if present). Raises if pygame can't load it."""
+    with pak.open(path) as f:
+        return pygame.image.load(f, os.path.basename(path)).convert_alpha()
 
 
 def safe_load_image(path: str, fallback_size: tuple[int,int]=(64,64)) -> pygame.Surface:
     """Load image if exists, otherwise return transparent placeholder."""
-    if not os.path.exists(path):
+    if not pak.isfile(path):
         return pygame.Surface(fallback_size, pygame.SRCALPHA)
     try:
         return load_image(path)
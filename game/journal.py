@@ -1,24 +1,195 @@
+"""journal.py
+Append-only conversation journal (journal.jsonl), kept out of save.json.
+
+File format: one JSON object per line.
+  {"topic": 3, "id": "cafe", "title": "カフェの話"}   topic definition (interned)
+  {"t": 1700000000.0, "text": "...", "topic": 3}      entry ("topic" optional)
+
+- Topic ids/titles are written once per segment and referenced by number.
+- When the live file grows past cfg.JOURNAL_SEGMENT_BYTES it is gzipped to
+  journal.NNNN.jsonl.gz and a new segment starts. Every segment carries its
+  own topic table, so any segment can be read alone. Nothing is deleted
+  unless cfg.JOURNAL_MAX_SEGMENTS is set.
+- Only the newest cfg.JOURNAL_MEMORY entries are kept in memory (a deque);
+  render.py reads them through g.rt.journal. Entries keep the old dict shape
+  ({"t", "text", "topic_id", "topic_title"}).
+"""
 from __future__ import annotations
-import time
+
+import gzip
+import json
+import os
+import re
+from collections import deque
 from typing import Any
 
-from .model import Girl
-
-MAX_LOG = 120
-
-def add_log(g: Girl, text: str, topic_id: str | None = None, topic_title: str | None = None):
-    entry: dict[str, Any] = {
-        "t": time.time(),
-        "text": text,
-    }
-    if topic_id:
-        entry["topic_id"] = topic_id
-    if topic_title:
-        entry["topic_title"] = topic_title
-
-    if not hasattr(g, "journal") or g.journal is None:
-        g.journal = []
-    g.journal.append(entry)
-    # 上限
-    if len(g.journal) > MAX_LOG:
-        g.journal = g.journal[-MAX_LOG:]
+from . import config as cfg
+from .clock import clock
+
+
+def _segment_name(base: str, n: int) -> str:
+    root, ext = os.path.splitext(base)
+    return f"{root}.{n:04d}{ext}.gz"
+
+
+class JournalLog:
+    def __init__(self, path: str = cfg.JOURNAL_PATH, memory: int = cfg.JOURNAL_MEMORY):
+        self.path = path
+        self.entries: deque[dict[str, Any]] = deque(maxlen=max(1, int(memory)))
+        # (topic_id, title) -> number, for the live segment
+        self._topic_ids: dict[tuple[str, str], int] = {}
+        self._file = None
+        self.load()
+
+    # ---- segments ----
+    def _segments(self) -> list[tuple[int, str]]:
+        d = os.path.dirname(self.path) or "."
+        root, ext = os.path.splitext(os.path.basename(self.path))
+        pat = re.compile(re.escape(root) + r"\.(\d+)" + re.escape(ext) + r"\.gz$")
+        out = []
+        try:
+            names = os.listdir(d)
+        except OSError:
+            return []
+        for fn in names:
+            m = pat.match(fn)
+            if m:
+                out.append((int(m.group(1)), os.path.join(d, fn)))
+        return sorted(out)
+
+    @staticmethod
+    def _parse(lines) -> tuple[list[dict[str, Any]], dict[int, tuple[str, str]]]:
+        """Entries in file order + the segment's topic table."""
+        topics: dict[int, tuple[str, str]] = {}
+        out: list[dict[str, Any]] = []
+        for raw in lines:
+            try:
+                rec = json.loads(raw)
+                if not isinstance(rec, dict):
+                    continue
+                if "id" in rec and "topic" in rec and "text" not in rec:
+                    topics[int(rec["topic"])] = (str(rec["id"]), str(rec.get("title", "")))
+                    continue
+                ent: dict[str, Any] = {"t": float(rec.get("t", 0.0)), "text": str(rec.get("text", ""))}
+                num = int(rec["topic"]) if "topic" in rec else None
+            except Exception:
+                continue  # torn last line after a crash, or a hand-edited record
+            if num in topics:
+                tid, title = topics[num]
+                ent["topic_id"] = tid
+                if title:
+                    ent["topic_title"] = title
+            out.append(ent)
+        return out, topics
+
+    def load(self):
+        """Fill the in-memory tail (live segment first, then older ones if needed)."""
+        self.entries.clear()
+        self._topic_ids = {}
+        chunks: list[list[dict[str, Any]]] = []
+        need = self.entries.maxlen
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                part, topics = self._parse(f)
+            chunks.append(part)
+            # new entries in the live segment reuse its topic numbers
+            self._topic_ids = {v: k for k, v in topics.items()}
+        have = sum(len(c) for c in chunks)
+        for _, seg in reversed(self._segments()):
+            if have >= need:
+                break
+            try:
+                with gzip.open(seg, "rt", encoding="utf-8") as f:
+                    part, _ = self._parse(f)
+            except Exception:
+                continue
+            chunks.append(part)
+            have += len(part)
+        for part in reversed(chunks):
+            self.entries.extend(part)
+
+    def _open(self):
+        if self._file is None:
+            self._drop_torn_tail()
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _drop_torn_tail(self):
+        """Cut a partial last line (crash mid-write) so the next record starts on its own line."""
+        try:
+            f = open(self.path, "rb+")
+        except OSError:
+            return
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                if pos == end and chunk.endswith(b"\n"):
+                    return
+                nl = chunk.rfind(b"\n")
+                if nl >= 0:
+                    f.truncate(pos - step + nl + 1)
+                    return
+                pos -= step
+            f.truncate(0)
+
+    def _write(self, rec: dict):
+        f = self._open()
+        f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _rotate(self):
+        self.close()
+        segs = self._segments()
+        n = (segs[-1][0] + 1) if segs else 1
+        with open(self.path, "rb") as src, gzip.open(_segment_name(self.path, n), "wb") as dst:
+            dst.write(src.read())
+        os.remove(self.path)
+        self._topic_ids = {}
+        keep = int(cfg.JOURNAL_MAX_SEGMENTS or 0)
+        if keep > 0:
+            for _, old in self._segments()[:-keep]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    # ---- API ----
+    def add(self, text: str, topic_id: str | None = None, topic_title: str | None = None, now: float | None = None):
+        ent: dict[str, Any] = {"t": clock.time() if now is None else float(now), "text": text}
+        rec: dict[str, Any] = dict(ent)
+        if topic_id:
+            ent["topic_id"] = topic_id
+            if topic_title:
+                ent["topic_title"] = topic_title
+            key = (str(topic_id), str(topic_title or ""))
+            num = self._topic_ids.get(key)
+            if num is None:
+                num = max(self._topic_ids.values(), default=0) + 1
+                self._topic_ids[key] = num
+                self._write({"topic": num, "id": key[0], "title": key[1]})
+            rec["topic"] = num
+        self._write(rec)
+        self._file.flush()
+        self.entries.append(ent)
+        if self._file.tell() >= int(cfg.JOURNAL_SEGMENT_BYTES):
+            self._rotate()
+
+    def import_legacy(self, entries) -> int:
+        """Move an old save.json "journal" list into the log (first run only)."""
+        if not entries or os.path.exists(self.path) or self._segments():
+            return 0
+        n = 0
+        for e in entries:
+            if not isinstance(e, dict):
+                continue
+            self.add(str(e.get("text", "")), e.get("topic_id"), e.get("topic_title"), now=float(e.get("t", 0.0)))
+            n += 1
+        return n
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
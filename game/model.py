@@ -1,19 +1,30 @@
 """Persistent model.
 
-Everything in the Girl dataclass is serialised to save.json.
+Every Girl field except `rt` is serialised to the save files:
+save.json is a manifest naming the shards (save.hot.json for meters /
+timers / position, save.settings.json, save.progress.json). See SAVE_SHARDS.
 
 Rule of thumb:
   - Add new fields with sensible defaults.
-  - Never remove/rename fields lightly (older saves will break).
+  - Never remove/rename fields lightly; if you must, bump SCHEMA_VERSION and
+    add a migration step (see MIGRATIONS) so older saves are upgraded at load.
   - Prefer booleans/strings for "state" and small numbers for meters.
+  - Fields that only change on user actions belong in a cold shard
+    (SAVE_SHARDS); anything else is written with the 5-second autosave.
+  - UI rects, caches and transient timers go in RuntimeState (g.rt), never
+    as ad hoc attributes: both classes are slotted, so a typo or a new
+    attribute raises AttributeError instead of silently riding along.
 """
 
 from __future__ import annotations
+import copy
 import json
 import os
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
+from typing import Any
 
 from . import config as cfg
+from .scheduler import Scheduler
 
 
 def clamp(x, a=0, b=100):
@@ -21,7 +32,40 @@ def clamp(x, a=0, b=100):
     return max(a, min(b, x))
 
 
-@dataclass
+@dataclass(slots=True)
+class RuntimeState:
+    """Per-session state hung off g.rt. Not saved, not compared."""
+    # speech bubble (render.py fills these, click handlers read them)
+    line_page: int = 0
+    bubble_rect: Any = None
+    bubble_pages: int = 0
+
+    # custom menu (custom_menu.py)
+    ui_mode: str = "main"          # "main" | "custom"
+    custom_tab: str = "clothes"    # "clothes" | "bg" | "char"
+    custom_scroll_bg: int = 0
+    custom_scroll_char: int = 0
+    custom_scroll_clothes: int = 0
+    custom_btns: dict = field(default_factory=dict)
+    custom_scroll_btns: dict = field(default_factory=dict)
+    custom_item_rects: list = field(default_factory=list)
+    custom_bg_thumbs: dict = field(default_factory=dict)
+    custom_char_ids: list = field(default_factory=list)
+    clothes_offsets: dict = field(default_factory=dict)
+    outfits: list = field(default_factory=list)
+
+    # timed behaviours (blink / line end / idle beat / state / sleep stage ...), see scheduler.py
+    timers: Scheduler = field(default_factory=Scheduler)
+
+    # fixed-step simulation: x before the last step + progress to the next one
+    x_prev: float = 0.0
+    sim_alpha: float = 1.0
+
+    # newest journal entries (journal.JournalLog.entries)
+    journal: Any = ()
+
+
+@dataclass(slots=True)
 class Girl:
     hunger: float = 80.0
     mood: float = 70.0
@@ -62,7 +106,7 @@ class Girl:
 
     unlocked_topics: list[str] = field(default_factory=list)
     flags: dict[str, bool] = field(default_factory=dict)
-    journal: list[dict] = field(default_factory=list)
+    # (journal lives in journal.jsonl, see journal.py)
 
     # NEW: 解放直後マーク（topic id のリスト）
     new_topics: list[str] = field(default_factory=list)
@@ -87,6 +131,11 @@ class Girl:
     # clothes
     outfit: str = "normal"
 
+    # character pack (assets/characters/<id>, or the built-in one)
+    character: str = cfg.DEFAULT_CHARACTER
+    # companion packs in the room (game/companions.py; only the ids are saved)
+    companions: list[str] = field(default_factory=list)
+
     # snacks
     last_snack_id: str = ""
     last_snack_at: float = 0.0
@@ -103,20 +152,200 @@ class Girl:
     # 1 = right (default sprite direction), -1 = left (render-time flip)
     facing: int = 1
 
+    # not persisted (see RuntimeState)
+    rt: RuntimeState = field(default_factory=RuntimeState, repr=False, compare=False)
 
-def load_or_new() -> Girl:
-    if os.path.exists(cfg.SAVE_PATH):
+
+SAVE_FIELDS: tuple[str, ...] = tuple(f.name for f in fields(Girl) if f.name != "rt")
+_SCALARS = (bool, int, float, str)
+
+
+def save_dict(g: Girl) -> dict:
+    """asdict() for the persisted fields only (deep copy, g.rt left out)."""
+    out = {}
+    for name in SAVE_FIELDS:
+        v = getattr(g, name)
+        out[name] = v if isinstance(v, _SCALARS) else copy.deepcopy(v)
+    return out
+
+
+# ---- sharded save files ----
+# save.json is a small manifest; the fields live in shard files next to it.
+# Cold shards change only on user actions and are rewritten only then;
+# everything not listed here (meters, timers, position, face) is "hot".
+SAVE_SHARDS: dict[str, tuple[str, ...]] = {
+    "settings": (
+        "bg_index", "bg_mode", "bg_image_id",
+        "sfx_muted", "sfx_scale",
+        "borderless", "dock_bottom_right", "always_on_top",
+        "character", "outfit", "companions",
+    ),
+    "progress": (
+        "affection", "first_seen", "last_auto_day",
+        "unlocked_topics", "flags", "new_topics",
+        "active_topic", "seq_index", "pending_yes", "pending_no", "pending_flag", "awaiting_choice",
+        "last_snack_id", "last_snack_at", "snack_count",
+    ),
+}
+HOT_SHARD = "hot"
+MANIFEST_VERSION = 1
+
+# Shape of the saved fields. Saves written before versioning have none (0).
+SCHEMA_VERSION = 1
+
+
+def shard_path(path: str, name: str) -> str:
+    """save.json + "hot" -> save.hot.json"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{name}{ext}"
+
+
+def split_save(data: dict) -> dict[str, dict]:
+    """Flat save dict -> {shard name: fields}. Unlisted keys go to the hot shard."""
+    out: dict[str, dict] = {HOT_SHARD: {}}
+    owner = {k: name for name, keys in SAVE_SHARDS.items() for k in keys}
+    for name in SAVE_SHARDS:
+        out[name] = {}
+    for k, v in data.items():
+        out[owner.get(k, HOT_SHARD)][k] = v
+    return out
+
+
+def manifest_for(path: str) -> dict:
+    names = [HOT_SHARD, *SAVE_SHARDS]
+    return {
+        "manifest": MANIFEST_VERSION,
+        "schema_version": SCHEMA_VERSION,
+        "shards": {n: os.path.basename(shard_path(path, n)) for n in names},
+    }
+
+
+def _read_json(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def read_save(path: str = cfg.SAVE_PATH) -> dict | None:
+    """Parse the save once. None if missing or unreadable.
+
+    save.json is either a manifest (shards are read and merged into one flat
+    dict) or an old single-file save, which is returned as is and gets split
+    into shards on the next write.
+
+    main() reads window preferences (borderless / dock) from this dict before
+    the window exists, then builds the Girl from the same dict.
+    """
+    data = _read_json(path)
+    if data is None or "manifest" not in data:
+        return data
+    merged: dict = {"schema_version": data.get("schema_version", 0)}
+    d = os.path.dirname(path)
+    for fn in (data.get("shards") or {}).values():
+        # a missing / broken shard just falls back to Girl defaults for its fields
+        part = _read_json(os.path.join(d, str(fn)))
+        if part:
+            merged.update(part)
+    return merged if len(merged) > 1 else None
+
+
+# ---- schema migrations ----
+_SLEEP_STAGES = ("awake", "drowsy", "sleep")
+
+
+def _migrate_0_to_1(data: dict) -> dict:
+    """Unversioned saves: fill fields added over time, coerce types, clamp enums.
+
+    Older saves predate the sleep system, wandering, facing, character packs
+    etc.; the runtime code used to paper over that with getattr() on every
+    frame. After this step every field exists with the type of its default.
+    """
+    defaults = save_dict(Girl())
+    for k, dv in defaults.items():
+        if k not in data or data[k] is None:
+            data[k] = dv
+            continue
+        v = data[k]
+        try:
+            if isinstance(dv, bool):
+                data[k] = bool(v)
+            elif isinstance(dv, int):
+                data[k] = int(v)
+            elif isinstance(dv, float):
+                data[k] = float(v)
+            elif isinstance(dv, str):
+                data[k] = str(v)
+            elif isinstance(dv, list):
+                data[k] = [str(x) for x in v] if isinstance(v, list) else dv
+            elif isinstance(dv, dict):
+                data[k] = {str(a): bool(b) for a, b in v.items()} if isinstance(v, dict) else dv
+        except (TypeError, ValueError):
+            data[k] = dv
+    if data["sleep_stage"] not in _SLEEP_STAGES:
+        data["sleep_stage"] = "awake"
+    if data["facing"] not in (1, -1):
+        data["facing"] = 1
+    return data
+
+
+# from version -> step that returns the data at version + 1
+MIGRATIONS = {
+    0: _migrate_0_to_1,
+}
+
+
+def migrate(data: dict) -> dict:
+    """Upgrade a flat save dict (any version) to SCHEMA_VERSION."""
+    version = int(data.get("schema_version", 0) or 0)
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    data["schema_version"] = version
+    return data
+
+
+def girl_from_save(data: dict | None) -> Girl:
+    if data:
         try:
-            with open(cfg.SAVE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            base = asdict(Girl())
-            base.update(data)
+            data = migrate(dict(data))
+            base = save_dict(Girl())
+            # unknown keys (e.g. the old "journal" list, schema_version) are ignored
+            base.update({k: v for k, v in data.items() if k in base})
             return Girl(**base)
         except Exception:
             pass
     return Girl()
 
 
-def save(g: Girl):
-    with open(cfg.SAVE_PATH, "w", encoding="utf-8") as f:
-        json.dump(asdict(g), f, ensure_ascii=False, indent=2)
+def load_or_new() -> Girl:
+    return girl_from_save(read_save())
+
+
+def dumps_save(data: dict, compact: bool = False) -> bytes:
+    """Serialized shard / manifest contents (compact for the hot shard)."""
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def write_atomic(path: str, data: bytes):
+    """temp file -> fsync -> rename. A crash mid-write leaves the old file intact."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def save(g: Girl, path: str = cfg.SAVE_PATH):
+    """Synchronous save of every shard. The main loop goes through autosave.AutoSaver instead."""
+    for name, part in split_save(save_dict(g)).items():
+        write_atomic(shard_path(path, name), dumps_save(part, compact=(name == HOT_SHARD)))
+    # manifest last: an old single-file save.json stays valid until every shard exists
+    write_atomic(path, dumps_save(manifest_for(path)))
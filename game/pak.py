@@ -0,0 +1,244 @@
+"""pak.py
+Single-file asset archive (.pak) + tiny virtual filesystem.
+
+Format (little-endian):
+  header : b"EGPK", u16 version, u16 reserved, u32 count
+  index  : count x (u16 name_len, name utf-8, u64 offset, u64 length, 16B blake2b)
+  data   : member bytes (offsets are absolute)
+
+Member names are posix paths relative to the project root
+("assets/sprite/atlas.png"), i.e. the same strings config.py builds.
+
+At runtime the archive is opened with mmap and members are read through
+file-like views over the mapping (no per-file open/stat). The loose folder
+layout stays as a fallback: every helper here checks mounted archives
+first, then the real filesystem. Build archives with tools/build_pak.py.
+
+This module is stdlib-only so tools can use it without pygame.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import os
+import struct
+
+MAGIC = b"EGPK"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHI")
+_NAME_LEN = struct.Struct("<H")
+_ENTRY = struct.Struct("<QQ16s")
+
+
+def _digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def norm_name(path: str) -> str:
+    """Normalise a path to an archive member name."""
+    p = os.path.normpath(path).replace("\\", "/")
+    while p.startswith("./"):
+        p = p[2:]
+    return p
+
+
+class _MemberReader(io.RawIOBase):
+    """Read-only, seekable file object over a memoryview (no intermediate copy)."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, int(offset))
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+class PakArchive:
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._file = io.open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        # name -> (offset, length, digest)
+        self.index: dict[str, tuple[int, int, bytes]] = {}
+        # dir name -> child names (files and subdirs)
+        self.dirs: dict[str, set[str]] = {}
+        self._read_index()
+
+    def _read_index(self):
+        mm = self._mm
+        magic, version, _, count = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a pak v{VERSION}: {self.path}")
+        pos = _HEADER.size
+        for _ in range(count):
+            (nlen,) = _NAME_LEN.unpack_from(mm, pos)
+            pos += _NAME_LEN.size
+            name = bytes(mm[pos:pos + nlen]).decode("utf-8")
+            pos += nlen
+            offset, length, digest = _ENTRY.unpack_from(mm, pos)
+            pos += _ENTRY.size
+            self.index[name] = (offset, length, digest)
+
+            child = name
+            parent = os.path.dirname(child)
+            while parent:
+                self.dirs.setdefault(parent, set()).add(os.path.basename(child))
+                child, parent = parent, os.path.dirname(parent)
+
+    def has(self, name: str) -> bool:
+        return name in self.index
+
+    def view(self, name: str) -> memoryview:
+        offset, length, _ = self.index[name]
+        return memoryview(self._mm)[offset:offset + length]
+
+    def open(self, name: str) -> _MemberReader:
+        return _MemberReader(self.view(name))
+
+    def verify(self, name: str) -> bool:
+        with self.view(name) as v:
+            return _digest(v) == self.index[name][2]
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            # members still referenced; the mapping goes away with the process
+            return
+        self._file.close()
+
+
+def write_pak(out_path: str, files: list[tuple[str, str]]) -> int:
+    """Write an archive. files: [(member_name, source_path), ...]. Returns member count."""
+    entries = []
+    for name, src in files:
+        with io.open(src, "rb") as f:
+            data = f.read()
+        entries.append((norm_name(name).encode("utf-8"), data))
+
+    header_size = _HEADER.size + sum(_NAME_LEN.size + len(n) + _ENTRY.size for n, _ in entries)
+    tmp = out_path + ".tmp"
+    with io.open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(entries)))
+        offset = header_size
+        for name, data in entries:
+            f.write(_NAME_LEN.pack(len(name)))
+            f.write(name)
+            f.write(_ENTRY.pack(offset, len(data), _digest(data)))
+            offset += len(data)
+        for _, data in entries:
+            f.write(data)
+    os.replace(tmp, out_path)
+    return len(entries)
+
+
+# ------------------------------------------------------------
+# virtual filesystem (mounted archives first, loose files second)
+# ------------------------------------------------------------
+_mounted: list[PakArchive] = []
+
+
+def mount(path: str) -> bool:
+    """Mount an archive if it exists and is valid. Returns True if mounted."""
+    if not os.path.isfile(path):
+        return False
+    try:
+        _mounted.append(PakArchive(path))
+    except Exception:
+        return False
+    return True
+
+
+def unmount_all():
+    while _mounted:
+        _mounted.pop().close()
+
+
+def mounted() -> list[PakArchive]:
+    return list(_mounted)
+
+
+def _find(path: str) -> tuple[PakArchive, str] | None:
+    if not _mounted:
+        return None
+    name = norm_name(path)
+    for a in _mounted:
+        if name in a.index:
+            return a, name
+    return None
+
+
+def exists(path: str) -> bool:
+    return isfile(path) or isdir(path)
+
+
+def isfile(path: str) -> bool:
+    if _find(path):
+        return True
+    return os.path.isfile(path)
+
+
+def isdir(path: str) -> bool:
+    if _mounted:
+        name = norm_name(path)
+        if any(name in a.dirs for a in _mounted):
+            return True
+    return os.path.isdir(path)
+
+
+def listdir(path: str) -> list[str]:
+    if _mounted:
+        name = norm_name(path)
+        for a in _mounted:
+            if name in a.dirs:
+                return sorted(a.dirs[name])
+    return os.listdir(path)
+
+
+def getmtime(path: str) -> float:
+    hit = _find(path)
+    if hit:
+        return hit[0].mtime
+    return os.path.getmtime(path)
+
+
+def open(path: str, mode: str = "rb", encoding: str = "utf-8"):
+    """Open a file for reading ("rb" or "r"). Works as a context manager."""
+    hit = _find(path)
+    if hit is None:
+        return io.open(path, mode, encoding=None if "b" in mode else encoding)
+    raw = hit[0].open(hit[1])
+    if "b" in mode:
+        return raw
+    return io.TextIOWrapper(io.BufferedReader(raw), encoding=encoding)
@@ -0,0 +1,121 @@
+"""profiler.py
+Startup profiler for `python main.py --profile-startup [--profile-json out.json]`.
+
+- ImportTimer: `-X importtime` style module costs (self / cumulative) for
+  every first-time import, measured by wrapping builtins.__import__.
+  Installed by main.py before `import pygame` so pygame and game.* count.
+- write_report(): prints the StartupPipeline phases (wall vs CPU time) and
+  the slowest imports, and optionally writes the same data as JSON so runs
+  can be compared release to release.
+
+stdlib only (it is imported before pygame).
+"""
+from __future__ import annotations
+
+import builtins
+import importlib.util
+import json
+import platform
+import sys
+import time
+
+
+class ImportTimer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        # (module, self sec, cumulative sec, depth)
+        self.records: list[tuple[str, float, float, int]] = []
+        self._stack: list[float] = []   # children cumulative per open import
+        self._orig = None
+        self.phase_ms: tuple[float, float] | None = None  # (wall, cpu) of the import phase
+
+    def install(self) -> "ImportTimer":
+        if self._orig is None:
+            self._orig = builtins.__import__
+            builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._orig is not None:
+            builtins.__import__ = self._orig
+            self._orig = None
+
+    def end_phase(self) -> tuple[float, float]:
+        """Close the module-level import phase. Returns (wall ms, cpu ms)."""
+        self.phase_ms = (
+            (time.perf_counter() - self.t0) * 1000.0,
+            (time.process_time() - self.cpu0) * 1000.0,
+        )
+        return self.phase_ms
+
+    @staticmethod
+    def _resolve(name: str, globals, level: int) -> str:
+        if level == 0:
+            return name
+        try:
+            g = globals or {}
+            package = g.get("__package__") or g.get("__name__", "").rpartition(".")[0]
+            return importlib.util.resolve_name("." * level + name, package)
+        except Exception:
+            return name
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        full = self._resolve(name, globals, level)
+        if full in sys.modules:
+            return self._orig(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        t0 = time.perf_counter()
+        try:
+            return self._orig(name, globals, locals, fromlist, level)
+        finally:
+            cum = time.perf_counter() - t0
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cum
+            self.records.append((full, cum - children, cum, len(self._stack)))
+
+    def top(self, n: int = 15) -> list[tuple[str, float, float, int]]:
+        return sorted(self.records, key=lambda r: r[2], reverse=True)[:n]
+
+
+def _phases(startup) -> list[dict]:
+    return [
+        {"name": name, "wall_ms": round(ms, 3), "cpu_ms": round(cpu, 3), "end_ms": round(end, 3), "ok": ok}
+        for name, ms, cpu, end, ok in startup.report
+    ]
+
+
+def write_report(startup, timer: ImportTimer | None = None, json_path: str | None = None, out=None):
+    out = out or sys.stdout
+    print("== startup profile ==", file=out)
+    print(f"{'phase':<14} {'wall ms':>9} {'cpu ms':>9} {'@ ms':>9}", file=out)
+    for p in _phases(startup):
+        flag = "" if p["ok"] else "  (failed)"
+        print(f"{p['name']:<14} {p['wall_ms']:9.1f} {p['cpu_ms']:9.1f} {p['end_ms']:9.1f}{flag}", file=out)
+    print(startup.summary(), file=out)
+
+    imports = []
+    if timer is not None:
+        print("", file=out)
+        print("import time: self [us] | cumulative | imported package", file=out)
+        for mod, self_s, cum_s, depth in timer.top():
+            print(f"import time: {self_s * 1e6:9.0f} | {cum_s * 1e6:10.0f} | {'  ' * depth}{mod}", file=out)
+        imports = [
+            {"module": mod, "self_us": round(self_s * 1e6), "cumulative_us": round(cum_s * 1e6), "depth": depth}
+            for mod, self_s, cum_s, depth in timer.records
+        ]
+
+    if json_path:
+        data = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "first_frame_ms": startup.milestone_ms("first_frame"),
+            "all_loaded_ms": startup.milestone_ms("all_loaded"),
+            "phases": _phases(startup),
+            "imports": imports,
+        }
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"wrote {json_path}", file=out)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from .clock import clock
 from .custom_menu import draw_top_buttons, draw_custom_menu
 import pygame
 import time
 import math
 import re
+from collections import OrderedDict
 
 
 def _wrap_text_to_lines(text: str, font: pygame.font.Font, max_w: int) -> list[str]:
@@ -37,7 +39,166 @@ def _paginate_lines(lines: list[str], max_lines: int) -> list[list[str]]:
 from .model import Girl
 from . import config as cfg
 
-_FLIP_CACHE: dict[tuple[int, bool, bool], pygame.Surface] = {}
+# Composited (and flipped) character frames: one LRU per character pack
+# (her pack and each companion's), each bounded by COMPOSITE_CACHE_MAX, so
+# packs never evict each other's poses however many companions are in the
+# room. The key is the ids of the part surfaces + offsets + flip. Each entry
+# keeps its parts alive, so an id cannot be reused by another surface while
+# it is cached. When a pack is switched, hot-reloaded or sent home, main.py
+# calls clear_composites(pack) so its old parts are freed right away.
+_COMPOSITES: dict[str, OrderedDict[tuple, tuple[pygame.Surface, tuple[int, int], tuple]]] = {}
+_COMPOSITE_STATS = {"hits": 0, "misses": 0}
+
+
+def clear_composites(pack: str | None = None) -> None:
+    """Drop the cached frames of one pack (or of all packs), and with them the old part surfaces."""
+    if pack is None:
+        _COMPOSITES.clear()
+    else:
+        _COMPOSITES.pop(pack, None)
+
+
+def composite_stats() -> dict:
+    return dict(_COMPOSITE_STATS, packs=len(_COMPOSITES), frames=sum(len(c) for c in _COMPOSITES.values()))
+
+
+def _compose(pack: str, body: pygame.Surface, layers: list[tuple[pygame.Surface, int, int]], flip_x: bool) -> tuple[pygame.Surface, tuple[int, int]]:
+    """body + layers (surface, dx, dy from the centre) on a 2x canvas, flipped once.
+
+    Returns (frame, top-left relative to the centre): the frame is cropped to
+    its opaque pixels, so drawing it blits only what is visible.
+    """
+    cache = _COMPOSITES.get(pack)
+    if cache is None:
+        cache = _COMPOSITES[pack] = OrderedDict()
+    key = (id(body), tuple((id(s), dx, dy) for s, dx, dy in layers), flip_x)
+    hit = cache.get(key)
+    if hit is not None:
+        cache.move_to_end(key)
+        _COMPOSITE_STATS["hits"] += 1
+        return hit[0], hit[1]
+    _COMPOSITE_STATS["misses"] += 1
+
+    bw, bh = body.get_size()
+    # Generous transparent canvas so offsets don't clip.
+    char = pygame.Surface((bw * 2, bh * 2), pygame.SRCALPHA)
+    center = (char.get_width() // 2, char.get_height() // 2)
+    char.blit(body, body.get_rect(center=center))
+    for surf, dx, dy in layers:
+        char.blit(surf, surf.get_rect(center=(center[0] + dx, center[1] + dy)))
+    # Final flip applied ONCE to the composed character.
+    if flip_x:
+        char = pygame.transform.flip(char, True, False)
+    box = char.get_bounding_rect()
+    if box.w == 0 or box.h == 0:
+        box = pygame.Rect(center, (1, 1))
+    frame = char.subsurface(box).copy()
+    if pygame.display.get_surface() is not None:
+        frame = frame.convert_alpha()
+    topleft = (box.x - center[0], box.y - center[1])
+
+    cache[key] = (frame, topleft, (body, layers))
+    while len(cache) > int(cfg.COMPOSITE_CACHE_MAX):
+        cache.popitem(last=False)
+    return frame, topleft
+
+
+def _frame_keys(sprites, prefix: str) -> list[str]:
+    def _key_sort(k: str) -> int:
+        m = re.search(r"(\d+)$", k)
+        return int(m.group(1)) if m else 0
+
+    return sorted((k for k in sprites.keys() if k.startswith(prefix)), key=_key_sort)
+
+
+def _pose(pack: str, sprites, clothes_offsets, outfit: str, expression: str, walking: bool,
+          eyes_closed: bool, mouth_open: bool, flip_x: bool, now: float, state: str = "idle") -> tuple[pygame.Surface, tuple[int, int]] | None:
+    """Pick the parts for this frame (body / walk frame, clothes, face) and compose them."""
+    # optional walk frames (keys: body_walk_0, body_walk_1, ...)
+    walk_keys = _frame_keys(sprites, "body_walk_")
+    if walking and walk_keys:
+        frame = int((now * float(getattr(cfg, "WALK_ANIM_FPS", 10.0))) % len(walk_keys))
+        body_src = sprites.get(walk_keys[frame], sprites.get("body_idle"))
+    else:
+        body_src = sprites.get("body_idle") or sprites.get(state, sprites.get("idle"))
+    if not body_src:
+        return None
+
+    layers: list[tuple[pygame.Surface, int, int]] = []
+    # clothes overlay（衣装ごとのオフセット対応）
+    clothes = sprites.get(f"clothes_{outfit}") or sprites.get("clothes_normal")
+
+    # Optional: 歩行アニメ衣装（v0.1: normalのみアトラスに同梱しやすい）
+    if walking and bool(getattr(cfg, "CLOTHES_WALK_ANIM", True)) and outfit == "normal":
+        ck = _frame_keys(sprites, "clothes_walk_")
+        if ck:
+            frame = int((now * float(getattr(cfg, "WALK_ANIM_FPS", 10.0))) % len(ck))
+            clothes = sprites.get(ck[frame], clothes)
+
+    if clothes:
+        off = (0, 0)
+        if isinstance(clothes_offsets, dict):
+            off = clothes_offsets.get(outfit) or clothes_offsets.get("normal") or (0, 0)
+        layers.append((clothes, int(off[0]), int(off[1])))
+
+    # face（表情＋瞬き＋口パク）
+    # v0.1: walk中は表情パーツを重ねない（ニュートラル顔はbodyに焼き込み）
+    if (not walking) or bool(getattr(cfg, "FACE_DURING_WALK", False)):
+        face_base = sprites.get(f"face_{expression}") or sprites.get("face_normal")
+        if face_base:
+            layers.append((face_base, 0, 0))
+        blink = sprites.get("face_blink")
+        if blink and eyes_closed:
+            layers.append((blink, 0, 0))
+        if mouth_open:
+            mouth = sprites.get("face_mouth")
+            if mouth:
+                layers.append((mouth, 0, 0))
+
+    return _compose(pack, body_src, layers, flip_x)
+
+
+def _draw_companions(screen, comp, sprite_sets: dict, cx0: int, cy: int, now: float):
+    """Companions (game/companions.py), back rows first, each higher up the further back it is."""
+    xs = comp.x_prev + (comp.x - comp.x_prev) * comp.alpha
+    back = float(cfg.COMPANION_BACK_PX)
+    for i in comp.draw_order():
+        pack = sprite_sets.get(comp.ids[i])
+        if pack is None:
+            continue
+        sprites, offsets = pack
+        walking = comp.vx[i] != 0.0
+        posed = _pose(comp.ids[i], sprites, offsets, "normal", "normal", walking, comp.eyes_closed(i, now), False, comp.facing[i] < 0, now)
+        if posed is None:
+            continue
+        frame, (dx, dy) = posed
+        y = cy - int(back * (0.35 + 0.65 * float(comp.depth[i])))
+        screen.blit(frame, (cx0 + int(round(xs[i])) + dx, y + dy))
+
+
+def _draw_companion_bubbles(screen, font_small, comp, sprite_sets: dict, cx0: int, cy: int, now: float):
+    """One-line bubbles above the companions that are talking (not while walking)."""
+    back = float(cfg.COMPANION_BACK_PX)
+    max_w = int(cfg.COMPANION_BUBBLE_MAX_W)
+    for i in comp.draw_order():
+        text = comp.line(i, now)
+        if not text or comp.vx[i] != 0.0:
+            continue
+        if font_small.size(text)[0] > max_w - 8:
+            while len(text) > 1 and font_small.size(text + "…")[0] > max_w - 8:
+                text = text[:-1]
+            text = text + "…"
+        surf = font_small.render(text, True, (235, 235, 245))
+        pack = sprite_sets.get(comp.ids[i])
+        body = pack[0].get("body_idle") if pack is not None else None
+        head = (body.get_height() // 2) if body is not None else 24
+        y = cy - int(back * (0.35 + 0.65 * float(comp.depth[i]))) - head
+        bubble = surf.get_rect().inflate(8, 4)
+        bubble.midbottom = (cx0 + int(round(comp.x[i])), y)
+        bubble.clamp_ip(pygame.Rect(2, 2, cfg.W - 4, cfg.H - 4))
+        pygame.draw.rect(screen, (35, 35, 46), bubble, 0, 6)
+        pygame.draw.rect(screen, (90, 90, 110), bubble, 1, 6)
+        screen.blit(surf, surf.get_rect(center=bubble.center))
 
 
 def status_text(g: Girl) -> str:
@@ -71,6 +232,9 @@ def draw_frame(
     journal_scroll: int = 0,
     clothes_offsets=None,
     debug_lines=None,
+    history_panel=None,
+    companions=None,
+    companion_sprites=None,
 ):
     # ---- background ----
     bg = cfg.BG_THEMES[g.bg_index % len(cfg.BG_THEMES)]["bg"] if cfg.BG_THEMES else (25, 25, 32)
@@ -80,7 +244,10 @@ def draw_frame(
     if bg_image is not None:
         try:
             iw, ih = bg_image.get_size()
-            if iw > 0 and ih > 0:
+            if (iw, ih) == (cfg.W, cfg.H):
+                # already cover-cropped by BackgroundCache: no per-frame rescale
+                screen.blit(bg_image, (0, 0))
+            elif iw > 0 and ih > 0:
                 sw, sh = cfg.W, cfg.H
                 s = max(sw / iw, sh / ih)
                 nw = max(1, int(iw * s))
@@ -107,7 +274,8 @@ def draw_frame(
 
     # ---- character frame ----
     cx = cfg.RIGHT_X + cfg.RIGHT_PANEL_W // 2
-    cx += int(getattr(g, "x_offset", 0))
+    # interpolated between fixed simulation steps (cfg.SIM_HZ)
+    cx += int(round(g.rt.x_prev + (g.x_offset - g.rt.x_prev) * g.rt.sim_alpha))
 
     frame_top = 60
     frame_bottom = cfg.H - 64
@@ -121,14 +289,14 @@ def draw_frame(
     # =========================
     # キャラ描画（安全版：合成 → 反転）
     # =========================
-    now = time.time()
-    vx = float(getattr(g, "vx_px_per_sec", 0.0))
-    walking = (abs(vx) > 0.01) and (getattr(g, "state", "idle") != "sleep")
+    now = clock.time()
+    vx = g.vx_px_per_sec
+    walking = (abs(vx) > 0.01) and (g.state != "sleep")
 
     # Facing should persist even when the character stops.
     # Sprite sheets are authored facing right; we flip at render time.
     # Previously we derived facing from vx every frame, so vx==0 always snapped to right.
-    facing = int(getattr(g, "facing", 1))  # 1=right, -1=left
+    facing = g.facing  # 1=right, -1=left
     if vx < -0.01:
         facing = -1
     elif vx > 0.01:
@@ -136,83 +304,22 @@ def draw_frame(
     setattr(g, "facing", facing)
     flip_x = facing < 0
 
-    # optional walk frames (keys: body_walk_0, body_walk_1, ...)
-    walk_keys = [k for k in sprites.keys() if k.startswith("body_walk_")]
-
-    def _walk_key_sort(k: str) -> int:
-        m = re.search(r"(\d+)$", k)
-        return int(m.group(1)) if m else 0
-
-    walk_keys.sort(key=_walk_key_sort)
-
-    if walking and walk_keys:
-        frame = int((now * float(getattr(cfg, "WALK_ANIM_FPS", 10.0))) % len(walk_keys))
-        body_src = sprites.get(walk_keys[frame], sprites.get("body_idle"))
-    else:
-        body_src = sprites.get("body_idle") or sprites.get(g.state, sprites.get("idle"))
-
     bob = 0
     if walking:
         bob_px = int(getattr(cfg, "WALK_BOB_PX", 2))
         bob_hz = float(getattr(cfg, "WALK_BOB_HZ", 6.0))
         bob = int(math.sin(now * bob_hz * math.tau) * bob_px)
 
-    if body_src:
-        bw, bh = body_src.get_size()
-        # Generous transparent canvas so offsets don't clip.
-        char = pygame.Surface((bw * 2, bh * 2), pygame.SRCALPHA)
-        center = (char.get_width() // 2, char.get_height() // 2)
-
-        # body (unflipped)
-        char.blit(body_src, body_src.get_rect(center=center))
-
-        # clothes overlay（衣装ごとのオフセット対応）
-        oid = getattr(g, "outfit", "normal")
-        clothes = sprites.get(f"clothes_{oid}") or sprites.get("clothes_normal")
-
-        # Optional: 歩行アニメ衣装（v0.1: normalのみアトラスに同梱しやすい）
-        if walking and bool(getattr(cfg, "CLOTHES_WALK_ANIM", True)):
-            if oid == "normal":
-                ck = [k for k in sprites.keys() if k.startswith("clothes_walk_")]
-                ck.sort(key=lambda k: int(re.search(r"(\d+)$", k).group(1)) if re.search(r"(\d+)$", k) else 0)
-                if ck:
-                    frame = int((now * float(getattr(cfg, "WALK_ANIM_FPS", 10.0))) % len(ck))
-                    clothes = sprites.get(ck[frame], clothes)
-
-        if clothes:
-            off = (0, 0)
-            if isinstance(clothes_offsets, dict):
-                off = clothes_offsets.get(oid) or clothes_offsets.get("normal") or (0, 0)
-            ox, oy = off
-            char.blit(clothes, clothes.get_rect(center=(center[0] + int(ox), center[1] + int(oy))))
-
-        # face（表情＋瞬き＋口パク）
-        # v0.1: walk中は表情パーツを重ねない（ニュートラル顔はbodyに焼き込み）
-        if (not walking) or bool(getattr(cfg, "FACE_DURING_WALK", False)):
-            expr = getattr(g, "expression", "normal")
-            face_base = sprites.get(f"face_{expr}") or sprites.get("face_normal")
-            if face_base:
-                char.blit(face_base, face_base.get_rect(center=center))
-
-            blink = sprites.get("face_blink")
-            if blink:
-                # NOTE: 目閉じを強制するのは「実際に寝ている時」だけ。
-                if getattr(g, "sleep_stage", "awake") == "sleep" or getattr(g, "state", "") == "sleep":
-                    char.blit(blink, blink.get_rect(center=center))
-                elif now < getattr(g, "blink_until", 0.0):
-                    char.blit(blink, blink.get_rect(center=center))
-
-            if getattr(g, "mouth_open", False):
-                mouth = sprites.get("face_mouth")
-                if mouth:
-                    char.blit(mouth, mouth.get_rect(center=center))
-
-        # Final flip applied ONCE to the composed character.
-
-        if flip_x:
-            char = pygame.transform.flip(char, True, False)
-
-        screen.blit(char, char.get_rect(center=(cx, cy + bob)))
+    # companions stand further back: drawn first, back rows first
+    if companions is not None and len(companions):
+        _draw_companions(screen, companions, companion_sprites or {}, cfg.RIGHT_X + cfg.RIGHT_PANEL_W // 2, cy, now)
+
+    # NOTE: 目閉じを強制するのは「実際に寝ている時」だけ。
+    eyes_closed = g.sleep_stage == "sleep" or g.state == "sleep" or now < g.blink_until
+    posed = _pose(g.character, sprites, clothes_offsets, g.outfit, g.expression, walking, eyes_closed, g.mouth_open, flip_x, now, state=g.state)
+    if posed is not None:
+        frame, (dx, dy) = posed
+        screen.blit(frame, (cx + dx, cy + bob + dy))
 
     # ---- lights overlay ----
     if g.lights_off:
@@ -250,7 +357,7 @@ def draw_frame(
             talk.close_btn.draw(screen, font_small, talk.close_btn.hit(mouse_pos))
 
         # YES/NO
-        if getattr(g, "awaiting_choice", False):
+        if g.awaiting_choice:
             talk.btn_yes.draw(screen, font_small, talk.btn_yes.hit(mouse_pos))
             talk.btn_no.draw(screen, font_small, talk.btn_no.hit(mouse_pos))
 
@@ -268,7 +375,7 @@ def draw_frame(
                 screen,
                 font_small,
                 hover=it.hit(mouse_pos),
-                selected=(getattr(g, "outfit", "normal") == getattr(it, "value", "")),
+                selected=(g.outfit == getattr(it, "value", "")),
             )
 
     # ---- background menu panel bg ----
@@ -280,13 +387,13 @@ def draw_frame(
         bg_menu.prev_btn.draw(screen, font_small, bg_menu.prev_btn.hit(mouse_pos))
         bg_menu.next_btn.draw(screen, font_small, bg_menu.next_btn.hit(mouse_pos))
 
-        sel_mode = getattr(g, "bg_mode", "theme")
+        sel_mode = g.bg_mode
         sel_val = ""
         if sel_mode == "image":
-            sel_val = "img:" + (getattr(g, "bg_image_id", "") or "")
+            sel_val = "img:" + (g.bg_image_id or "")
         else:
             try:
-                name = cfg.BG_THEMES[getattr(g, "bg_index", 0) % len(cfg.BG_THEMES)].get("name", "")
+                name = cfg.BG_THEMES[g.bg_index % len(cfg.BG_THEMES)].get("name", "")
                 sel_val = "theme:" + str(name)
             except Exception:
                 sel_val = ""
@@ -312,7 +419,7 @@ def draw_frame(
         pygame.draw.rect(screen, (120, 120, 140), panel, 2, 12)
         screen.blit(font.render("JOURNAL", True, (230, 230, 240)), (panel.x + 10, panel.y + 8))
 
-        lines = list(getattr(g, "journal", []) or [])
+        lines = list(g.rt.journal)
         start = max(0, len(lines) - 12 - journal_scroll)
         view = lines[start : start + 12]
         y = panel.y + 32
@@ -324,14 +431,18 @@ def draw_frame(
             screen.blit(surf, (panel.x + 10, y))
             y += 14
 
+    # ---- meter history (cached surface, see ui_history.py) ----
+    if history_panel is not None and history_panel.open:
+        history_panel.draw(screen, font, font_small)
+
     # ---- base buttons ----
     mx, my = mouse_pos
     for b in btns:
         b.draw(screen, font_small, b.hit((mx, my)))
 
     # ---- speech bubble（UIより前面に表示 / 複数行＋ページ）----
-    line_txt = getattr(g, "line", "") or ""
-    walking2 = abs(float(getattr(g, "vx_px_per_sec", 0.0))) > 0.01
+    line_txt = g.line
+    walking2 = abs(g.vx_px_per_sec) > 0.01
     # NOTE: 睡眠中でも「寝言」や「起床セリフ」を表示できるようにする。
     # バブルを消すのは「歩行中（喋りながら歩かない）」のときだけ。
     if walking2:
@@ -341,13 +452,13 @@ def draw_frame(
         bubble_w = (cfg.W - cfg.RIGHT_PANEL_W - 16) - cfg.LEFT_X
         inner_w = max(40, bubble_w - (cfg.BUBBLE_PADDING_X * 2))
         max_lines = int(getattr(cfg, "BUBBLE_MAX_LINES", 3))
-        page_i = int(getattr(g, "line_page", 0))
+        page_i = g.rt.line_page
 
         wrapped = _wrap_text_to_lines(line_txt, font_small, inner_w)
         pages = _paginate_lines(wrapped, max_lines)
         if page_i >= len(pages):
             page_i = max(0, len(pages) - 1)
-            g.line_page = page_i
+            g.rt.line_page = page_i
 
         show_lines = pages[page_i] if pages else [line_txt]
         line_h = font_small.get_linesize() + int(getattr(cfg, "BUBBLE_LINE_GAP", 2))
@@ -381,21 +492,26 @@ def draw_frame(
             ind_s = font_small.render(ind, True, (235, 235, 245))
             screen.blit(ind_s, ind_s.get_rect(bottomright=(bubble.right - 6, bubble.bottom - 4)))
 
-        setattr(g, "_bubble_rect", bubble)
-        setattr(g, "_bubble_pages", len(pages))
+        g.rt.bubble_rect = bubble
+        g.rt.bubble_pages = len(pages)
     else:
-        setattr(g, "_bubble_rect", None)
-        setattr(g, "_bubble_pages", 0)
+        g.rt.bubble_rect = None
+        g.rt.bubble_pages = 0
+
+    if companions is not None and len(companions):
+        _draw_companion_bubbles(screen, font_small, companions, companion_sprites or {}, cfg.RIGHT_X + cfg.RIGHT_PANEL_W // 2, cy, now)
 
     # ---- debug HUD
     # ---- custom unified menu ----
     try:
-        bg_thumbs = getattr(g, '_custom_bg_thumbs', {}) or {}
-        clothes_ids = list(getattr(g, 'clothes_offsets', {}).keys()) if hasattr(g, 'clothes_offsets') else ['normal','alt']
+        bg_thumbs = g.rt.custom_bg_thumbs
+        clothes_ids = list(g.rt.clothes_offsets.keys()) or ['normal','alt']
+        char_ids = list(g.rt.custom_char_ids)
     except Exception:
         bg_thumbs = {}
         clothes_ids = ['normal','alt']
-    draw_custom_menu(screen, g, cfg, font_small, font_small, bg_thumbs, clothes_ids)
+        char_ids = []
+    draw_custom_menu(screen, g, cfg, font_small, font_small, bg_thumbs, clothes_ids, char_ids)
         # ---- debug HUD (F1) ----
     if debug_lines:
         pad = 6
@@ -0,0 +1,220 @@
+"""replay.py
+Session recording (--record FILE) and headless replay (--replay FILE).
+
+main.py reads input through one of these objects instead of pygame directly:
+  begin_frame()  advance the session clock (game/clock.py), returns the delta in ms
+  events()       this frame's events
+  mods() / mouse_pos() / held()   modifier keys, pointer, held LEFT / RIGHT / button 1
+
+A recording is gzip'd JSON lines:
+  {"v": 1, "seed": 123, "t0_ms": 1700000000000, "save": {...}}   header: RNG seed, start time, Girl as loaded
+  [17]                                                          frame: clock delta (ms)
+  [16, [["d", 120, 80, 1]]]                                     frame + events
+  [16, [], [120, 80, 0, 0]]                                     frame + input state (only when it changed)
+  {"end": 5400, "digest": "..."}                                trailer: frame count, digest of the final save
+
+Idle frames cost a few bytes before gzip. Only events main.py reacts to are
+kept (buttons, wheel, key down, quit); the pointer comes from the state.
+
+A replay rebuilds the Girl from the header (not from save.json), re-seeds the
+RNG, feeds the recorded deltas to the clock and writes its save / journal /
+history into a scratch directory. At the end it compares the final save with
+the trailer digest and reports frame timings, so a replay doubles as a
+repeatable performance scenario (--speed 0 runs as fast as possible).
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import time
+
+import pygame
+
+from .clock import SessionClock
+from .model import SCHEMA_VERSION, save_dict
+
+REPLAY_VERSION = 1
+
+
+def state_digest(g) -> str:
+    data = json.dumps(save_dict(g), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _encode(e) -> list | None:
+    if e.type == pygame.MOUSEBUTTONDOWN:
+        return ["d", e.pos[0], e.pos[1], e.button]
+    if e.type == pygame.MOUSEBUTTONUP:
+        return ["u", e.pos[0], e.pos[1], e.button]
+    if e.type == pygame.MOUSEWHEEL:
+        return ["w", e.x, e.y]
+    if e.type == pygame.KEYDOWN:
+        return ["k", e.key, e.mod]
+    if e.type == pygame.QUIT:
+        return ["q"]
+    return None
+
+
+def _decode(rec: list):
+    kind = rec[0]
+    if kind in ("d", "u"):
+        typ = pygame.MOUSEBUTTONDOWN if kind == "d" else pygame.MOUSEBUTTONUP
+        return pygame.event.Event(typ, pos=(int(rec[1]), int(rec[2])), button=int(rec[3]))
+    if kind == "w":
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=int(rec[1]), y=int(rec[2]), flipped=False)
+    if kind == "k":
+        return pygame.event.Event(pygame.KEYDOWN, key=int(rec[1]), mod=int(rec[2]), unicode="", scancode=0)
+    if kind == "q":
+        return pygame.event.Event(pygame.QUIT)
+    return None
+
+
+class LiveInput:
+    """The normal session: wall clock + pygame input."""
+
+    def __init__(self):
+        self._events: list = []
+        self._state = (0, 0, 0, 0)
+
+    def begin_frame(self, clock: SessionClock) -> int | None:
+        delta = clock.tick()
+        self._events = pygame.event.get()
+        self._state = self._read_state()
+        return delta
+
+    @staticmethod
+    def _read_state() -> tuple[int, int, int, int]:
+        x, y = pygame.mouse.get_pos()
+        keys = pygame.key.get_pressed()
+        held = (1 if keys[pygame.K_LEFT] else 0) | (2 if keys[pygame.K_RIGHT] else 0)
+        if pygame.mouse.get_pressed(num_buttons=3)[0]:
+            held |= 4
+        return int(x), int(y), int(pygame.key.get_mods()), held
+
+    def events(self) -> list:
+        return self._events
+
+    def mods(self) -> int:
+        return self._state[2]
+
+    def mouse_pos(self) -> tuple[int, int]:
+        return self._state[0], self._state[1]
+
+    def held(self) -> tuple[bool, bool, bool]:
+        """(LEFT, RIGHT, mouse button 1) held down."""
+        h = self._state[3]
+        return bool(h & 1), bool(h & 2), bool(h & 4)
+
+    def close(self, g):
+        pass
+
+
+class RecordingInput(LiveInput):
+    def __init__(self, path: str, seed: int, t0_ms: int, save: dict):
+        super().__init__()
+        self.path = path
+        self.frames = 0
+        self._prev_state = None
+        self._f = gzip.open(path, "wt", encoding="utf-8")
+        header = {"v": REPLAY_VERSION, "seed": int(seed), "t0_ms": int(t0_ms), "save": dict(save, schema_version=SCHEMA_VERSION)}
+        self._write(header)
+
+    def _write(self, rec):
+        self._f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def begin_frame(self, clock: SessionClock) -> int | None:
+        delta = super().begin_frame(clock)
+        line: list = [delta]
+        evs = [r for r in (_encode(e) for e in self._events) if r is not None]
+        if self._state != self._prev_state:
+            line += [evs, list(self._state)]
+            self._prev_state = self._state
+        elif evs:
+            line.append(evs)
+        self._write(line)
+        self.frames += 1
+        return delta
+
+    def close(self, g):
+        self._write({"end": self.frames, "digest": state_digest(g)})
+        self._f.close()
+
+
+class ReplayInput(LiveInput):
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._f = gzip.open(path, "rt", encoding="utf-8")
+        header = json.loads(self._f.readline())
+        if not isinstance(header, dict) or header.get("v") != REPLAY_VERSION:
+            raise ValueError(f"not a replay file (v{REPLAY_VERSION}): {path}")
+        self.seed = int(header["seed"])
+        self.t0_ms = int(header["t0_ms"])
+        self.save = header["save"]
+        self.trailer: dict | None = None
+        self.aborted = False
+        self.frames = 0
+        self.session_ms = 0
+        self._frame_ms: list[float] = []
+        self._t_prev = None
+        self._t_start = time.perf_counter()
+
+    def begin_frame(self, clock: SessionClock) -> int | None:
+        t = time.perf_counter()
+        if self._t_prev is not None:
+            self._frame_ms.append((t - self._t_prev) * 1000.0)
+        self._t_prev = t
+        # keep the window responsive; closing it stops the replay
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                self.aborted = True
+                return None
+        raw = self._f.readline()
+        if not raw:
+            return None
+        rec = json.loads(raw)
+        if isinstance(rec, dict):
+            self.trailer = rec
+            return None
+        delta = int(rec[0])
+        self._events = [ev for ev in (_decode(r) for r in (rec[1] if len(rec) > 1 else [])) if ev is not None]
+        if len(rec) > 2:
+            self._state = tuple(int(v) for v in rec[2])
+        clock.tick(delta)
+        self.frames += 1
+        self.session_ms += delta
+        return delta
+
+    def close(self, g):
+        # the loop usually stops on the recorded QUIT, one line before the trailer
+        while self.trailer is None and not self.aborted:
+            raw = self._f.readline()
+            if not raw:
+                break
+            rec = json.loads(raw)
+            if isinstance(rec, dict):
+                self.trailer = rec
+        self._f.close()
+        print(self.report(g))
+
+    def report(self, g) -> str:
+        wall = time.perf_counter() - self._t_start
+        ms = sorted(self._frame_ms)
+        lines = [
+            f"replay {self.path}: {self.frames} frames, {self.session_ms / 1000.0:.1f}s of session in {wall:.2f}s"
+            f" ({self.session_ms / 1000.0 / max(wall, 1e-6):.1f}x)",
+        ]
+        if ms:
+            p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+            lines.append(f"frame ms: avg {sum(ms) / len(ms):.2f}  p50 {ms[len(ms) // 2]:.2f}  p95 {p95:.2f}  max {ms[-1]:.2f}")
+        if self.aborted:
+            lines.append("state: not checked (replay stopped early)")
+        elif self.trailer is None:
+            lines.append("state: not checked (recording has no trailer)")
+        elif self.trailer.get("end") != self.frames:
+            lines.append(f"state: not checked (recording has {self.trailer.get('end')} frames)")
+        else:
+            ok = self.trailer.get("digest") == state_digest(g)
+            lines.append("state: match" if ok else "state: DIVERGED (final save differs from the recording)")
+        return "\n".join(lines)
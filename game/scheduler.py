@@ -0,0 +1,98 @@
+"""scheduler.py
+Named one-shot timers on a binary heap (heapq).
+
+The main loop used to compare a dozen timestamps every frame (next_blink,
+mouth_until, line_until, state_until, idle_next_at, sleep_stage_until, the
+autosave / history timers ...), each in its own `if now >= ...` branch.
+Now:
+
+- code that sets a deadline also calls timers.at(key, when)
+  (dialogue.set_line_until, sim.pick_idle_state, ...). Setting a key again
+  moves it; cancel(key) drops it.
+- handlers are registered once per key with on(key, fn) (main.py and
+  sim.install_timers). fn(now) may schedule again. A key without a
+  handler just wakes the loop (e.g. the end of a blink).
+- run(now) pops only what is due. Moved / cancelled entries are skipped
+  lazily (the live (when, seq) per key is the truth), so a frame costs
+  O(fired * log n) and nothing when no timer is due.
+- next_at() tells the loop how long it may sleep.
+
+The deadlines themselves stay on Girl (line_until, state_until, ...):
+render / sim / the save read them as before.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Callable
+
+_INF = float("inf")
+
+
+class Scheduler:
+    def __init__(self):
+        self._heap: list[tuple[float, int, str]] = []
+        # key -> (when, seq) of its live entry
+        self._live: dict[str, tuple[float, int]] = {}
+        self._handlers: dict[str, Callable[[float], None]] = {}
+        self._seq = itertools.count()
+        self.fired = 0
+        self.stale = 0
+
+    def on(self, key: str, fn: Callable[[float], None]):
+        self._handlers[key] = fn
+
+    def at(self, key: str, when: float):
+        seq = next(self._seq)
+        self._live[key] = (float(when), seq)
+        heapq.heappush(self._heap, (float(when), seq, key))
+        # many moves of the same keys: drop the dead entries now and then
+        if len(self._heap) > 4 * len(self._live) + 64:
+            # in place: run() may be holding the list
+            self._heap[:] = [(w, s, k) for k, (w, s) in self._live.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key: str):
+        self._live.pop(key, None)
+
+    def due(self, key: str) -> float | None:
+        live = self._live.get(key)
+        return live[0] if live is not None else None
+
+    def _prune(self):
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][:2]:
+            heapq.heappop(heap)
+            self.stale += 1
+
+    def next_at(self) -> float:
+        """Time of the earliest live timer (inf if none)."""
+        self._prune()
+        return self._heap[0][0] if self._heap else _INF
+
+    def run(self, now: float) -> int:
+        """Fire every timer due at `now`. Timers a handler sets for <= now run next call."""
+        fired = 0
+        limit = next(self._seq)
+        heap = self._heap
+        later: list[tuple[float, int, str]] = []
+        while heap and heap[0][0] <= now:
+            when, seq, key = heapq.heappop(heap)
+            if self._live.get(key) != (when, seq):
+                self.stale += 1
+                continue
+            if seq > limit:
+                later.append((when, seq, key))
+                continue
+            del self._live[key]
+            fired += 1
+            fn = self._handlers.get(key)
+            if fn is not None:
+                fn(now)
+        for ent in later:
+            heapq.heappush(heap, ent)
+        self.fired += fired
+        return fired
+
+    def stats(self) -> dict:
+        return {"timers": len(self._live), "heap": len(self._heap), "fired": self.fired, "stale": self.stale}
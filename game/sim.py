@@ -10,13 +10,20 @@ Key design choices:
 """
 
 from __future__ import annotations
-import random
-import time
+from typing import TYPE_CHECKING
 
 from .model import Girl, clamp
-from .snacks import Snack
 from .dialogue import Dialogue, set_line
 from . import config as cfg
+from .clock import clock, rng
+
+if TYPE_CHECKING:  # snacks is imported lazily (after the first frame)
+    from .snacks import Snack
+
+# pick_idle_state thresholds (shared with fast_forward)
+SLEEP_POSE_AT = 85     # sleepiness at which the sleeping pose is forced
+GRUMPY_AT = 20         # hunger / mood at or below this -> grumpy
+MUSIC_CHANCE = 0.35    # otherwise: music vs idle
 
 
 def pick_idle_state(g: Girl, dlg: Dialogue, now: float):
@@ -27,70 +34,186 @@ def pick_idle_state(g: Girl, dlg: Dialogue, now: float):
       - Speech is disabled while sleeping; sleep talk is handled separately.
     """
     # Only show the sleeping pose when she is actually sleeping.
-    if getattr(g, "sleep_stage", "awake") == "sleep" or g.sleepiness >= 85:
+    if g.sleep_stage == "sleep" or g.sleepiness >= SLEEP_POSE_AT:
         g.state = "sleep"
-    elif g.hunger <= 20 or g.mood <= 20:
+    elif g.hunger <= GRUMPY_AT or g.mood <= GRUMPY_AT:
         g.state = "grumpy"
     else:
-        g.state = "music" if random.random() < 0.35 else "idle"
+        g.state = "music" if rng.random() < MUSIC_CHANCE else "idle"
 
-    g.state_until = now + random.uniform(cfg.IDLE_MIN_SEC, cfg.IDLE_MAX_SEC)
+    g.state_until = now + rng.uniform(cfg.IDLE_MIN_SEC, cfg.IDLE_MAX_SEC)
+    g.rt.timers.at("state", g.state_until)
     # Do not automatically speak while sleeping. (Sleep talk, if desired, is handled elsewhere.)
     if g.state != "sleep":
         set_line(g, now, dlg.pick(g.state) or "……", (2.5, 5.0))
 
 
+def meter_rates(sleeping: bool, state: str, lights_off: bool) -> tuple[float, float, float]:
+    """Per-second (hunger, mood, sleepiness) change for one behaviour state."""
+    dh = -cfg.HUNGER_DECAY
+    dm = -cfg.MOOD_DECAY
+    ds = cfg.SLEEP_INC
+    if sleeping or state == "sleep":
+        ds -= 0.10 * (cfg.LIGHTS_OFF_SLEEP_RECOVER if lights_off else 1.0)
+        dm += 0.02
+        dh -= 0.01
+    elif state == "music":
+        dm += 0.03
+        ds += 0.01
+    elif state == "grumpy":
+        dm -= 0.02
+    return dh, dm, ds
+
+
 def step_sim(g: Girl, now: float, dt: float):
-    """Advance core meters + movement each frame."""
-    g.hunger = clamp(g.hunger - cfg.HUNGER_DECAY * dt)
-    g.mood = clamp(g.mood - cfg.MOOD_DECAY * dt)
-    g.sleepiness = clamp(g.sleepiness + cfg.SLEEP_INC * dt)
-
-    if getattr(g, "sleep_stage", "awake") == "sleep" or g.state == "sleep":
-        g.sleepiness = clamp(g.sleepiness - 0.10 * dt * (cfg.LIGHTS_OFF_SLEEP_RECOVER if g.lights_off else 1.0))
-        g.mood = clamp(g.mood + 0.02 * dt)
-        g.hunger = clamp(g.hunger - 0.01 * dt)
-    elif g.state == "music":
-        g.mood = clamp(g.mood + 0.03 * dt)
-        g.sleepiness = clamp(g.sleepiness + 0.01 * dt)
-    elif g.state == "grumpy":
-        g.mood = clamp(g.mood - 0.02 * dt)
+    """Advance core meters + movement by one fixed step (cfg.SIM_HZ)."""
+    dh, dm, ds = meter_rates(g.sleep_stage == "sleep", g.state, g.lights_off)
+    g.hunger = clamp(g.hunger + dh * dt)
+    g.mood = clamp(g.mood + dm * dt)
+    g.sleepiness = clamp(g.sleepiness + ds * dt)
 
     # movement
     step_move(g, now, dt)
 
 
+def _mix(a: tuple, b: tuple, f: float) -> tuple:
+    return tuple(x * (1.0 - f) + y * f for x, y in zip(a, b))
+
+
+def _awake_rates(grumpy: bool, lights_off: bool) -> tuple[float, float, float]:
+    """Expected awake rates: grumpy, or the music / idle mix pick_idle_state makes."""
+    if grumpy:
+        return meter_rates(False, "grumpy", lights_off)
+    return _mix(meter_rates(False, "idle", lights_off), meter_rates(False, "music", lights_off), MUSIC_CHANCE)
+
+
+def _time_to(x: float, rate: float, target: float) -> float:
+    """Seconds until x moving at `rate` reaches target (inf if never)."""
+    if rate > 0 and x < target:
+        return (target - x) / rate
+    if rate < 0 and x > target:
+        return (x - target) / -rate
+    return float("inf")
+
+
+def fast_forward(g: Girl, start: float, end: float, max_segments: int = 32) -> dict:
+    """Advance meters and the sleep stage from `start` to `end` in closed form.
+
+    Used on launch (time since g.last_seen) and after a long suspend, instead
+    of stepping frame by frame. Between events every rate is constant, so a
+    meter is just clamp(x + rate * t); events are the points where the
+    behaviour changes:
+
+      - lights off and sleep-ready (g.sleep_ready_at): she falls asleep and
+        stays asleep (waking in the dark is rare: WAKE_CHANCE_DARK_...)
+      - lights on while asleep: she wakes up right away
+      - hunger / mood crossing GRUMPY_AT (awake rates change)
+      - sleepiness reaching SLEEP_POSE_AT while awake: pick_idle_state then
+        alternates the sleeping pose and the awake states, holding sleepiness
+        there; the time split that keeps it there gives the mixed rates
+      - the music / idle mix uses its expected rate (MUSIC_CHANCE)
+
+    The number of segments is bounded, so 5 minutes and 5 weeks cost the
+    same. Returns a small summary (elapsed / slept seconds, segments).
+    """
+    t = float(start)
+    end = float(end)
+    elapsed = max(0.0, end - t)
+    slept = 0.0
+    segments = 0
+
+    asleep = g.sleep_stage == "sleep"
+    if not g.lights_off:
+        asleep = False
+    h, m, s = g.hunger, g.mood, g.sleepiness
+
+    while t < end and segments < max_segments:
+        segments += 1
+        horizon = end - t
+        events = [horizon]
+
+        if not asleep and g.lights_off:
+            ready = max(t, g.sleep_ready_at)
+            if ready <= t:
+                asleep = True
+            else:
+                events.append(ready - t)
+
+        if asleep:
+            rates = meter_rates(True, "sleep", g.lights_off)
+        else:
+            grumpy = h <= GRUMPY_AT or m <= GRUMPY_AT
+            awake = _awake_rates(grumpy, g.lights_off)
+            pose = meter_rates(False, "sleep", g.lights_off)
+            if s >= SLEEP_POSE_AT and awake[2] > 0 > pose[2]:
+                # sliding at SLEEP_POSE_AT: sleepiness rate of the mix is 0
+                f = awake[2] / (awake[2] - pose[2])
+                rates = _mix(awake, pose, f)
+                rates = (rates[0], rates[1], 0.0)
+                s = float(SLEEP_POSE_AT)
+            else:
+                rates = awake
+                events.append(_time_to(s, rates[2], SLEEP_POSE_AT))
+            # grumpy threshold (only matters while awake)
+            if h > GRUMPY_AT:
+                events.append(_time_to(h, rates[0], GRUMPY_AT))
+            events.append(_time_to(m, rates[1], GRUMPY_AT))
+
+        step = max(0.0, min(events))
+        # nudge past the threshold so the next segment sees the new side
+        step = min(horizon, step + 1e-6) if step < horizon else horizon
+        h = clamp(h + rates[0] * step)
+        m = clamp(m + rates[1] * step)
+        s = clamp(s + rates[2] * step)
+        if asleep:
+            slept += step
+        t += step
+
+    if t < end:
+        # out of segments (should not happen): finish with the last rates
+        h = clamp(h + rates[0] * (end - t))
+        m = clamp(m + rates[1] * (end - t))
+        s = clamp(s + rates[2] * (end - t))
+
+    g.hunger, g.mood, g.sleepiness = h, m, s
+    if asleep:
+        g.sleep_stage = "sleep"
+        g.state = "sleep"
+    else:
+        g.sleep_stage = "awake"
+        if g.state == "sleep":
+            g.state = "idle"
+    g.sleep_stage_until = 0.0
+    g.rt.timers.cancel("sleep_stage")
+    # transient timers from before the gap are meaningless now
+    g.state_until = end
+    g.rt.timers.at("state", end)
+    g.vx_px_per_sec = 0.0
+    g.walk_until = end
+    g.next_walk_at = end + rng.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
+    return {"elapsed": elapsed, "slept": slept, "segments": segments}
+
+
 def step_move(g: Girl, now: float, dt: float):
     """Wander left/right inside the right panel.
 
     Uses g.x_offset as an offset from the panel center in pixels.
     """
     # Stop moving while actually sleeping (and during short sleepy transitions).
-    if getattr(g, "sleep_stage", "awake") in ("drowsy", "sleep") or getattr(g, "state", "") == "sleep":
+    if g.sleep_stage in ("drowsy", "sleep") or g.state == "sleep":
         g.vx_px_per_sec = 0.0
         # schedule a walk later to avoid immediate start upon wake
-        if getattr(g, "next_walk_at", 0.0) < now:
-            g.next_walk_at = now + random.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
+        if g.next_walk_at < now:
+            g.next_walk_at = now + rng.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
         return
 
     # Stop moving while a line is displayed (no speaking while walking)
-    if getattr(g, "line", "") and now < getattr(g, "line_until", 0.0):
+    if g.line and now < g.line_until:
         g.vx_px_per_sec = 0.0
         # push next walk a bit into the future so she doesn't instantly resume
-        g.next_walk_at = max(getattr(g, "next_walk_at", 0.0), now + random.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC))
+        g.next_walk_at = max(g.next_walk_at, now + rng.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC))
         return
 
-    # Ensure fields exist (older saves). We keep this here so saves remain
-    # forward-compatible without migration steps.
-    if not hasattr(g, "x_offset"):
-        g.x_offset = 0.0
-    if not hasattr(g, "vx_px_per_sec"):
-        g.vx_px_per_sec = 0.0
-    if not hasattr(g, "walk_until"):
-        g.walk_until = 0.0
-    if not hasattr(g, "next_walk_at"):
-        g.next_walk_at = now + random.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
-
     # walking phase
     if now < g.walk_until and g.vx_px_per_sec != 0.0:
         g.x_offset += g.vx_px_per_sec * dt
@@ -106,14 +229,14 @@ def step_move(g: Girl, now: float, dt: float):
         # finish walk
         if now >= g.walk_until:
             g.vx_px_per_sec = 0.0
-            g.next_walk_at = now + random.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
+            g.next_walk_at = now + rng.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
         return
 
     # rest phase: decide whether to start a walk
     if now >= g.next_walk_at:
-        direction = -1.0 if random.random() < 0.5 else 1.0
+        direction = -1.0 if rng.random() < 0.5 else 1.0
         g.vx_px_per_sec = direction * float(cfg.WALK_SPEED_PX_PER_SEC)
-        g.walk_until = now + random.uniform(cfg.WALK_MIN_SEC, cfg.WALK_MAX_SEC)
+        g.walk_until = now + rng.uniform(cfg.WALK_MIN_SEC, cfg.WALK_MAX_SEC)
 
 
 def action_snack(g: Girl, snack: Snack | None = None):
@@ -144,29 +267,31 @@ def action_toggle_lights(g: Girl):
     """
     g.lights_off = not g.lights_off
 
-    now = time.time()
+    now = clock.time()
 
     # Turning lights OFF does not force immediate sleep; it starts a randomized sleep-readiness timer.
     if g.lights_off:
-        g.sleep_ready_at = now + random.uniform(cfg.SLEEP_READY_MIN_SEC, cfg.SLEEP_READY_MAX_SEC)
+        g.sleep_ready_at = now + rng.uniform(cfg.SLEEP_READY_MIN_SEC, cfg.SLEEP_READY_MAX_SEC)
         # If she was already sleeping, keep sleeping. Otherwise stay awake.
-        if getattr(g, "sleep_stage", "awake") not in ("drowsy", "sleep"):
+        if g.sleep_stage not in ("drowsy", "sleep"):
             g.sleep_stage = "awake"
             g.sleep_stage_until = 0.0
     else:
         # Turning lights ON while drowsy cancels the pre-sleep transition.
-        if getattr(g, "sleep_stage", "awake") == "drowsy":
+        if g.sleep_stage == "drowsy":
             g.sleep_stage = "awake"
             g.sleep_stage_until = 0.0
+            g.rt.timers.cancel("sleep_stage")
 
 
 def maybe_start_pre_sleep(g: Girl, dlg: Dialogue, now: float) -> bool:
     """Enter drowsy stage and show a short "yawn" line. Returns True if started."""
-    if getattr(g, "sleep_stage", "awake") != "awake":
+    if g.sleep_stage != "awake":
         return False
     g.sleep_stage = "drowsy"
-    dur = random.uniform(cfg.DROWSY_MIN_SEC, cfg.DROWSY_MAX_SEC)
+    dur = rng.uniform(cfg.DROWSY_MIN_SEC, cfg.DROWSY_MAX_SEC)
     g.sleep_stage_until = now + dur
+    g.rt.timers.at("sleep_stage", g.sleep_stage_until)
     # Use dialogue tag if present; fall back to a short yawn.
     set_line(g, now, dlg.pick("pre_sleep") or "ふぁ……", (dur, dur))
     return True
@@ -174,11 +299,12 @@ def maybe_start_pre_sleep(g: Girl, dlg: Dialogue, now: float) -> bool:
 
 def maybe_start_wake_up(g: Girl, dlg: Dialogue, now: float) -> bool:
     """Start a short wake-up groggy line before switching to awake. Returns True if started."""
-    if getattr(g, "sleep_stage", "awake") != "sleep":
+    if g.sleep_stage != "sleep":
         return False
     g.sleep_stage = "drowsy"
-    dur = random.uniform(cfg.WAKE_DROWSY_MIN_SEC, cfg.WAKE_DROWSY_MAX_SEC)
+    dur = rng.uniform(cfg.WAKE_DROWSY_MIN_SEC, cfg.WAKE_DROWSY_MAX_SEC)
     g.sleep_stage_until = now + dur
+    g.rt.timers.at("sleep_stage", g.sleep_stage_until)
     set_line(g, now, dlg.pick("wake") or "ん……", (dur, dur))
     return True
 
@@ -189,32 +315,46 @@ def maybe_start_sleep_talk(g: Girl, dlg: Dialogue, now: float) -> bool:
 
     Keeps sleep_stage as 'sleep'. Returns True if started.
     """
-    if getattr(g, "sleep_stage", "awake") != "sleep":
+    if g.sleep_stage != "sleep":
         return False
     # Avoid overlapping lines.
-    if getattr(g, "line", "") and now < float(getattr(g, "line_until", 0.0)):
+    if g.line and now < g.line_until:
         return False
-    dur = random.uniform(cfg.SLEEP_TALK_MIN_SEC, cfg.SLEEP_TALK_MAX_SEC)
+    dur = rng.uniform(cfg.SLEEP_TALK_MIN_SEC, cfg.SLEEP_TALK_MAX_SEC)
     # Use dialogue tag if present; fall back to cute mumbling.
-    fallback = random.choice(["……むにゃ……", "すやぁ……", "んぅ……", "……zzz……"])
+    fallback = rng.choice(["……むにゃ……", "すやぁ……", "んぅ……", "……zzz……"])
     set_line(g, now, dlg.pick("sleep_talk") or fallback, (dur, dur))
     return True
 
 def step_sleep_system(g: Girl, dlg: Dialogue, now: float):
-    """Advance the sleep system state machine.
+    """Advance the sleep system state machine ("sleep_stage" timer handler).
 
     This is intentionally time-based (no permanent locks), matching the
     project's "always ends" design. Any stage must eventually resolve.
     """
-    stage = getattr(g, "sleep_stage", "awake")
-
-    # Finish drowsy transition when its timer is over AND the line is no longer showing.
-    if stage == "drowsy" and now >= float(getattr(g, "sleep_stage_until", 0.0)) and now >= float(getattr(g, "line_until", 0.0)):
-        # Decide whether this drowsy was pre-sleep or wake-up based on lights and readiness.
-        if getattr(g, "lights_off", False):
-            g.sleep_stage = "sleep"
-            g.state = "sleep"
-        else:
-            g.sleep_stage = "awake"
-        g.sleep_stage_until = 0.0
+    stage = g.sleep_stage
+    if stage != "drowsy":
+        return
+    # the yawn / groggy line is still showing: finish when it ends
+    if now < g.sleep_stage_until or now < g.line_until:
+        g.rt.timers.at("sleep_stage", max(g.sleep_stage_until, g.line_until))
+        return
 
+    # Finish drowsy transition: its timer is over AND the line is no longer showing.
+    # Decide whether this drowsy was pre-sleep or wake-up based on lights and readiness.
+    if g.lights_off:
+        g.sleep_stage = "sleep"
+        g.state = "sleep"
+    else:
+        g.sleep_stage = "awake"
+    g.sleep_stage_until = 0.0
+
+
+def install_timers(g: Girl, dlg: Dialogue):
+    """Register the sim's handlers on g.rt.timers and arm what the save carries over."""
+    timers = g.rt.timers
+    timers.on("state", lambda now: pick_idle_state(g, dlg, now))
+    timers.on("sleep_stage", lambda now: step_sleep_system(g, dlg, now))
+    timers.at("state", g.state_until)
+    if g.sleep_stage == "drowsy":
+        timers.at("sleep_stage", g.sleep_stage_until)
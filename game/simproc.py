@@ -0,0 +1,432 @@
+"""simproc.py
+Optional out-of-process simulation (--sim-process, or cfg.SIM_PROCESS).
+
+In the normal mode every fixed step, state pick, dialogue reload and save
+snapshot runs on the render thread. In this mode a worker process (spawned,
+so it behaves the same on Windows) owns:
+
+- the behaviour fields (SIM_FIELDS): meters, sleep system, idle state,
+  wandering, lights. It runs sim.step_sim at cfg.SIM_HZ, the "state" /
+  "sleep_stage" timers and the closed-form catch-up after a suspend.
+- the save writer (autosave.AutoSaver) and history.bin writes.
+- lines.json hot reload (the JSON is parsed there; the render side reparses
+  only when told the file changed).
+
+The render process keeps everything else (UI, topics, idle beat, voice,
+companions). The two sides talk through:
+
+  shared memory   one fixed block, LAYOUT below, written by the worker under a
+                  seqlock: the counter is odd while a write is in progress;
+                  a reader copies the block and retries if the counter was
+                  odd or moved. Reading never blocks the render frame.
+  action queue    render -> worker: ("set", id, changes) for the behaviour
+                  fields the render side changed this frame (clicks, idle
+                  beat; meters as deltas), ("save", id, fields) / ("file",
+                  id, path, bytes) for saves, ("quit",).
+
+The worker publishes the id of the last action it applied ("ack"). A snapshot
+older than the render side's last "set" is ignored, so a click never flickers
+back for a frame. Lines the worker starts (state picks, yawns, sleep talk)
+come with a sequence number and are shown like local ones.
+
+Record / replay need one clock and one RNG, so --sim-process is ignored there.
+"""
+from __future__ import annotations
+
+import queue
+import struct
+import sys
+import time
+from multiprocessing import get_context, shared_memory
+
+from . import config as cfg
+from .model import SAVE_FIELDS, SCHEMA_VERSION, clamp, girl_from_save, save_dict
+
+# behaviour fields owned by the worker; line / line_until go both ways
+SIM_FIELDS = (
+    "hunger", "mood", "sleepiness", "lights_off",
+    "sleep_stage", "sleep_ready_at", "sleep_stage_until",
+    "state", "state_until",
+    "line", "line_until",
+    "x_offset", "vx_px_per_sec", "walk_until", "next_walk_at", "facing",
+)
+RENDER_FIELDS = tuple(f for f in SAVE_FIELDS if f not in SIM_FIELDS)
+_METERS = ("hunger", "mood", "sleepiness")
+
+STATES = ("idle", "music", "grumpy", "sleep")
+STAGES = ("awake", "drowsy", "sleep")
+
+# fixed binary layout of the shared block (after the 8-byte seqlock counter)
+LAYOUT = (
+    ("t_step", "d"),            # worker time of the last fixed step
+    ("hunger", "d"), ("mood", "d"), ("sleepiness", "d"),
+    ("x_prev", "d"), ("x_offset", "d"), ("vx_px_per_sec", "d"),
+    ("walk_until", "d"), ("next_walk_at", "d"),
+    ("sleep_ready_at", "d"), ("sleep_stage_until", "d"), ("state_until", "d"),
+    ("line_until", "d"),
+    ("wake_at", "d"),           # worker's next timer / walk start (render idle wait)
+    ("ack", "I"), ("line_seq", "I"), ("dlg_seq", "I"), ("steps", "I"),
+    ("save_writes", "I"), ("save_skipped", "I"), ("save_coalesced", "I"),
+    ("save_errors", "I"), ("save_bytes", "I"),
+    ("step_us", "f"), ("save_ms", "f"),
+    ("facing", "b"), ("state", "B"), ("sleep_stage", "B"), ("lights_off", "B"),
+    ("line_len", "H"),
+)
+_SEQ = struct.Struct("<Q")
+_BODY = struct.Struct("<" + "".join(f for _, f in LAYOUT) + f"{int(cfg.SIM_PROC_LINE_BYTES)}s")
+_NAMES = tuple(n for n, _ in LAYOUT)
+BLOCK_SIZE = _SEQ.size + _BODY.size
+
+
+def _code(table: tuple[str, ...], value: str) -> int:
+    try:
+        return table.index(value)
+    except ValueError:
+        return 0
+
+
+def _encode_line(text: str) -> bytes:
+    data = text.encode("utf-8")
+    limit = int(cfg.SIM_PROC_LINE_BYTES)
+    if len(data) > limit:
+        # cut on a character boundary
+        data = data[:limit].decode("utf-8", "ignore").encode("utf-8")
+    return data
+
+
+class _Writer:
+    """Worker side of the seqlock."""
+
+    def __init__(self, buf):
+        self.buf = buf
+        self.seq = 0
+        _SEQ.pack_into(buf, 0, 0)
+
+    def publish(self, values: dict, line: bytes):
+        self.seq += 1  # odd: write in progress
+        _SEQ.pack_into(self.buf, 0, self.seq)
+        _BODY.pack_into(self.buf, _SEQ.size, *(values[n] for n in _NAMES), line)
+        self.seq += 1
+        _SEQ.pack_into(self.buf, 0, self.seq)
+
+
+def _read(buf, tries: int = 8) -> dict | None:
+    """Reader side: a consistent copy of the block, or None (writer busy, try next frame)."""
+    for _ in range(tries):
+        s1 = _SEQ.unpack_from(buf, 0)[0]
+        if s1 & 1:
+            continue
+        raw = bytes(buf[_SEQ.size:BLOCK_SIZE])
+        if _SEQ.unpack_from(buf, 0)[0] != s1:
+            continue
+        if s1 == 0:
+            return None  # nothing published yet
+        *vals, line = _BODY.unpack(raw)
+        snap = dict(zip(_NAMES, vals))
+        snap["line"] = line[: snap["line_len"]].decode("utf-8", "ignore")
+        snap["seq"] = s1
+        return snap
+    return None
+
+
+# ---------------------------------------------------------------- worker
+def _apply_changes(g, changes: dict):
+    timers = g.rt.timers
+    for k, v in changes.items():
+        if k in _METERS:
+            setattr(g, k, clamp(getattr(g, k) + v))
+        else:
+            setattr(g, k, v)
+    if "state_until" in changes:
+        timers.at("state", g.state_until)
+    if g.sleep_stage == "drowsy" and "sleep_stage_until" in changes:
+        timers.at("sleep_stage", g.sleep_stage_until)
+    elif "sleep_stage" in changes and g.sleep_stage != "drowsy":
+        timers.cancel("sleep_stage")
+
+
+def _worker_main(shm_name: str, actions, init: dict):
+    from .autosave import AutoSaver
+    from .clock import clock, seed
+    from .dialogue import Dialogue
+    from .sim import fast_forward, install_timers, step_sim
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    writer = _Writer(shm.buf)
+    seed(init["seed"])
+    clock.tick()
+    g = girl_from_save(init["save"])
+    dlg = Dialogue(init["dlg_path"])
+    saver = AutoSaver(init["save_path"])
+    install_timers(g, dlg)
+    timers = g.rt.timers
+
+    sim_dt = 1.0 / float(cfg.SIM_HZ)
+    now = clock.time()
+    prev_now = now
+    next_step = now + sim_dt
+    t_step = now
+    x_prev = g.x_offset
+    ack = steps = line_seq = dlg_seq = 0
+    step_us = 0.0
+    published_line = (g.line, g.line_until)
+    dlg_mtime = dlg.mtime
+    running = True
+
+    while running:
+        # actions wake the worker early; otherwise it sleeps until the next step
+        try:
+            msg = actions.get(timeout=max(0.0, next_step - time.time()))
+        except queue.Empty:
+            msg = None
+        while msg is not None:
+            kind = msg[0]
+            if kind == "quit":
+                running = False
+                break
+            if kind == "set":
+                _apply_changes(g, msg[2])
+            elif kind == "save":
+                for k, v in msg[2].items():
+                    setattr(g, k, v)
+                saver.request(g)
+            elif kind == "file":
+                saver.request_file(msg[2], msg[3])
+            ack = msg[1]
+            try:
+                msg = actions.get_nowait()
+            except queue.Empty:
+                msg = None
+
+        clock.tick()
+        now = clock.time()
+        if now - prev_now >= float(cfg.CATCHUP_MIN_SEC):
+            # suspended / stalled: closed-form catch-up, then resume stepping from now
+            fast_forward(g, prev_now, now)
+            next_step = now + sim_dt
+            x_prev = g.x_offset
+        prev_now = now
+
+        n = 0
+        t0 = time.perf_counter()
+        while next_step <= now and n < cfg.SIM_MAX_STEPS:
+            x_prev = g.x_offset
+            step_sim(g, next_step, sim_dt)
+            t_step = next_step
+            next_step += sim_dt
+            n += 1
+        if next_step <= now:
+            next_step = now + sim_dt  # drop the backlog (see main loop)
+        if n:
+            steps += n
+            step_us = (time.perf_counter() - t0) * 1e6 / n
+        timers.run(now)
+
+        dlg.load_if_needed()
+        if dlg.mtime != dlg_mtime:
+            dlg_mtime = dlg.mtime
+            dlg_seq += 1
+        line_now = (g.line, g.line_until)
+        if line_now != published_line:
+            published_line = line_now
+            line_seq += 1
+
+        st = saver.stats()
+        walk_at = now if g.vx_px_per_sec != 0.0 else g.next_walk_at
+        line = _encode_line(g.line)
+        writer.publish({
+            "t_step": t_step,
+            "hunger": g.hunger, "mood": g.mood, "sleepiness": g.sleepiness,
+            "x_prev": x_prev, "x_offset": g.x_offset, "vx_px_per_sec": g.vx_px_per_sec,
+            "walk_until": g.walk_until, "next_walk_at": g.next_walk_at,
+            "sleep_ready_at": g.sleep_ready_at, "sleep_stage_until": g.sleep_stage_until,
+            "state_until": g.state_until, "line_until": g.line_until,
+            "wake_at": min(timers.next_at(), walk_at),
+            "ack": ack, "line_seq": line_seq, "dlg_seq": dlg_seq, "steps": steps & 0xFFFFFFFF,
+            "save_writes": st["writes"], "save_skipped": st["skipped"], "save_coalesced": st["coalesced"],
+            "save_errors": st["errors"], "save_bytes": st["last_bytes"],
+            "step_us": step_us, "save_ms": st["write_ms"],
+            "facing": 1 if g.facing >= 0 else -1,
+            "state": _code(STATES, g.state), "sleep_stage": _code(STAGES, g.sleep_stage),
+            "lights_off": 1 if g.lights_off else 0,
+            "line_len": len(line),
+        }, line)
+
+    saver.close()
+    shm.close()
+
+
+# ---------------------------------------------------------------- render side
+class RemoteSaver:
+    """autosave.AutoSaver's interface, forwarding to the worker."""
+
+    def __init__(self, proc: "SimProcess"):
+        self._proc = proc
+        self.requests = 0
+        self.request_ms = 0.0
+
+    def request(self, g):
+        if not self._proc.alive():
+            return  # worker gone: main.py switches to an in-process AutoSaver
+        t0 = time.perf_counter()
+        # click handlers save mid-frame, before the frame's push(): send this
+        # frame's behaviour changes first so the save includes them
+        self._proc.push(g)
+        self._proc.send("save", {k: getattr(g, k) for k in RENDER_FIELDS})
+        self.requests += 1
+        self.request_ms = (time.perf_counter() - t0) * 1000.0
+
+    def request_file(self, path: str, data: bytes):
+        self._proc.send("file", path, data)
+
+    def close(self, timeout: float = 2.0):
+        self._proc.close(timeout)
+
+    def stats(self) -> dict:
+        snap = self._proc.snap or {}
+        return {
+            "requests": self.requests,
+            "coalesced": snap.get("save_coalesced", 0),
+            "writes": snap.get("save_writes", 0),
+            "skipped": snap.get("save_skipped", 0),
+            "errors": snap.get("save_errors", 0),
+            "request_ms": self.request_ms,
+            "write_ms": snap.get("save_ms", 0.0),
+            "max_write_ms": snap.get("save_ms", 0.0),
+            "last_bytes": snap.get("save_bytes", 0),
+            "shard_writes": {},
+        }
+
+
+class SimProcess:
+    def __init__(self, save_path: str, dlg_path: str):
+        self.save_path = save_path
+        self.dlg_path = dlg_path
+        self._ctx = get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=BLOCK_SIZE)
+        self._shm.buf[:BLOCK_SIZE] = bytes(BLOCK_SIZE)
+        self._actions = self._ctx.Queue()
+        self._proc = None
+        self._sent = 0
+        self._sent_set = 0   # id of the last "set": older snapshots are ignored
+        self._mirror: dict = {}
+        self._line_seq = 0
+        self._dlg_seq = 0
+        self.snap: dict | None = None
+        self.stale = 0       # snapshots skipped (older than our last action)
+        self.torn = 0        # frames without a consistent read
+        self.saver = RemoteSaver(self)
+
+    def start(self, g, seed: int):
+        init = {
+            "seed": int(seed),
+            "save": dict(save_dict(g), schema_version=SCHEMA_VERSION),
+            "save_path": self.save_path,
+            "dlg_path": self.dlg_path,
+        }
+        self._proc = self._ctx.Process(
+            target=_worker_main, args=(self._shm.name, self._actions, init), name="electro-sim", daemon=True,
+        )
+        self._proc.start()
+        self._mirror = {k: getattr(g, k) for k in SIM_FIELDS}
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def send(self, kind: str, *args):
+        # nothing reads the queue once the worker is gone; a put would only fill
+        # the pipe and hang interpreter exit in the queue's feeder thread
+        if not self.alive():
+            return
+        self._sent += 1
+        self._actions.put((kind, self._sent, *args))
+
+    def pull(self, g, now: float) -> bool:
+        """Copy the worker's latest state into g. Returns True if lines.json changed."""
+        snap = _read(self._shm.buf)
+        if snap is None:
+            if _SEQ.unpack_from(self._shm.buf, 0)[0]:
+                self.torn += 1
+            return False
+        self.snap = snap
+        if snap["ack"] < self._sent_set:
+            self.stale += 1
+            return False
+        for k in _METERS + ("x_offset", "vx_px_per_sec", "walk_until", "next_walk_at",
+                            "sleep_ready_at", "sleep_stage_until", "state_until"):
+            setattr(g, k, snap[k])
+        g.facing = snap["facing"]
+        g.lights_off = bool(snap["lights_off"])
+        g.state = STATES[snap["state"]]
+        g.sleep_stage = STAGES[snap["sleep_stage"]]
+        # worker lines (state picks, yawns, sleep talk) are shown like local ones;
+        # line ends stay with the local "line" timer
+        if snap["line_seq"] != self._line_seq:
+            self._line_seq = snap["line_seq"]
+            if snap["line"] and (snap["line"], snap["line_until"]) != (g.line, g.line_until):
+                from .dialogue import set_line_until
+                if snap["line"] != g.line:
+                    g.rt.line_page = 0
+                g.line = snap["line"]
+                set_line_until(g, snap["line_until"])
+        g.rt.x_prev = snap["x_prev"]
+        g.rt.sim_alpha = min(1.0, max(0.0, (now - snap["t_step"]) * float(cfg.SIM_HZ)))
+        self._mirror = {k: getattr(g, k) for k in SIM_FIELDS}
+        changed = snap["dlg_seq"] != self._dlg_seq
+        self._dlg_seq = snap["dlg_seq"]
+        return changed
+
+    def push(self, g):
+        """Send the behaviour fields the render side changed since pull() (meters as deltas)."""
+        changes = {}
+        for k in SIM_FIELDS:
+            v = getattr(g, k)
+            old = self._mirror.get(k)
+            if v == old:
+                continue
+            changes[k] = (v - old) if k in _METERS else v
+        if changes:
+            self.send("set", changes)
+            self._sent_set = self._sent
+            self._mirror = {k: getattr(g, k) for k in SIM_FIELDS}
+
+    def wake_at(self) -> float:
+        return self.snap["wake_at"] if self.snap else float("inf")
+
+    def stats(self) -> dict:
+        snap = self.snap or {}
+        return {
+            "alive": self.alive(),
+            "steps": snap.get("steps", 0),
+            "step_us": snap.get("step_us", 0.0),
+            "sent": self._sent,
+            "ack": snap.get("ack", 0),
+            "stale": self.stale,
+            "torn": self.torn,
+        }
+
+    def close(self, timeout: float = 2.0):
+        """Stop the worker after it has applied (and saved) everything sent so far."""
+        drained = False
+        if self._proc is not None:
+            if self._proc.is_alive():
+                self._actions.put(("quit",))
+                self._proc.join(timeout + 3.0)
+                if self._proc.is_alive():
+                    print("sim process did not stop; terminating", file=sys.stderr)
+                    self._proc.terminate()
+                    self._proc.join(1.0)
+                else:
+                    # a clean exit means the worker read everything up to "quit"
+                    drained = self._proc.exitcode == 0
+            self._proc = None
+        if not drained:
+            # dead / killed worker: don't wait at exit for the feeder thread to
+            # flush messages nobody will read
+            self._actions.cancel_join_thread()
+        self._actions.close()
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
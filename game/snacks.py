@@ -7,6 +7,7 @@ from dataclasses import dataclass
 import pygame
 
 from . import config as cfg
+from . import pak
 
 
 @dataclass
@@ -32,7 +33,7 @@ class Snacks:
 
     def load_if_needed(self, *, force: bool = False, icon_scale: int = 1):
         try:
-            m = os.path.getmtime(self.path)
+            m = pak.getmtime(self.path)
         except Exception:
             return
         if (not force) and m <= self.mtime:
@@ -40,7 +41,7 @@ class Snacks:
 
         self.mtime = m
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
+            with pak.open(self.path, "r") as f:
                 data = json.load(f)
         except Exception:
             data = {}
@@ -75,10 +76,11 @@ class Snacks:
             if not sn.icon:
                 continue
             p = os.path.join(cfg.SNACKS_ICON_DIR, sn.icon)
-            if not os.path.exists(p):
+            if not pak.isfile(p):
                 continue
             try:
-                img = pygame.image.load(p).convert_alpha()
+                with pak.open(p) as f:
+                    img = pygame.image.load(f, sn.icon).convert_alpha()
                 if icon_scale != 1:
                     w, h = img.get_size()
                     img = pygame.transform.scale(img, (w * icon_scale, h * icon_scale))
@@ -0,0 +1,139 @@
+"""startup.py
+Staged startup pipeline with a per-stage timing report.
+
+main() does only what the first frame needs (save, window, fonts, the
+selected character, dialogue), presents that frame, and queues everything
+else (background thumbnails, snack icons, topics, hot-reload snapshot,
+voice blips) as deferred stages. The main loop calls step() once per frame,
+which runs pending stages until cfg.STARTUP_STAGE_BUDGET_MS is spent (at
+least one stage per call), so the window stays responsive while the rest
+loads.
+
+Stages run on the main thread: pygame surfaces are not safe to create from
+worker threads on every platform.
+
+    startup = StartupPipeline()
+    with startup.stage("window"):
+        screen = pygame.display.set_mode(...)
+    startup.defer("topics", lambda: topics.load_if_needed(force=True))
+    startup.mark("first_frame")
+    ...
+    startup.step()              # every frame
+    startup.require("topics")   # run now if a handler needs it this frame
+
+Every entry records wall and CPU time (see game/profiler.py for the
+--profile-startup report).
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
+from . import config as cfg
+
+
+class StartupPipeline:
+    def __init__(self, t0: float | None = None):
+        self.t0 = time.perf_counter() if t0 is None else float(t0)
+        # (stage name, wall ms, cpu ms, finished at ms since t0, ok)
+        self.report: list[tuple[str, float, float, float, bool]] = []
+        self.pending: deque[tuple[str, Callable[[], object]]] = deque()
+        self.done: set[str] = set()
+
+    def _ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    def _record(self, name: str, started_ms: float, started_cpu: float, ok: bool = True):
+        end = self._ms()
+        cpu = (time.process_time() - started_cpu) * 1000.0
+        self.report.append((name, end - started_ms, cpu, end, ok))
+        self.done.add(name)
+
+    def add(self, name: str, wall_ms: float, cpu_ms: float, end_ms: float | None = None):
+        """Record a phase measured elsewhere (e.g. module imports before main())."""
+        self.report.append((name, float(wall_ms), float(cpu_ms), self._ms() if end_ms is None else float(end_ms), True))
+        self.done.add(name)
+
+    # ---- immediate stages ----
+    @contextmanager
+    def stage(self, name: str):
+        """Time an inline block (critical path)."""
+        start, cpu = self._ms(), time.process_time()
+        try:
+            yield
+        finally:
+            self._record(name, start, cpu)
+
+    def mark(self, name: str):
+        """Record a milestone (e.g. "first_frame") with zero duration."""
+        self._record(name, self._ms(), time.process_time())
+
+    # ---- deferred stages ----
+    def defer(self, name: str, fn: Callable[[], object]):
+        self.pending.append((name, fn))
+
+    def _run(self, name: str, fn: Callable[[], object]):
+        start, cpu = self._ms(), time.process_time()
+        ok = True
+        try:
+            fn()
+        except Exception:
+            # a broken optional asset must not keep the app from starting
+            ok = False
+        self._record(name, start, cpu, ok)
+        if not self.pending:
+            self.mark("all_loaded")
+
+    def step(self, budget_ms: float | None = None) -> bool:
+        """Run deferred stages within the frame budget. Returns True if any ran."""
+        if not self.pending:
+            return False
+        budget = float(cfg.STARTUP_STAGE_BUDGET_MS if budget_ms is None else budget_ms)
+        frame_start = self._ms()
+        while self.pending:
+            self._run(*self.pending.popleft())
+            if self._ms() - frame_start >= budget:
+                break
+        return True
+
+    def require(self, *names: str):
+        """Run the named pending stages now (out of order) if they have not run yet."""
+        for name in names:
+            for item in list(self.pending):
+                if item[0] == name:
+                    self.pending.remove(item)
+                    self._run(*item)
+
+    def ready(self, name: str) -> bool:
+        return name in self.done
+
+    @property
+    def finished(self) -> bool:
+        return not self.pending
+
+    # ---- report ----
+    def milestone_ms(self, name: str) -> float | None:
+        for n, _, _, end, _ in self.report:
+            if n == name:
+                return end
+        return None
+
+    def summary(self) -> str:
+        first = self.milestone_ms("first_frame")
+        total = self.milestone_ms("all_loaded")
+        parts = [f"first:{first:.0f}ms" if first is not None else "first:-"]
+        parts.append(f"all:{total:.0f}ms" if total is not None else f"pending:{len(self.pending)}")
+        stages = [r for r in self.report if r[1] > 0.0]
+        if stages:
+            slow = max(stages, key=lambda r: r[1])
+            parts.append(f"slowest:{slow[0]} {slow[1]:.0f}ms")
+        return "startup " + " ".join(parts)
+
+    def report_lines(self) -> list[str]:
+        out = []
+        for name, ms, cpu, end, ok in self.report:
+            flag = "" if ok else "  (failed)"
+            out.append(f"{name:<14} {ms:8.1f} ms (cpu {cpu:7.1f})   @ {end:8.1f} ms{flag}")
+        return out
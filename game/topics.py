@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from .model import Girl
+from .clock import clock
 
 
 @dataclass
@@ -89,7 +90,7 @@ def _parse_hhmm(s: str) -> tuple[int, int] | None:
 
 def unlock_ok(g: Girl, unlock: dict[str, Any], now: float | None = None) -> bool:
     if now is None:
-        now = time.time()
+        now = clock.time()
 
     typ = (unlock.get("type") or "always").strip()
 
@@ -98,11 +99,11 @@ def unlock_ok(g: Girl, unlock: dict[str, Any], now: float | None = None) -> bool
 
     if typ == "affection_gte":
         v = int(unlock.get("value", 0))
-        return int(getattr(g, "affection", 0)) >= v
+        return g.affection >= v
 
     if typ == "days_since_first_gte":
         v = int(unlock.get("value", 0))
-        first = float(getattr(g, "first_seen", 0.0) or 0.0)
+        first = g.first_seen
         if first <= 0:
             return False
         days = (now - first) / (60 * 60 * 24)
@@ -110,7 +111,7 @@ def unlock_ok(g: Girl, unlock: dict[str, Any], now: float | None = None) -> bool
 
     if typ == "flag_true":
         name = str(unlock.get("name", ""))
-        flags = getattr(g, "flags", {}) or {}
+        flags = g.flags
         return bool(flags.get(name, False))
 
     if typ == "weekday_in":
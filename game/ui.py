@@ -293,7 +293,9 @@ class GearMenu:
         self.item_up = Button((0, 0, 0, 0), "VOL +")
         self.item_down = Button((0, 0, 0, 0), "VOL -")
         self.item_log = Button((0, 0, 0, 0), "LOG")
+        self.item_graph = Button((0, 0, 0, 0), "GRAPH")
         self.item_outfit = Button((0, 0, 0, 0), "OUT:normal")
+        self.item_friends = Button((0, 0, 0, 0), "FRIENDS:0")
 
         self.items = [
             self.item_bg,
@@ -305,6 +307,8 @@ class GearMenu:
             self.item_down,
             self.item_outfit,
             self.item_log,
+            self.item_graph,
+            self.item_friends,
         ]
 
         # paging (future-proof when items grow)
@@ -392,11 +396,12 @@ class GearMenu:
                 b.rect = pygame.Rect(0, 0, 0, 0)
 
     def update_labels(self, g: Girl):
-        self.item_frame.label = "FRAME:OFF" if getattr(g, "borderless", False) else "FRAME:ON"
-        self.item_dock.label = "DOCK:ON" if getattr(g, "dock_bottom_right", True) else "DOCK:OFF"
-        self.item_top.label = "TOP:ON" if getattr(g, "always_on_top", False) else "TOP:OFF"
+        self.item_frame.label = "FRAME:OFF" if g.borderless else "FRAME:ON"
+        self.item_dock.label = "DOCK:ON" if g.dock_bottom_right else "DOCK:OFF"
+        self.item_top.label = "TOP:ON" if g.always_on_top else "TOP:OFF"
         self.item_mute.label = "SFX:OFF" if g.sfx_muted else "SFX:ON"
-        self.item_outfit.label = f"OUT:{getattr(g, 'outfit', 'normal')}"
+        self.item_outfit.label = f"OUT:{g.outfit}"
+        self.item_friends.label = f"FRIENDS:{len(g.companions)}"
         vol = int(round(clamp01(g.sfx_scale) * 100))
         self.item_up.label = f"VOL {vol}% +"
         self.item_down.label = f"VOL {vol}% -"
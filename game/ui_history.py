@@ -0,0 +1,124 @@
+"""ui_history.py
+Meter history panel (sparklines for hunger / mood / sleepiness / affection).
+
+The graphs are drawn into one Surface that is rebuilt only when the data
+can have changed (new sample or closed bucket) or the level tab changes;
+every other frame is a single blit. Data comes from history.MeterHistory.
+"""
+from __future__ import annotations
+
+import pygame
+
+from . import config as cfg
+from .clock import clock
+from .history import METERS
+
+_COLORS = {
+    "hunger": (240, 170, 90),
+    "mood": (120, 200, 240),
+    "sleepiness": (170, 140, 230),
+    "affection": (240, 120, 160),
+}
+_LABELS = {"hunger": "HUNGER", "mood": "MOOD", "sleepiness": "SLEEPY", "affection": "LOVE"}
+
+
+class HistoryPanel:
+    def __init__(self):
+        self.open = False
+        self.history = None  # set once the "history" startup stage has run
+        self.level_i = 0
+        self.panel = pygame.Rect(8, 24, cfg.W - 16, cfg.H - 32)
+        self.tabs: list[tuple[int, pygame.Rect]] = []
+        self._surf: pygame.Surface | None = None
+        self._key = None
+        self.rebuilds = 0
+
+    def toggle(self):
+        self.open = not self.open
+
+    def close(self):
+        self.open = False
+
+    def click(self, pos) -> bool:
+        """Tabs switch the resolution; anything else closes. Returns True if handled."""
+        if not self.open:
+            return False
+        for i, r in self.tabs:
+            if r.collidepoint(pos):
+                self.level_i = i
+                return True
+        self.open = False
+        return True
+
+    # ---- drawing ----
+    def draw(self, screen: pygame.Surface, font, font_small):
+        if self.history is None:
+            return
+        levels = self.history.levels
+        self.level_i %= len(levels)
+        key = (self.level_i, self.history.version, self.history.next_sample_at)
+        if self._surf is None or key != self._key:
+            self._surf = self._build(font, font_small, levels)
+            self._key = key
+            self.rebuilds += 1
+        screen.blit(self._surf, self.panel.topleft)
+
+    def _build(self, font, font_small, levels) -> pygame.Surface:
+        w, h = self.panel.size
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.rect(surf, (28, 28, 36), surf.get_rect(), 0, 12)
+        pygame.draw.rect(surf, (120, 120, 140), surf.get_rect(), 2, 12)
+        surf.blit(font.render("HISTORY", True, (230, 230, 240)), (10, 8))
+
+        # level tabs (screen coordinates kept for click())
+        self.tabs = []
+        x = w - 10
+        for i in reversed(range(len(levels))):
+            img = font_small.render(levels[i].name, True, (235, 235, 245) if i == self.level_i else (140, 140, 155))
+            r = pygame.Rect(x - img.get_width() - 8, 10, img.get_width() + 8, img.get_height() + 4)
+            if i == self.level_i:
+                pygame.draw.rect(surf, (70, 70, 90), r, 0, 4)
+            surf.blit(img, (r.x + 4, r.y + 2))
+            self.tabs.append((i, r.move(self.panel.topleft)))
+            x = r.x - 4
+
+        name = levels[self.level_i].name
+        now = clock.time()
+        top = 36
+        row_h = (h - top - 8) // len(METERS)
+        label_w = 58
+        plot = pygame.Rect(label_w + 10, 0, w - label_w - 20, row_h - 10)
+        for m_i, meter in enumerate(METERS):
+            y0 = top + m_i * row_h
+            color = _COLORS[meter]
+            cols = self.history.columns(name, meter, cfg.HISTORY_COLUMNS, now)
+            valid = [c for c in cols if c is not None]
+            surf.blit(font_small.render(_LABELS[meter], True, color), (10, y0 + 2))
+            if valid:
+                surf.blit(font_small.render(f"{valid[-1][0]:.0f}", True, (220, 220, 230)), (10, y0 + 18))
+
+            r = plot.move(0, y0)
+            pygame.draw.rect(surf, (38, 38, 50), r, 0, 4)
+            top_val = max(100.0, max((c[2] for c in valid), default=100.0))
+            col_w = r.w / max(1, len(cols))
+            dim = (color[0] // 2, color[1] // 2, color[2] // 2)
+            line: list[tuple[int, int]] = []
+
+            def ypos(v: float) -> int:
+                return r.bottom - 1 - int((r.h - 2) * max(0.0, min(1.0, v / top_val)))
+
+            for c_i, c in enumerate(cols):
+                cx = r.x + int(c_i * col_w + col_w / 2)
+                if c is None:
+                    # gap: break the mean line
+                    if len(line) > 1:
+                        pygame.draw.lines(surf, color, False, line)
+                    line = []
+                    continue
+                pygame.draw.line(surf, dim, (cx, ypos(c[1])), (cx, ypos(c[2])))
+                line.append((cx, ypos(c[0])))
+            if len(line) > 1:
+                pygame.draw.lines(surf, color, False, line)
+            elif line:
+                surf.set_at(line[0], color)
+        return surf
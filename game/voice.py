@@ -0,0 +1,217 @@
+"""voice.py
+Procedural voice blips + lip-sync envelope.
+
+se_talk.wav is a single canned sound. Instead, every line is voiced as a
+short run of synthesised "blips", one per syllable of the text:
+
+- Syllables are classed by vowel (kana via unicodedata, ASCII vowels,
+  everything else hashed), plus a small pitch variant from the code point.
+- Each blip is synthesised once with NumPy and kept as a pygame Sound keyed
+  by (preset, vowel, variant), so voicing a line is a dict lookup per
+  syllable, never runtime synthesis.
+- Blips are played on the "voice" channel pool of AudioEngine, scheduled
+  from the main loop (update()).
+- The same attack/decay envelope drives g.mouth_open, so the mouth follows
+  the blips instead of a fixed 0.18s toggle.
+
+NumPy is optional: without it (or with an unusual mixer format) no audio is
+synthesised, but the schedule and the mouth envelope still work.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import unicodedata
+
+import pygame
+
+from . import config as cfg
+
+try:
+    import numpy as np
+except Exception:  # optional dependency
+    np = None
+
+
+VOWELS = "aiueon"
+# pitch offset / second partial ratio per vowel class (rough formant tint)
+_VOWEL_SHIFT = {"a": 0.0, "i": 0.9, "u": -0.6, "e": 0.5, "o": -0.3, "n": -1.0}
+_VOWEL_PARTIAL = {"a": 2.0, "i": 3.0, "u": 1.5, "e": 2.5, "o": 1.75, "n": 1.25}
+_VARIANTS = 3
+
+
+def syllable_of(ch: str) -> tuple[str, int] | None:
+    """(vowel class, pitch variant) for one character, or None for a pause."""
+    if not ch or ch.isspace():
+        return None
+    cat = unicodedata.category(ch)
+    if cat[0] in ("P", "Z", "S", "C") or ch in "ー〜～…":
+        return None
+    variant = ord(ch) % _VARIANTS
+    name = unicodedata.name(ch, "")
+    if name.startswith(("HIRAGANA LETTER", "KATAKANA LETTER")):
+        v = name.rsplit(" ", 1)[-1][-1].lower()
+        if v in VOWELS:
+            return v, variant
+    low = ch.lower()
+    if low in "aiueo":
+        return low, variant
+    if low.isascii() and low.isalpha():
+        # consonants: hash to a vowel class (stable per letter)
+        return VOWELS[ord(low) % 5], variant
+    return VOWELS[ord(ch) % 5], variant
+
+
+def envelope_at(tau: float, preset: dict) -> float:
+    """Blip amplitude (0..1) at tau seconds after its start."""
+    blip = float(preset["blip_sec"])
+    if tau < 0.0 or tau >= blip:
+        return 0.0
+    attack = max(1e-4, float(preset["attack_sec"]))
+    if tau < attack:
+        return tau / attack
+    return math.exp(-(tau - attack) / max(1e-4, float(preset["decay_sec"])))
+
+
+class VoiceBlips:
+    def __init__(self, audio=None, preset: str = "default"):
+        self.audio = audio
+        self.preset = preset if preset in cfg.VOICE_PRESETS else "default"
+        # (preset, vowel, variant) -> Sound (None = synthesis unavailable)
+        self.cache: dict[tuple[str, str, int], pygame.mixer.Sound | None] = {}
+        self.synth_count = 0
+
+        # current line schedule
+        self.text = ""
+        self.start_at = 0.0
+        self.blips: list[tuple[float, tuple[str, int]]] = []  # (offset sec, syllable)
+        self.offsets: list[float] = []
+        self.next_idx = 0
+
+    # ---- preset ----
+    def set_preset(self, preset: str):
+        self.preset = preset if preset in cfg.VOICE_PRESETS else "default"
+
+    def _params(self) -> dict:
+        return cfg.VOICE_PRESETS.get(self.preset) or cfg.VOICE_PRESETS["default"]
+
+    # ---- synthesis (once per key) ----
+    def _mixer_format(self) -> tuple[int, int, int] | None:
+        if np is None or self.audio is None or not getattr(self.audio, "enabled", False):
+            return None
+        try:
+            init = pygame.mixer.get_init()
+        except Exception:
+            return None
+        if not init or init[1] != -16:
+            return None
+        return init
+
+    def _synth(self, vowel: str, variant: int) -> pygame.mixer.Sound | None:
+        fmt = self._mixer_format()
+        if fmt is None:
+            return None
+        rate, _, channels = fmt
+        p = self._params()
+        n = max(1, int(rate * float(p["blip_sec"])))
+        t = np.arange(n, dtype=np.float32) / float(rate)
+
+        f0 = float(p["pitch"]) * (1.0 + float(p["spread"]) * _VOWEL_SHIFT[vowel]) * (1.0 + 0.04 * (variant - 1))
+        wave = 0.6 * np.sign(np.sin(2.0 * np.pi * f0 * t)) + 0.4 * np.sin(2.0 * np.pi * f0 * _VOWEL_PARTIAL[vowel] * t)
+
+        attack = max(1e-4, float(p["attack_sec"]))
+        env = np.where(t < attack, t / attack, np.exp(-(t - attack) / max(1e-4, float(p["decay_sec"]))))
+        pcm = (wave * env * 0.45 * 32767.0).astype(np.int16)
+        if channels > 1:
+            pcm = np.repeat(pcm[:, None], channels, axis=1)
+        try:
+            snd = pygame.sndarray.make_sound(np.ascontiguousarray(pcm))
+        except Exception:
+            return None
+        self.synth_count += 1
+        return snd
+
+    def _sound_key(self, syl: tuple[str, int]) -> str | None:
+        key = (self.preset, syl[0], syl[1])
+        if key not in self.cache:
+            snd = self._synth(*syl)
+            self.cache[key] = snd
+            if snd is not None:
+                self.audio.register(self._audio_key(key), snd, base_key="talk", category="voice")
+        return self._audio_key(key) if self.cache[key] is not None else None
+
+    @staticmethod
+    def _audio_key(key: tuple[str, str, int]) -> str:
+        return "blip:{}:{}{}".format(*key)
+
+    def warm(self):
+        """Synthesise every syllable of the current preset up front (optional)."""
+        for v in VOWELS:
+            for i in range(_VARIANTS):
+                self._sound_key((v, i))
+
+    # ---- schedule ----
+    def say(self, text: str, now: float):
+        p = self._params()
+        step = float(p["blip_sec"]) + float(p["gap_sec"])
+        self.text = text
+        self.start_at = now
+        self.blips = []
+        self.next_idx = 0
+        t = 0.0
+        for ch in text:
+            if len(self.blips) >= int(cfg.VOICE_MAX_BLIPS):
+                break
+            syl = syllable_of(ch)
+            if syl is None:
+                t += step  # punctuation / spaces become short pauses
+                continue
+            self.blips.append((t, syl))
+            t += step
+        self.offsets = [off for off, _ in self.blips]
+
+    def stop(self):
+        self.text = ""
+        self.blips = []
+        self.offsets = []
+        self.next_idx = 0
+
+    def active(self) -> bool:
+        return bool(self.blips)
+
+    def update(self, now: float):
+        """Trigger blips that are due. Late frames skip stale blips instead of bunching them."""
+        if not self.blips:
+            return
+        blip = float(self._params()["blip_sec"])
+        while self.next_idx < len(self.blips):
+            off, syl = self.blips[self.next_idx]
+            at = self.start_at + off
+            if now < at:
+                break
+            self.next_idx += 1
+            if now - at > blip or self.audio is None:
+                continue
+            key = self._sound_key(syl)
+            if key is not None:
+                self.audio.play(key, now=now, rate_limit=False)
+
+    def amplitude(self, now: float) -> float:
+        """Envelope level of the blip sounding at `now` (0 between blips / after the line)."""
+        if not self.blips:
+            return 0.0
+        tau_line = now - self.start_at
+        i = bisect.bisect_right(self.offsets, tau_line)
+        if i == 0:
+            return 0.0
+        return envelope_at(tau_line - self.offsets[i - 1], self._params())
+
+    def mouth_open(self, now: float) -> bool:
+        return self.amplitude(now) >= float(cfg.VOICE_MOUTH_THRESHOLD)
+
+    def stats(self) -> dict:
+        return {
+            "cached": sum(1 for s in self.cache.values() if s is not None),
+            "synth": self.synth_count,
+            "numpy": np is not None,
+        }
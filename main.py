@@ -13,22 +13,44 @@ Tip for future-you:
 
 import os
 import time
-import random
-import json
+import shutil
+import tempfile
 
 import sys
 import ctypes
 
+# --profile-startup: time every import from here on (pygame, game.*)
+if "--profile-startup" in sys.argv[1:]:
+    from game.profiler import ImportTimer
+    _import_timer = ImportTimer().install()
+else:
+    _import_timer = None
+
 import pygame
 
 from game import config as cfg
-from game.model import load_or_new, save
-from game.dialogue import Dialogue, greet_on_start, set_line
-from game.assets import load_sprites, load_sounds, load_clothes_offsets, load_background_images, make_theme_thumbs
+from game import pak
+from game.model import read_save, girl_from_save, save_dict
+from game.clock import clock as session_clock, rng, seed as seed_rng
+from game.replay import LiveInput, RecordingInput, ReplayInput
+from game.autosave import AutoSaver
+from game.dialogue import Dialogue, greet_on_start, set_line, set_line_until
+from game.assets import BackgroundCache, make_theme_thumbs
+from game.audio import AudioEngine
+from game.voice import VoiceBlips
+from game.bgm import AmbientMusic
+from game.startup import StartupPipeline
+from game.fonts import resolve_cjk_font, resolve_fallback_fonts
+from game.fontchain import FontChain
+from game.characters import CharacterRegistry
+from game.companions import Companions, available as companions_available
+from game.simproc import SimProcess
+from game.hotreload import AssetHotReload
 from game.sim import (
     step_sim,
+    fast_forward,
     pick_idle_state,
-    step_sleep_system,
+    install_timers,
     maybe_start_pre_sleep,
     maybe_start_wake_up,
     maybe_start_sleep_talk,
@@ -37,39 +59,26 @@ from game.sim import (
     action_toggle_lights,
 )
 from game.ui import make_buttons, cycle_bg, clamp01, Button
-from game.render import draw_frame
-from game.snacks import Snacks
-from game.topics import Topics, unlock_ok, describe_unlock
-from game.journal import add_log
-
+from game.render import draw_frame, clear_composites, composite_stats
+from game.ui_history import HistoryPanel
+# game.topics / game.snacks / game.journal are imported on first use
+# (deferred startup stages and the talk handlers), not at cold start.
 
+if _import_timer is not None:
+    _import_timer.end_phase()
 
-def _load_borderless_pref() -> bool:
-    """Read borderless preference from save file without constructing full Girl.
-    This allows creating the window with the right flags on startup."""
-    try:
-        if os.path.exists(cfg.SAVE_PATH):
-            with open(cfg.SAVE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return bool(data.get("borderless", False))
-    except Exception:
-        pass
-    return False
 
 
+def _load_borderless_pref(save_data: dict | None) -> bool:
+    """Borderless preference from the parsed save (window flags are needed before the Girl)."""
+    return bool((save_data or {}).get("borderless", False))
 
 
-def _load_dock_pref() -> bool:
-    """Read borderless preference from save file without constructing full Girl.
-    This allows creating the window with the right flags on startup."""
-    try:
-        if os.path.exists(cfg.SAVE_PATH):
-            with open(cfg.SAVE_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return bool(data.get("dock_bottom_right", True))
-    except Exception:
-        pass
-    return False
+def _load_dock_pref(save_data: dict | None) -> bool:
+    """Dock preference from the parsed save. No save yet -> leave the window where the OS put it."""
+    if not save_data:
+        return False
+    return bool(save_data.get("dock_bottom_right", True))
 
 
 
@@ -210,24 +219,19 @@ def _should_quit_on_escape(gear, talk, journal_open: bool) -> bool:
 
 def _stop_walking(g, now: float):
     """Stop walking immediately and schedule the next walk later."""
-    if hasattr(g, "vx_px_per_sec"):
-        g.vx_px_per_sec = 0.0
-    if hasattr(g, "walk_until"):
-        g.walk_until = now
-    if hasattr(g, "next_walk_at"):
-        g.next_walk_at = now + random.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
+    g.vx_px_per_sec = 0.0
+    g.walk_until = now
+    g.next_walk_at = now + rng.uniform(cfg.WALK_REST_MIN_SEC, cfg.WALK_REST_MAX_SEC)
 
 
 def _start_walking(g, now: float):
     """Request walking to start as soon as possible (sim.step_move will pick direction/speed)."""
     # If we are "silent" but line_until is still in the future, unlock movement.
-    if hasattr(g, "line_until") and getattr(g, "line", "") == "":
-        g.line_until = now
+    if g.line == "":
+        set_line_until(g, now)
 
-    if hasattr(g, "next_walk_at"):
-        g.next_walk_at = now
-    if hasattr(g, "walk_until"):
-        g.walk_until = now
+    g.next_walk_at = now
+    g.walk_until = now
 
 
 def _set_line_auto(g, now: float, text: str):
@@ -237,100 +241,213 @@ def _set_line_auto(g, now: float, text: str):
     dur = cfg.IDLE_LINE_MIN_SEC + n * cfg.IDLE_SEC_PER_CHAR
     dur = max(cfg.IDLE_LINE_MIN_SEC, min(cfg.IDLE_LINE_MAX_SEC, dur))
     g.line = text
-    g.line_until = now + dur
+    set_line_until(g, now + dur)
+
+def _cli_value(flag: str) -> str | None:
+    """`--flag value` / `--flag=value` from sys.argv (None if absent)."""
+    args = sys.argv[1:]
+    for i, a in enumerate(args):
+        if a == flag and i + 1 < len(args):
+            return args[i + 1]
+        if a.startswith(flag + "="):
+            return a[len(flag) + 1:]
+    return None
 
-def main():
-    pygame.mixer.pre_init(44100, -16, 2, 512)
-    pygame.init()
 
-    mixer_ok = True
-    try:
-        pygame.mixer.init()
-    except Exception:
-        mixer_ok = False
-
-    flags = pygame.NOFRAME if _load_borderless_pref() else 0
-    screen = pygame.display.set_mode((cfg.W, cfg.H), flags)
-    pygame.display.set_caption("Electro Girl")
-    clock = pygame.time.Clock()
-
-    # 起動時：右下に寄せる（常駐っぽさ）
-    if _load_dock_pref():
-        _move_window_bottom_right(margin=8)
-
-    # 日本語フォント
-    jp_font_path_candidates = [
-        r"C:\Windows\Fonts\meiryo.ttc",
-        r"C:\Windows\Fonts\YuGothM.ttc",
-        r"C:\Windows\Fonts\msgothic.ttc",
-    ]
-    jp_font_path = next((p for p in jp_font_path_candidates if os.path.exists(p)), None)
-    if jp_font_path:
-        font = pygame.font.Font(jp_font_path, 16)
-        font_small = pygame.font.Font(jp_font_path, 14)
+def main():
+    # 起動は段階的に：1フレーム目に必要なもの（セーブ/ウィンドウ/フォント/選択キャラ/セリフ）
+    # だけ先に読み、残り（背景サムネ/おやつアイコン/トピック等）は描画後にメインループで読む。
+    profile_startup = _import_timer is not None
+    startup = StartupPipeline(t0=_import_timer.t0 if profile_startup else None)
+    if profile_startup and _import_timer.phase_ms:
+        startup.add("imports", *_import_timer.phase_ms, end_ms=_import_timer.phase_ms[0])
+
+    # --record FILE / --replay FILE [--speed N] [--headless] (see game/replay.py)
+    record_path = _cli_value("--record")
+    replay = ReplayInput(_cli_value("--replay")) if _cli_value("--replay") else None
+    replay_speed = float(_cli_value("--speed") or 1.0)
+    scratch_dir = None
+    if replay is not None:
+        # same clock / RNG stream as the recording; files go to a scratch dir
+        session_clock.reset(replay.t0_ms)
+        seed_rng(replay.seed)
+        scratch_dir = tempfile.mkdtemp(prefix="electro_replay_")
+        if "--headless" in sys.argv[1:]:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    else:
+        session_clock.tick()
+        rec_seed = int.from_bytes(os.urandom(8), "little") >> 1
+        seed_rng(rec_seed)
+    # --sim-process: behaviour / dialogue reloads / saves in a worker process (game/simproc.py)
+    sim_mode = ("--sim-process" in sys.argv[1:] or bool(cfg.SIM_PROCESS))
+    if sim_mode and (replay is not None or record_path):
+        print("--sim-process is ignored while recording / replaying", file=sys.stderr)
+        sim_mode = False
+
+    def data_path(default: str) -> str:
+        return os.path.join(scratch_dir, os.path.basename(default)) if scratch_dir else default
+
+    with startup.stage("pygame_init"):
+        pygame.mixer.pre_init(44100, -16, 2, 512)
+        pygame.init()
+
+        mixer_ok = True
+        try:
+            pygame.mixer.init()
+        except Exception:
+            mixer_ok = False
+
+    # the save (manifest + shards) is parsed exactly once (window prefs + Girl)
+    with startup.stage("save"):
+        save_data = replay.save if replay is not None else read_save()
+        g = girl_from_save(save_data)
+    if replay is not None:
+        inp = replay
+    elif record_path:
+        inp = RecordingInput(record_path, rec_seed, session_clock.ms, save_dict(g))
     else:
-        font = pygame.font.SysFont(None, 16)
-        font_small = pygame.font.SysFont(None, 14)
+        inp = LiveInput()
+    # saves are written by a background thread (atomic, only the shards that changed),
+    # or by the sim worker process with --sim-process
+    sim_proc = SimProcess(data_path(cfg.SAVE_PATH), cfg.DLG_PATH) if sim_mode else None
+    saver = sim_proc.saver if sim_proc is not None else AutoSaver(data_path(cfg.SAVE_PATH))
+
+    with startup.stage("window"):
+        flags = pygame.NOFRAME if _load_borderless_pref(save_data) else 0
+        screen = pygame.display.set_mode((cfg.W, cfg.H), flags)
+        pygame.display.set_caption("Electro Girl")
+        fps_clock = pygame.time.Clock()
+
+        # 起動時：右下に寄せる（常駐っぽさ）
+        if _load_dock_pref(save_data):
+            _move_window_bottom_right(margin=8)
+
+    # 日本語フォント（解決結果は font_cache.json に保存、SysFont の全スキャンはしない）
+    with startup.stage("fonts"):
+        font_stats: dict = {}
+        jp_font_path = resolve_cjk_font(stats=font_stats)
+        # glyphs the main font lacks (✨ etc.) come from symbol fonts, then
+        # pygame's bundled default font (Font(None) needs no scan)
+        font_chain = [jp_font_path, *resolve_fallback_fonts(), None] if jp_font_path else [*resolve_fallback_fonts(), None]
+        font = FontChain(font_chain, 16)
+        font_small = FontChain(font_chain, 14)
 
     # --- assets ---
+    # assets.pak (tools/build_pak.py) があれば mmap で開き、以後の素材読み込みはそこから。
+    pak.mount(cfg.ASSETS_PAK)
     # ※瞬き口パク用の face スプライトも load_sprites 側で読む（後述の差分を適用）
+    # キャラパックは meta.json だけ索引し、選択中の1体だけデコードする。
     scale = 3
-    sprites = load_sprites(scale=scale)
-    clothes_offsets = load_clothes_offsets(scale=scale)
-    sounds = load_sounds(mixer_ok)
+    with startup.stage("character"):
+        characters = CharacterRegistry()
+        if g.character not in characters.list_ids():
+            g.character = cfg.DEFAULT_CHARACTER
+        sprite_stats: dict = {}
+        sprites, clothes_offsets = characters.load(g.character, scale=scale, stats=sprite_stats)
+    # SFX are decoded on first use; see game/audio.py
+    audio = AudioEngine(mixer_ok)
+
+    def voice_preset_for(pack_id: str) -> str:
+        pack = characters.get(pack_id)
+        return (pack.voice if pack is not None else "") or "default"
+
+    # per-syllable blips (NumPy); the same envelope drives the mouth
+    voice = VoiceBlips(audio, voice_preset_for(g.character))
+    voiced_line = ""
+    # streamed ambient music for the "music" state (assets/bgm/)
+    bgm = AmbientMusic(mixer_ok)
+
+    with startup.stage("dialogue"):
+        dlg = Dialogue(cfg.DLG_PATH)
+
+    # other packs in the room (struct-of-arrays, see game/companions.py)
+    companions = Companions(rng.getrandbits(63))
+    companion_sprites: dict[str, tuple] = {}
+
+    def add_companion(pack_id: str, now_ts: float):
+        if pack_id not in companion_sprites:
+            companion_sprites[pack_id] = characters.load(pack_id, scale=int(cfg.COMPANION_SCALE))
+        pack = characters.get(pack_id)
+        companions.add(pack_id, now_ts, companions.dialogue_for(pack.path if pack is not None else None, dlg))
+
+    with startup.stage("companions"):
+        if companions_available():
+            known = characters.list_ids()
+            g.companions = [pid for pid in g.companions if pid in known][: int(cfg.COMPANION_MAX)]
+            for pid in g.companions:
+                add_companion(pid, session_clock.time())
+    # snacks / topics / journal (and their modules) are created by deferred stages (see below)
+    snacks = None
+    topics = None
+    journal_log = None
+    history = None
 
-    dlg = Dialogue(cfg.DLG_PATH)
-    snacks = Snacks()
     # Apply always-on-top setting on startup (Windows only)
 
-    snacks.load_if_needed(force=True, icon_scale=cfg.SNACK_ICON_SCALE)
-    topics = Topics(cfg.TOPICS_PATH)
-
-    g = load_or_new()
-    
-    _set_window_topmost(bool(getattr(g, 'always_on_top', False)))
-    # 表情の初期値
-    g.expression = getattr(g, "expression", "normal")
-    g.dock_bottom_right = getattr(g, "dock_bottom_right", True)
-
-    now = time.time()
-    # --- ensure new sleep-system fields exist for older saves ---
-    if not hasattr(g, "sleep_stage"):
-        g.sleep_stage = "awake"
-    if not hasattr(g, "sleep_ready_at"):
-        g.sleep_ready_at = 0.0
-    if not hasattr(g, "sleep_stage_until"):
-        g.sleep_stage_until = 0.0
+    _set_window_topmost(bool(g.always_on_top))
+    # (older saves are upgraded to the current fields by model.migrate at load)
+    now = session_clock.time()
+    # timed behaviours fire from one heap (game/scheduler.py); sim registers its own
+    timers = g.rt.timers
+    if sim_proc is None:
+        install_timers(g, dlg)
+    # meters / sleep catch up on the time she was left alone
+    if g.last_seen > 0 and now - g.last_seen >= float(cfg.CATCHUP_MIN_SEC):
+        fast_forward(g, g.last_seen, now)
     # If lights are already off on startup, schedule sleep readiness if missing.
-    if getattr(g, "lights_off", False) and float(getattr(g, "sleep_ready_at", 0.0)) <= now:
-        g.sleep_ready_at = now + random.uniform(cfg.SLEEP_READY_MIN_SEC, cfg.SLEEP_READY_MAX_SEC)
+    if g.lights_off and g.sleep_ready_at <= now:
+        g.sleep_ready_at = now + rng.uniform(cfg.SLEEP_READY_MIN_SEC, cfg.SLEEP_READY_MAX_SEC)
+
+    # first idle decision shortly after launch
+    timers.at("idle", now + 2.0)
 
     if not g.first_seen:
         g.first_seen = now
-        save(g)
+        saver.request(g)
 
     pick_idle_state(g, dlg, now)
     greet_on_start(g, dlg, now)
+    if sim_proc is not None:
+        # from here on the worker owns the behaviour fields (simproc.SIM_FIELDS)
+        sim_proc.start(g, rng.getrandbits(63))
 
     btn_snack, btn_pet, btn_light, gear, talk, wardrobe, bg_menu, snack_menu = make_buttons()
 
     # ---- background images (auto from assets/background) ----
-    bg_images, bg_image_thumbs = load_background_images(scale=1, thumb_size=(40, 40))
-    theme_thumbs = make_theme_thumbs(thumb_size=(40, 40))
+    # Only thumbnails are kept up front; full images are decoded on demand.
+    bg_cache = BackgroundCache(cover_size=(cfg.W, cfg.H), thumb_size=(40, 40))
+    # ids/paths only: the selected background can be drawn, thumbs come later
+    bg_cache.scan()
+    theme_thumbs: dict[str, pygame.Surface] = {}
 
+    # catalogs shared with the menus; rebuilt in place on background hot reload
     bg_thumbs: dict[str, pygame.Surface] = {}
-    for name, t in theme_thumbs.items():
-        bg_thumbs[f"theme:{name}"] = t
-    for bid, t in bg_image_thumbs.items():
-        bg_thumbs[f"img:{bid}"] = t
+    bg_values: list[str] = []
+
+    def rebuild_bg_catalog():
+        bg_thumbs.clear()
+        for name, t in theme_thumbs.items():
+            bg_thumbs[f"theme:{name}"] = t
+        for bid, t in bg_cache.thumbs.items():
+            bg_thumbs[f"img:{bid}"] = t
+        bg_values[:] = [f"theme:{t.get('name','theme')}" for t in (cfg.BG_THEMES or [])]
+        bg_values.extend(f"img:{bid}" for bid in bg_cache.ids())
 
-    bg_values = [f"theme:{t.get('name','theme')}" for t in (cfg.BG_THEMES or [])]
-    bg_values += [f"img:{bid}" for bid in bg_images.keys()]
+    rebuild_bg_catalog()
+
+    # sprites / clothes offsets / backgrounds: re-decode only files that changed
+    # (created by a deferred stage: the initial mtime snapshot stats every source file)
+    asset_reload = None
 
     # unified custom menu uses these thumbs
-    g._custom_bg_thumbs = bg_thumbs
+    g.rt.custom_bg_thumbs = bg_thumbs
     # let render.py access clothes ids reliably
-    g.clothes_offsets = clothes_offsets
+    g.rt.clothes_offsets = clothes_offsets
+    # wardrobe outfits (from loaded sprites); patched in place by refresh_outfits()
+    outfits: list[str] = []
+    g.rt.outfits = outfits
+    g.rt.custom_char_ids = characters.list_ids()
 
     # 右クリックメニュー（簡易）
     ctx_open = False
@@ -338,12 +455,14 @@ def main():
 
     # ---- 瞬き/口パクの状態（保存しない動的属性として持つ）----
     g.blink_until = 0.0
-    g.next_blink = now + random.uniform(2.5, 5.0)
+    g.next_blink = now + rng.uniform(2.5, 5.0)
+    timers.at("blink", g.next_blink)
     g.mouth_open = False
     g.mouth_until = 0.0
 
     journal_open = False
     journal_scroll = 0
+    history_panel = HistoryPanel()
 
     debug_hud = False
 
@@ -353,28 +472,21 @@ def main():
     dock_disabled_by_drag = False
 
     def play_sfx(key: str):
-        if getattr(g, "sfx_muted", False):
-            return
-        s = sounds.get(key)
-        if s:
-            base = cfg.SFX_BASE_VOLUME.get(key, 0.3)
-            s.set_volume(base * clamp01(getattr(g, "sfx_scale", 1.0)))
-            try:
-                s.stop()
-            except Exception:
-                pass
-            s.play()
+        # cheap compare; volumes are only recomputed when scale/mute changed
+        audio.set_volume(clamp01(g.sfx_scale), g.sfx_muted)
+        audio.play(key)
 
     def current_background():
         """Return (bg_surface or None, label str)."""
-        mode = getattr(g, "bg_mode", "theme")
+        mode = g.bg_mode
         if mode == "image":
-            bid = getattr(g, "bg_image_id", "") or ""
-            if bid and bid in bg_images:
-                return bg_images[bid], bid
+            bid = g.bg_image_id or ""
+            img = bg_cache.get(bid) if bid else None
+            if img is not None:
+                return img, bid
         # theme fallback
         try:
-            t = cfg.BG_THEMES[getattr(g, "bg_index", 0) % len(cfg.BG_THEMES)]
+            t = cfg.BG_THEMES[g.bg_index % len(cfg.BG_THEMES)]
             return None, str(t.get("name", "theme"))
         except Exception:
             return None, "theme"
@@ -386,19 +498,21 @@ def main():
         set_line(g, now_ts, bye, (2.0, 2.0))
         play_sfx("talk")
         g.last_seen = now_ts
-        save(g)
+        saver.request(g)
 
-        end_at = time.time() + 0.6
-        while time.time() < end_at:
+        # wall-clock pause for the farewell (not session time)
+        end_at = time.monotonic() + 0.6
+        while time.monotonic() < end_at:
             for _e in pygame.event.get():
                 pass
             btns = [btn_snack, btn_pet, btn_light, talk.btn_talk, *gear.all_buttons_for_draw()]
             bg_img, bg_lbl = current_background()
             draw_frame(
-                screen, font, font_small, sprites, g, btns, pygame.mouse.get_pos(),
+                screen, font, font_small, sprites, g, btns, inp.mouse_pos(),
                 bg_image=bg_img, bg_label=bg_lbl,
-                gear=gear, talk=talk, wardrobe=wardrobe, bg_menu=bg_menu, snack_menu=snack_menu, journal_open=journal_open, journal_scroll=journal_scroll,
+                gear=gear, talk=talk, wardrobe=wardrobe, bg_menu=bg_menu, snack_menu=snack_menu, journal_open=journal_open, journal_scroll=journal_scroll, history_panel=history_panel,
                 clothes_offsets=clothes_offsets,
+                companions=companions, companion_sprites=companion_sprites,
                 debug_lines=None
             )
             # context menu is ignored during exit animation
@@ -406,8 +520,41 @@ def main():
             pygame.time.delay(10)
         return
 
+    def switch_character(pack_id: str):
+        """Load another character pack and drop the previous one's surfaces.
+
+        sprites / clothes_offsets are patched in place so every closure and
+        g.rt.clothes_offsets keep pointing at the live dicts.
+        """
+        if pack_id == g.character:
+            return
+        new_sprites, new_offsets = characters.load(pack_id, scale=scale, stats=sprite_stats)
+        if not new_sprites:
+            set_line(g, session_clock.time(), "そのキャラは読み込めなかった。", (1.2, 2.5))
+            return
+        sprites.clear()
+        sprites.update(new_sprites)
+        clothes_offsets.clear()
+        clothes_offsets.update(new_offsets)
+        clear_composites(g.character)  # the cached frames pin the old pack's surfaces
+        g.character = pack_id
+        if asset_reload is not None:
+            asset_reload.reset(pack_id)
+        voice.set_preset(voice_preset_for(pack_id))
+        refresh_outfits()
+        saver.request(g)
+
+    def refresh_outfits():
+        """Rebuild the wardrobe list after sprites changed (character switch / hot reload)."""
+        outfits[:] = sorted({k[len("clothes_"):] for k in sprites.keys() if k.startswith("clothes_")}) or ["normal"]
+        wardrobe.items = []
+        if f"clothes_{g.outfit}" not in sprites:
+            g.outfit = "normal"
+
+    refresh_outfits()
+
     def say_with_expression(text: str, dur=(2.0, 4.0), expr="smile"):
-        set_line(g, time.time(), text, dur)
+        set_line(g, session_clock.time(), text, dur)
         g.expression = expr
 
 
@@ -420,17 +567,20 @@ def main():
             g.new_topics = [x for x in g.new_topics if x != topic_id]
 
     def refresh_unlocks():
+        if topics is None:
+            return  # the "topics" stage has not run yet; checked again next frame
+        from game.topics import unlock_ok
         topics.load_if_needed()
         changed = False
         for t in topics.list_all():
             if t.id in g.unlocked_topics:
                 continue
-            if unlock_ok(g, t.unlock, time.time()):
+            if unlock_ok(g, t.unlock, session_clock.time()):
                 g.unlocked_topics.append(t.id)
                 mark_new(t.id)
                 changed = True
         if changed:
-            save(g)
+            saver.request(g)
 
     def start_topic(topic_id: str):
         t = topics.get(topic_id)
@@ -453,9 +603,9 @@ def main():
             if "say" in item:
                 text = str(item.get("say", ""))
                 if text:
-                    set_line(g, time.time(), text, (2.0, 4.0))
+                    set_line(g, session_clock.time(), text, (2.0, 4.0))
                     g.expression = "smile"   # ← 追加：喋り始めたら笑顔
-                    add_log(g, text, t.id, t.title)
+                    journal_add(text, t)
                     play_sfx("talk")
                     return
 
@@ -467,9 +617,9 @@ def main():
                 flag = str(item.get("set_flag", ""))
 
                 if q:
-                    set_line(g, time.time(), q, (3.0, 6.0))
+                    set_line(g, session_clock.time(), q, (3.0, 6.0))
                     g.expression = "smile"   # ← 追加
-                    add_log(g, q, t.id, t.title)
+                    journal_add(q, t)
 
 
                 g.awaiting_choice = True
@@ -483,6 +633,8 @@ def main():
         g.awaiting_choice = False
 
     def answer(choice_yes: bool):
+        # a restored save can be mid-question before the talk menu was ever opened
+        startup.require("topics")
         t = topics.get(g.active_topic)
         if not t:
             g.active_topic = ""
@@ -491,9 +643,9 @@ def main():
 
         text = g.pending_yes if choice_yes else g.pending_no
         if text:
-            set_line(g, time.time(), text, (1.5, 3.0))
+            set_line(g, session_clock.time(), text, (1.5, 3.0))
             g.expression = "smile"   # ← 追加
-            add_log(g, text, t.id, t.title)
+            journal_add(text, t)
             play_sfx("talk")
 
 
@@ -506,7 +658,13 @@ def main():
         g.pending_flag = ""
         advance_topic(t)
 
+    def journal_add(text: str, t):
+        startup.require("journal")
+        journal_log.add(text, t.id, t.title)
+
     def build_category_view():
+        if topics is None:
+            return [("misc", "その他")], []
         cats = [(c.id, c.label) for c in topics.category_order()]
         if not cats:
             cats = [("misc", "その他")]
@@ -589,30 +747,39 @@ def main():
     def handle_custom_menu_click(pos, now):
         """統合カスタムメニュー（上部ボタン bg/clothes + サムネ項目 + スクロール）。"""
         # ---- 上部タブボタン（bg / clothes） ----
-        btns_custom = getattr(g, "_custom_btns", {}) or {}
+        btns_custom = g.rt.custom_btns
         if btns_custom:
             r_bg = btns_custom.get("bg")
             r_cl = btns_custom.get("clothes")
             if r_bg and r_bg.collidepoint(pos):
                 # Toggle open/close on same tab
-                if getattr(g, "ui_mode", "main") == "custom" and getattr(g, "custom_tab", "clothes") == "bg":
-                    g.ui_mode = "main"
+                if g.rt.ui_mode == "custom" and g.rt.custom_tab == "bg":
+                    g.rt.ui_mode = "main"
                 else:
-                    g.ui_mode = "custom"
-                    g.custom_tab = "bg"
+                    g.rt.ui_mode = "custom"
+                    g.rt.custom_tab = "bg"
                 play_sfx("talk")
                 return True
             if r_cl and r_cl.collidepoint(pos):
-                if getattr(g, "ui_mode", "main") == "custom" and getattr(g, "custom_tab", "clothes") == "clothes":
-                    g.ui_mode = "main"
+                if g.rt.ui_mode == "custom" and g.rt.custom_tab == "clothes":
+                    g.rt.ui_mode = "main"
+                else:
+                    g.rt.ui_mode = "custom"
+                    g.rt.custom_tab = "clothes"
+                play_sfx("talk")
+                return True
+            r_ch = btns_custom.get("char")
+            if r_ch and r_ch.collidepoint(pos):
+                if g.rt.ui_mode == "custom" and g.rt.custom_tab == "char":
+                    g.rt.ui_mode = "main"
                 else:
-                    g.ui_mode = "custom"
-                    g.custom_tab = "clothes"
+                    g.rt.ui_mode = "custom"
+                    g.rt.custom_tab = "char"
                 play_sfx("talk")
                 return True
 
         # ---- カスタムメニューが開いている間の項目・スクロール・外側クリック ----
-        if getattr(g, "ui_mode", "main") == "custom":
+        if g.rt.ui_mode == "custom":
             # clicking outside the panel closes it
             panel_y = int(getattr(cfg, "CUSTOM_MENU_PANEL_Y", 90))
             panel_x = int(getattr(cfg, "LEFT_X", 12))
@@ -622,34 +789,41 @@ def main():
             panel_rect = pygame.Rect(panel_x, panel_y, panel_w, panel_h)
 
             # scroll buttons (▲/▼) for paging thumbnails
-            sb = getattr(g, "_custom_scroll_btns", None) or {}
+            sb = g.rt.custom_scroll_btns
             if sb:
-                tab_now = getattr(g, "custom_tab", "clothes")
+                tab_now = g.rt.custom_tab
                 # Up
                 if sb.get("up") and sb["up"].collidepoint(pos):
                     if tab_now == "bg":
-                        g.custom_scroll_bg = max(0, int(getattr(g, "custom_scroll_bg", 0)) - 1)
+                        g.rt.custom_scroll_bg = max(0, g.rt.custom_scroll_bg - 1)
+                    elif tab_now == "char":
+                        g.rt.custom_scroll_char = max(0, g.rt.custom_scroll_char - 1)
                     else:
-                        g.custom_scroll_clothes = max(0, int(getattr(g, "custom_scroll_clothes", 0)) - 1)
+                        g.rt.custom_scroll_clothes = max(0, g.rt.custom_scroll_clothes - 1)
                     play_sfx("talk")
                     return True
                 # Down
                 if sb.get("down") and sb["down"].collidepoint(pos):
                     max_scroll = int(sb.get("max", 0))
                     if tab_now == "bg":
-                        g.custom_scroll_bg = min(max_scroll, int(getattr(g, "custom_scroll_bg", 0)) + 1)
+                        g.rt.custom_scroll_bg = min(max_scroll, g.rt.custom_scroll_bg + 1)
+                    elif tab_now == "char":
+                        g.rt.custom_scroll_char = min(max_scroll, g.rt.custom_scroll_char + 1)
                     else:
-                        g.custom_scroll_clothes = min(max_scroll, int(getattr(g, "custom_scroll_clothes", 0)) + 1)
+                        g.rt.custom_scroll_clothes = min(max_scroll, g.rt.custom_scroll_clothes + 1)
                     play_sfx("talk")
                     return True
 
             clicked_item = False
-            for (kind, value), rect in list(getattr(g, "_custom_item_rects", []) or []):
+            for (kind, value), rect in g.rt.custom_item_rects:
                 if rect.collidepoint(pos):
                     clicked_item = True
                     if kind == "clothes":
                         g.outfit = str(value)
-                        save(g)
+                        saver.request(g)
+                        play_sfx("talk")
+                    elif kind == "char":
+                        switch_character(str(value))
                         play_sfx("talk")
                     elif kind == "bg":
                         v = str(value)
@@ -668,13 +842,13 @@ def main():
                             bid = v.split(":", 1)[1]
                             g.bg_mode = "image"
                             g.bg_image_id = bid
-                        save(g)
+                        saver.request(g)
                         play_sfx("talk")
                     continue
 
             # if click isn't on any item and not on panel, close
             if (not clicked_item) and (not panel_rect.collidepoint(pos)):
-                g.ui_mode = "main"
+                g.rt.ui_mode = "main"
                 return True
 
         return False
@@ -699,49 +873,49 @@ def main():
             return True
 
         if gear.item_frame.hit(pos):
-            g.borderless = not getattr(g, "borderless", False)
+            g.borderless = not g.borderless
             msg = "次回から枠なしにする。" if g.borderless else "次回から枠ありに戻す。"
             set_line(g, now, msg, (1.2, 2.5))
             play_sfx("talk")
-            save(g)
+            saver.request(g)
             return True
 
         if gear.item_dock.hit(pos):
-            g.dock_bottom_right = not getattr(g, "dock_bottom_right", True)
+            g.dock_bottom_right = not g.dock_bottom_right
             if g.dock_bottom_right:
                 _move_window_bottom_right(margin=8)
             msg = "右下に固定する。" if g.dock_bottom_right else "右下固定、解除。"
             set_line(g, now, msg, (1.0, 2.0))
             play_sfx("talk")
-            save(g)
+            saver.request(g)
             return True
 
         if gear.item_top.hit(pos):
-            g.always_on_top = not getattr(g, "always_on_top", False)
+            g.always_on_top = not g.always_on_top
             ok = _set_window_topmost(bool(g.always_on_top))
             msg = "最前面にする。" if g.always_on_top else "最前面、解除。"
             if not ok and sys.platform == "win32":
                 msg = msg + "（反映できないかも）"
             set_line(g, now, msg, (1.0, 2.0))
             play_sfx("talk")
-            save(g)
+            saver.request(g)
             gear.update_labels(g)
             return True
 
         if gear.item_mute.hit(pos):
             g.sfx_muted = not g.sfx_muted
             set_line(g, now, "無音モード。" if g.sfx_muted else "音、戻した。", (1.0, 2.0))
-            save(g)
+            saver.request(g)
             return True
         if gear.item_up.hit(pos):
             g.sfx_scale = min(1.0, g.sfx_scale + 0.10)
             set_line(g, now, "音量あげる。", (0.8, 1.5))
-            save(g)
+            saver.request(g)
             return True
         if gear.item_down.hit(pos):
             g.sfx_scale = max(0.0, g.sfx_scale - 0.10)
             set_line(g, now, "音量さげる。", (0.8, 1.5))
-            save(g)
+            saver.request(g)
             return True
         if gear.item_outfit.hit(pos):
             wardrobe.toggle()
@@ -751,10 +925,37 @@ def main():
             return True
 
         if gear.item_log.hit(pos):
+            startup.require("journal")
             journal_open = True
             journal_scroll = 0
             return True
 
+        if gear.item_graph.hit(pos):
+            startup.require("history")
+            history_panel.open = True
+            return True
+
+        if gear.item_friends.hit(pos):
+            # one more pack each click (round robin over the registry); past the max, everyone leaves
+            if not companions_available():
+                set_line(g, now, "NumPy がないと呼べない。", (1.2, 2.5))
+            elif len(companions) < int(cfg.COMPANION_MAX):
+                ids = characters.list_ids()
+                pid = ids[len(companions) % len(ids)]
+                add_companion(pid, now)
+                set_line(g, now, f"{pid} が来た。", (1.0, 2.0))
+            else:
+                for pid in companion_sprites:
+                    clear_composites(pid)
+                companions.clear()
+                companion_sprites.clear()
+                set_line(g, now, "みんな帰った。", (1.0, 2.0))
+            g.companions = list(companions.ids)
+            timers.at("companions", companions.next_at(now))
+            play_sfx("talk")
+            saver.request(g)
+            return True
+
         return False
 
     def handle_wardrobe_click(pos, now, outfits):
@@ -780,7 +981,7 @@ def main():
                 g.outfit = it.value
                 set_line(g, now, f"{it.value} に着替えた。", (1.0, 2.0))
                 play_sfx("talk")
-                save(g)
+                saver.request(g)
                 wardrobe.close()
                 break
         # 元コードはここで continue しない（後続の判定に落ちる）ため False
@@ -822,7 +1023,7 @@ def main():
                     g.bg_image_id = bid
                     set_line(g, now, f"背景：{bid}", (1.0, 2.0))
                 play_sfx("talk")
-                save(g)
+                saver.request(g)
                 bg_menu.close()
                 break
         # 元コードはここで continue しない
@@ -852,12 +1053,12 @@ def main():
                     action_snack(g, sn)
                     g.last_snack_id = sn.id
                     g.last_snack_at = now
-                    g.snack_count = getattr(g, "snack_count", 0) + 1
+                    g.snack_count += 1
                     tag = getattr(sn, "react_tag", "react_snack") or "react_snack"
                     line = dlg.pick(tag) or dlg.pick("react_snack") or "おやつ！"
                     set_line(g, now, line, (1.4, 3.0))
                     play_sfx("talk")
-                    save(g)
+                    saver.request(g)
                 snack_menu.close()
                 break
         # 元コードはここで（ループ後に）continue する
@@ -866,9 +1067,10 @@ def main():
     def handle_talk_click(pos, now, cats, entries):
         """TALK ボタンと会話パネル（タブ・ページング・YES/NO・話題選択）。"""
         if talk.btn_talk.hit(pos):
+            startup.require("topics")
             talk.toggle()
             if talk.open:
-                talk.relayout(cats, entries)
+                talk.relayout(*build_category_view())
             return True
 
         if not talk.open:
@@ -899,11 +1101,11 @@ def main():
         if g.awaiting_choice:
             if talk.btn_yes.hit(pos):
                 answer(True)
-                save(g)
+                saver.request(g)
                 return True
             if talk.btn_no.hit(pos):
                 answer(False)
-                save(g)
+                saver.request(g)
                 return True
 
         # topics
@@ -913,6 +1115,7 @@ def main():
                     tid = talk.topic_ids[i]
                     locked = talk.topic_locked[i] if i < len(talk.topic_locked) else True
                     if locked:
+                        from game.topics import describe_unlock
                         t = topics.get(tid)
                         hint = describe_unlock(t.unlock) if t else "条件を満たしたら、話せる。"
                         set_line(g, now, hint, (2.0, 4.0))
@@ -922,7 +1125,7 @@ def main():
                         start_topic(tid)
                         play_sfx("talk")
                         talk.close()  # ★ A: 押したら閉じる
-                        save(g)
+                        saver.request(g)
                 # 元コードはここで continue（このイベントの処理終了）
                 return True
         return False
@@ -934,7 +1137,6 @@ def main():
             text = dlg.pick("tap") or "なになに？"
             say_with_expression(text, (2.0, 4.0), "smile")
             play_sfx("talk")
-            dlg.schedule_next_chatter(now)
             return True
         return False
 
@@ -946,6 +1148,7 @@ def main():
         if btn_snack.hit(pos):
             play_sfx("snack")
             snack_menu.toggle()
+            startup.require("snacks")
             snacks.load_if_needed()
             snack_menu.relayout([s.id for s in snacks.items], snacks.icons)
             return True
@@ -969,9 +1172,11 @@ def main():
         # 1) 右クリックメニューが開いていれば最優先
         if handle_context_menu_click(pos, now):
             return
-        # 2) ジャーナル表示中は閉じるだけ
+        # 2) ジャーナル表示中は閉じるだけ（履歴グラフはタブ切替か閉じる）
         if handle_journal_click(pos, now):
             return
+        if history_panel.click(pos):
+            return
         # 3) パネル外クリックで各メニューを閉じる（判定は続行）
         close_menus_on_outside_click(pos)
         # 4) ⚙ ボタン開閉
@@ -1003,26 +1208,286 @@ def main():
             return
 
 
-    last_save = time.time()
+    # ---- deferred startup stages (run a few ms per frame from the main loop) ----
+    def stage_bg_thumbs():
+        bg_cache.load_thumbs()
+        theme_thumbs.update(make_theme_thumbs(thumb_size=(40, 40)))
+        rebuild_bg_catalog()
+
+    def stage_hot_reload():
+        nonlocal asset_reload
+        asset_reload = AssetHotReload(sprites, clothes_offsets, characters, bg_cache, scale=scale, character=g.character)
+
+    def stage_topics():
+        nonlocal topics
+        from game.topics import Topics
+        topics = Topics(cfg.TOPICS_PATH)
+
+    def stage_snacks():
+        nonlocal snacks
+        from game.snacks import Snacks
+        snacks = Snacks()
+        snacks.load_if_needed(force=True, icon_scale=cfg.SNACK_ICON_SCALE)
+
+    def stage_journal():
+        nonlocal journal_log
+        from game.journal import JournalLog
+        journal_log = JournalLog(data_path(cfg.JOURNAL_PATH))
+        # first run after the journal left save.json: move the old list over
+        journal_log.import_legacy((save_data or {}).get("journal"))
+        g.rt.journal = journal_log.entries  # render.py's journal panel
+
+    def stage_history():
+        nonlocal history
+        from game.history import MeterHistory
+        history = MeterHistory(data_path(cfg.HISTORY_PATH))
+        history.load()
+        history_panel.history = history
+        t = session_clock.time()
+        timers.on("history", on_history_sample)
+        timers.on("history_flush", on_history_flush)
+        timers.at("history", t)
+        timers.at("history_flush", t + float(cfg.HISTORY_FLUSH_SEC))
+
+    startup.defer("topics", stage_topics)
+    startup.defer("bg_thumbs", stage_bg_thumbs)
+    startup.defer("snacks", stage_snacks)
+    startup.defer("journal", stage_journal)
+    startup.defer("history", stage_history)
+    startup.defer("voice", voice.warm)
+    startup.defer("hot_reload", stage_hot_reload)
+
+    # ---- timed behaviours: handlers for g.rt.timers (run only when due) ----
+    def on_blink(now_ts):
+        # No blinking while actually sleeping.
+        if g.sleep_stage != "sleep":
+            g.blink_until = now_ts + 0.12
+            timers.at("blink_end", g.blink_until)  # no handler: wakes an idle loop to open the eyes
+        g.next_blink = now_ts + rng.uniform(3.0, 6.0)
+        timers.at("blink", g.next_blink)
+
+    def on_mouth(now_ts):
+        # 口パク（セリフ表示中だけ）: voiced lines follow the voice envelope every frame instead
+        if now_ts >= g.line_until:
+            return
+        if not voice.active():
+            g.mouth_open = not g.mouth_open
+        g.mouth_until = now_ts + 0.18
+        timers.at("mouth", g.mouth_until)
+
+    def on_line_end(now_ts):
+        # セリフが終わったら通常表情に戻す
+        if g.expression == "smile":
+            g.expression = "normal"
+        if not voice.active():
+            g.mouth_open = False
+        # clear line when finished (silent means truly silent)
+        if g.line:
+            g.line = ""
+            g.line_until = now_ts
+            # after a line ends, schedule the next idle decision
+            timers.at("idle", now_ts + rng.uniform(cfg.IDLE_SILENT_AFTER_LINE_MIN_SEC, cfg.IDLE_SILENT_AFTER_LINE_MAX_SEC))
+
+    def on_idle_beat(now_ts):
+        """Idle beat: decide the next action when she is free."""
+        retry = now_ts + float(cfg.IDLE_BEAT_RETRY_SEC)
+        if talk.open or journal_open or g.awaiting_choice:
+            timers.at("idle", retry)
+            return
+        if g.line:
+            return  # the "line" timer schedules the next beat
+        if abs(g.vx_px_per_sec) > 0.1:
+            timers.at("idle", max(g.walk_until, retry))
+            return
+        sleep_stage = g.sleep_stage
+
+        # --- Sleeping behavior ---
+        if sleep_stage == "sleep" or g.state == "sleep":
+            # While sleeping, pick among: wake (prob depends on lights), silent (most of the time),
+            # and occasional sleep talk (mumbling).
+            lights_off = bool(g.lights_off)
+            p_wake = float(cfg.WAKE_CHANCE_DARK_WHILE_SLEEPING if lights_off else cfg.WAKE_CHANCE_BRIGHT_WHILE_SLEEPING)
+            p_talk = float(cfg.SLEEP_TALK_CHANCE_DARK if lights_off else cfg.SLEEP_TALK_CHANCE_BRIGHT)
+
+            r = rng.random()
+            if r < p_wake:
+                if maybe_start_wake_up(g, dlg, now_ts):
+                    play_sfx("talk")
+            elif r < (p_wake + p_talk):
+                maybe_start_sleep_talk(g, dlg, now_ts)
+                # (no sfx by default; sleep talk is subtle)
+
+            # schedule next check (sleeping is calmer, slower)
+            timers.at("idle", now_ts + rng.uniform(float(cfg.SLEEP_SILENT_BEAT_MIN_SEC), float(cfg.SLEEP_SILENT_BEAT_MAX_SEC)))
+            return
+
+        # --- Drowsy transition ---
+        if sleep_stage == "drowsy":
+            # Transitions are handled by the "sleep_stage" timer (sim.step_sleep_system).
+            timers.at("idle", now_ts + rng.uniform(0.8, 1.4))
+            return
+
+        # --- Awake behavior ---
+        # In the dark, she can still talk / blink / wander, but she is likely to fall asleep.
+        if g.lights_off:
+            ready = now_ts >= g.sleep_ready_at
+            p_sleep = float(cfg.SLEEP_CHANCE_DARK_READY if ready else cfg.SLEEP_CHANCE_DARK_PRE_READY)
+            if rng.random() < p_sleep:
+                if maybe_start_pre_sleep(g, dlg, now_ts):
+                    play_sfx("talk")
+                    return  # next decision when the yawn ends
+                timers.at("idle", retry)
+                return
+
+        # Otherwise: choose between walking and talking.
+        if rng.random() < float(cfg.IDLE_DECIDE_WALK_CHANCE):
+            _start_walking(g, now_ts)
+            # sim.step_move starts the walk; the next beat waits for it to end (see above)
+            timers.at("idle", retry)
+        else:
+            txt = dlg.pick(g.state) or "……"
+            _set_line_auto(g, now_ts, txt)
+            play_sfx("talk")
+        # next decision will be scheduled when the line finishes
+
+    def on_companions(now_ts):
+        companions.run(now_ts, g.lights_off, g.sleep_ready_at)
+        timers.at("companions", companions.next_at(now_ts))
+
+    def on_autosave(now_ts):
+        g.last_seen = now_ts  # time away is measured from here if the app dies
+        saver.request(g)
+        timers.at("autosave", now_ts + 5.0)
+
+    def on_history_sample(now_ts):
+        history.update(g, now_ts)
+        timers.at("history", history.next_sample_at)
+
+    def on_history_flush(now_ts):
+        saver.request_file(history.path, history.dumps())
+        timers.at("history_flush", now_ts + float(cfg.HISTORY_FLUSH_SEC))
+
+    timers.on("blink", on_blink)
+    timers.on("mouth", on_mouth)
+    timers.on("line", on_line_end)
+    timers.on("idle", on_idle_beat)
+    timers.on("autosave", on_autosave)
+    timers.on("companions", on_companions)
+    timers.at("companions", companions.next_at(now))
+    timers.at("line", g.line_until)
+
+    def busy_frame() -> bool:
+        """Something on screen moves (or waits for a per-frame update) this frame."""
+        return bool(
+            not startup.finished or debug_hud or dragging_window or ctx_open
+            or g.line or abs(g.vx_px_per_sec) > 0.01 or voice.active() or bgm.playing
+            or companions.busy(session_clock.time())
+            or gear.open or talk.open or wardrobe.open or bg_menu.open or snack_menu.open
+            or journal_open or history_panel.open or g.rt.ui_mode == "custom"
+        )
+
+    # ---- first frame: the idle character, before the deferred stages ----
+    gear.update_labels(g)
+    gear.relayout()
+    bg_image, bg_label = current_background()
+    draw_frame(
+        screen, font, font_small, sprites, g,
+        [btn_snack, btn_pet, btn_light, talk.btn_talk, *gear.all_buttons_for_draw()], pygame.mouse.get_pos(),
+        bg_image=bg_image, bg_label=bg_label,
+        gear=gear, talk=talk, wardrobe=wardrobe, bg_menu=bg_menu, snack_menu=snack_menu, journal_open=journal_open, journal_scroll=journal_scroll, history_panel=history_panel,
+        clothes_offsets=clothes_offsets,
+        companions=companions, companion_sprites=companion_sprites,
+        debug_lines=None
+    )
+    pygame.display.flip()
+    startup.mark("first_frame")
+    if replay is not None or record_path:
+        # unlock checks start with the topics stage, which runs on a wall-clock
+        # budget; load it up front so recording and replay unlock on the same frame
+        startup.require("topics")
+
+    prev_now = session_clock.time()
+    timers.at("autosave", prev_now + 5.0)
+    # fixed-timestep simulation (see cfg.SIM_HZ)
+    sim_dt = 1.0 / float(cfg.SIM_HZ)
+    sim_acc = 0.0
+    sim_steps = 0
+    sim_dropped = 0.0
+    g.rt.x_prev = g.x_offset
     running = True
 
+    # the idle wait must stay below what one frame may simulate (SIM_MAX_STEPS),
+    # or every idle frame would drop backlog; one step is kept for the leftover
+    # accumulator + the frame itself
+    idle_wait_max = min(float(cfg.IDLE_WAIT_MAX_SEC), (cfg.SIM_MAX_STEPS - 1) * sim_dt)
+    # replays: --speed 2 = twice the frame rate, 0 = as fast as possible
+    fps_limit = int(cfg.FPS * replay_speed) if replay is not None else cfg.FPS
+    frame_started = time.perf_counter()
     while running:
-        dt = clock.tick(cfg.FPS) / 1000.0
-        now = time.time()
-
-        dlg.load_if_needed()
-        topics.load_if_needed()
+        # nothing is moving: sleep until input or the next timer instead of drawing at cfg.FPS
+        if replay is None and not busy_frame():
+            wake_at = min(timers.next_at(), session_clock.time() + idle_wait_max)
+            if sim_proc is not None:
+                wake_at = min(wake_at, sim_proc.wake_at())
+            # timers are on the session clock, which stands still during a frame:
+            # "now" on that clock is the frame's time + what this frame has used
+            session_now = session_clock.time() + (time.perf_counter() - frame_started)
+            wait_ms = int((wake_at - session_now) * 1000.0)
+            if wait_ms > 0:
+                e = pygame.event.wait(wait_ms)
+                if e.type != pygame.NOEVENT:
+                    pygame.event.post(e)
+        fps_clock.tick(fps_limit)
+        # session clock + this frame's input (live, recorded or replayed)
+        dt_ms = inp.begin_frame(session_clock)
+        frame_started = time.perf_counter()
+        if dt_ms is None:  # end of the replay
+            break
+        dt = dt_ms / 1000.0
+        now = session_clock.time()
+        if sim_proc is not None and not sim_proc.alive():
+            # the worker died: carry on in-process with the last state it published
+            print("sim process stopped; continuing in-process", file=sys.stderr)
+            sim_proc.close(0.0)
+            sim_proc = None
+            saver = AutoSaver(data_path(cfg.SAVE_PATH))
+            install_timers(g, dlg)
+            saver.request(g)
+        # woke from suspend / long stall: catch up in closed form, not with one huge dt
+        if now - prev_now >= float(cfg.CATCHUP_MIN_SEC):
+            if sim_proc is None:
+                fast_forward(g, prev_now, now)
+            dt = 0.0
+        prev_now = now
+        # worker state -> g (behaviour fields); lines.json is reparsed only when it changed
+        dlg_changed = sim_proc.pull(g, now) if sim_proc is not None else True
+
+        startup.step()
+        if profile_startup and startup.finished:
+            from game.profiler import write_report
+            _import_timer.uninstall()
+            write_report(startup, _import_timer, json_path=_cli_value("--profile-json"))
+            break
+
+        if dlg_changed:
+            dlg.load_if_needed()
+        companions.reload_dialogue()
+        if topics is not None:
+            topics.load_if_needed()
+        if asset_reload is not None:
+            report = asset_reload.poll(now)
+            if report.backgrounds:
+                rebuild_bg_catalog()
+            if report.sprites:
+                clear_composites(g.character)
+            if report.offsets or any(k.startswith("clothes_") for k in report.sprites):
+                refresh_outfits()
 
         refresh_unlocks()
 
         cats, entries = build_category_view()
 
-        # outfits list for wardrobe (from loaded sprites)
-        outfits = sorted({k[len("clothes_"):] for k in sprites.keys() if k.startswith("clothes_")})
-        if not outfits:
-            outfits = ["normal"]
-
-        events = pygame.event.get()
+        events = inp.events()
 
         for e in events:
 
@@ -1030,20 +1495,20 @@ def main():
             if (
                 e.type == pygame.MOUSEBUTTONDOWN
                 and e.button == 1
-                and (pygame.key.get_mods() & pygame.KMOD_CTRL)
+                and (inp.mods() & pygame.KMOD_CTRL)
             ):
 
                 # ---- multiline bubble: click to advance page ----
                 try:
-                    bub = getattr(g, "_bubble_rect", None)
-                    pages = int(getattr(g, "_bubble_pages", 0))
+                    bub = g.rt.bubble_rect
+                    pages = g.rt.bubble_pages
                     if bub and pages > 1 and bub.collidepoint(e.pos):
-                        pi = int(getattr(g, "line_page", 0))
+                        pi = g.rt.line_page
                         if pi < pages - 1:
-                            g.line_page = pi + 1
-                            g.line_until = max(float(getattr(g, "line_until", 0.0)), now + 30.0)
+                            g.rt.line_page = pi + 1
+                            set_line_until(g, max(g.line_until, now + 30.0))
                         else:
-                            g.line_until = min(float(getattr(g, "line_until", now + 0.1)), now + 0.1)
+                            set_line_until(g, min(g.line_until, now + 0.1))
                         continue
                 except Exception:
                     pass
@@ -1080,9 +1545,9 @@ def main():
 
                     # If the user manually drags, treat it as "I want to place it myself":
                     # auto-disable DOCK and persist the choice.
-                    if (not dock_disabled_by_drag) and getattr(g, "dock_bottom_right", False):
+                    if (not dock_disabled_by_drag) and g.dock_bottom_right:
                         g.dock_bottom_right = False
-                        save(g)
+                        saver.request(g)
                         set_line(g, now, "ドック解除。", (0.8, 1.6))
                         dock_disabled_by_drag = True
                 continue
@@ -1118,14 +1583,14 @@ def main():
 
                 # ---- multiline bubble: SPACE/ENTER to advance page ----
                 try:
-                    pages = int(getattr(g, "_bubble_pages", 0))
+                    pages = g.rt.bubble_pages
                     if pages > 1 and e.key in (pygame.K_SPACE, pygame.K_RETURN):
-                        pi = int(getattr(g, "line_page", 0))
+                        pi = g.rt.line_page
                         if pi < pages - 1:
-                            g.line_page = pi + 1
-                            g.line_until = max(float(getattr(g, "line_until", 0.0)), now + 30.0)
+                            g.rt.line_page = pi + 1
+                            set_line_until(g, max(g.line_until, now + 30.0))
                         else:
-                            g.line_until = min(float(getattr(g, "line_until", now + 0.1)), now + 0.1)
+                            set_line_until(g, min(g.line_until, now + 0.1))
                         continue
                 except Exception:
                     pass
@@ -1133,13 +1598,14 @@ def main():
                     # まずは開いているパネルを閉じる。何も開いていなければ終了。
                     if ctx_open:
                         ctx_open = False
-                    elif _should_quit_on_escape(gear, talk, journal_open):
+                    elif _should_quit_on_escape(gear, talk, journal_open or history_panel.open):
                         request_quit(now)
                         running = False
                     else:
                         gear.close()
                         talk.close()
                         journal_open = False
+                        history_panel.close()
 
                 if e.key == pygame.K_F1:
                     debug_hud = not debug_hud
@@ -1150,28 +1616,41 @@ def main():
                     cycle_bg(g, +1)
                     set_line(g, now, "背景チェンジ。", (1.2, 2.0))
                     play_sfx("talk")
-                    save(g)
-
-        # シミュレーション
-        step_sim(g, now, dt)
-        # sleep state machine (yawn / sleep / wake transitions)
-        step_sleep_system(g, dlg, now)
-        if now >= g.state_until:
-            pick_idle_state(g, dlg, now)
+                    saver.request(g)
+
+        # シミュレーション（固定ステップ。描画 FPS が揺れても挙動とコストは一定）
+        sim_acc += dt
+        sim_steps = 0
+        while sim_acc >= sim_dt:
+            if sim_steps >= cfg.SIM_MAX_STEPS:
+                # long stall: drop the backlog instead of spiralling
+                sim_dropped += sim_acc
+                sim_acc = 0.0
+                break
+            sim_acc -= sim_dt
+            t_sim = now - sim_acc
+            if sim_proc is None:
+                g.rt.x_prev = g.x_offset
+                step_sim(g, t_sim, sim_dt)
+            companions.step(t_sim, sim_dt, g.lights_off)
+            sim_steps += 1
+        companions.alpha = sim_acc / sim_dt
+        if sim_proc is None:
+            g.rt.sim_alpha = companions.alpha
 
         # ---- debug: manual X move (F1) ----
         # While the debug HUD is on, allow manual left/right movement for quick wall/flip testing.
         manual_dir = 0
         if debug_hud:
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT]:
+            held_left, held_right, held_button = inp.held()
+            if held_left:
                 manual_dir = -1
-            elif keys[pygame.K_RIGHT]:
+            elif held_right:
                 manual_dir = 1
             else:
                 # click inside the character frame to push her left/right
-                if pygame.mouse.get_pressed(num_buttons=3)[0]:
-                    mx, my = pygame.mouse.get_pos()
+                if held_button:
+                    mx, my = inp.mouse_pos()
                     frame_top = 60
                     frame_bottom = cfg.H - 64
                     frame_h = max(110, frame_bottom - frame_top)
@@ -1181,11 +1660,9 @@ def main():
 
         if manual_dir != 0:
             # Override movement AFTER the sim step so it cannot be immediately overwritten.
-            if not hasattr(g, "x_offset"):
-                g.x_offset = 0.0
             speed = float(getattr(cfg, "WALK_SPEED_PX_PER_SEC", 22.0))
             g.vx_px_per_sec = manual_dir * speed
-            g.x_offset = float(getattr(g, "x_offset", 0.0)) + g.vx_px_per_sec * dt
+            g.x_offset += g.vx_px_per_sec * dt
 
             # Clamp within the right panel bounds.
             margin = int(getattr(cfg, "WALK_MARGIN_PX", 10))
@@ -1194,41 +1671,36 @@ def main():
                 g.x_offset = -max_off
             if g.x_offset > max_off:
                 g.x_offset = max_off
+            # per-frame movement: draw it as is
+            g.rt.x_prev = g.x_offset
         elif debug_hud:
             # If manual input is not active, do not interfere with auto-walk.
             # But if auto-walk is not currently running, ensure vx doesn't stay non-zero.
-            if hasattr(g, "walk_until") and now >= float(getattr(g, "walk_until", now)):
-                if abs(float(getattr(g, "vx_px_per_sec", 0.0))) > 0.01:
+            if now >= g.walk_until:
+                if abs(g.vx_px_per_sec) > 0.01:
                     g.vx_px_per_sec = 0.0
 
-        # ---- blink / mouth (dialogue animation) ----
-
-
-        # ---- 瞬き（放置でも動く）----
-        # No blinking while actually sleeping.
-        if getattr(g, "sleep_stage", "awake") != "sleep":
-            if now >= g.next_blink and g.blink_until <= now:
-                g.blink_until = now + 0.12
-                g.next_blink = now + random.uniform(3.0, 6.0)
-        else:
-            g.blink_until = 0.0
-
-        # ---- 口パク（セリフ表示中だけ）----
-        if now < g.line_until:
-            if now >= g.mouth_until:
-                g.mouth_open = not g.mouth_open
-                g.mouth_until = now + 0.18
-        else:
-            g.mouth_open = False
-
-        # clear line when finished (silent means truly silent)
-        if now >= g.line_until and getattr(g, "line", ""):
-            g.line = ""
-            g.line_until = now
-            # after a line ends, schedule the next idle decision
-            if not hasattr(g, "idle_next_at"):
-                g.idle_next_at = now
-            g.idle_next_at = now + random.uniform(cfg.IDLE_SILENT_AFTER_LINE_MIN_SEC, cfg.IDLE_SILENT_AFTER_LINE_MAX_SEC)
+        # ---- timed behaviours due this frame ----
+        # blink / mouth flap / line end / idle beat / state / sleep stage / autosave / history
+        timers.run(now)
+
+        # ---- voice blips: start when a new line appears ----
+        cur_line = g.line if now < g.line_until else ""
+        if cur_line != voiced_line:
+            voiced_line = cur_line
+            if cur_line:
+                timers.at("mouth", now)
+            if cur_line and cfg.VOICE_ENABLED:
+                audio.set_volume(clamp01(g.sfx_scale), g.sfx_muted)
+                voice.say(cur_line, now)
+            else:
+                voice.stop()
+                g.mouth_open = False
+        voice.update(now)
+        bgm.update(g, now, dt)
+        # voiced lines: the mouth follows the blip envelope
+        if voice.active():
+            g.mouth_open = voice.mouth_open(now)
 
         # ---- UI layout (open menus are updated every frame) ----
         gear.update_labels(g)
@@ -1240,80 +1712,9 @@ def main():
         if bg_menu.open:
             bg_menu.relayout(bg_values, bg_thumbs)
         if snack_menu.open:
-            snacks.load_if_needed()
+            snacks.load_if_needed()  # the menu requires "snacks" when it opens
             snack_menu.relayout([s.id for s in snacks.items], snacks.icons)
-        
-        # セリフが終わったら通常表情に戻す
-        if now >= g.line_until:
-            if g.expression == "smile":
-                g.expression = "normal"
-
-
-        # 自発おしゃべり（邪魔しない）
-                # ---- idle beat scheduler (after each line, decide next action) ----
-        if (not talk.open) and (not journal_open) and (not g.awaiting_choice):
-            walking = abs(float(getattr(g, "vx_px_per_sec", 0.0))) > 0.1
-            if not hasattr(g, "idle_next_at"):
-                g.idle_next_at = now + 2.0
-
-            # If we're not currently showing a line, and it's time to act, decide the next behavior.
-            if (not walking) and (not getattr(g, "line", "")) and now >= float(getattr(g, "idle_next_at", now)):
-                sleep_stage = getattr(g, "sleep_stage", "awake")
-
-                # --- Sleeping behavior ---
-                if sleep_stage == "sleep" or getattr(g, "state", "") == "sleep":
-                    # While sleeping, pick among: wake (prob depends on lights), silent (most of the time),
-                    # and occasional sleep talk (mumbling).
-                    lights_off = bool(getattr(g, "lights_off", False))
-                    p_wake = float(cfg.WAKE_CHANCE_DARK_WHILE_SLEEPING if lights_off else cfg.WAKE_CHANCE_BRIGHT_WHILE_SLEEPING)
-                    p_talk = float(cfg.SLEEP_TALK_CHANCE_DARK if lights_off else cfg.SLEEP_TALK_CHANCE_BRIGHT)
-
-                    r = random.random()
-                    started = False
-                    if r < p_wake:
-                        started = maybe_start_wake_up(g, dlg, now)
-                        if started:
-                            play_sfx("talk")
-                    elif r < (p_wake + p_talk):
-                        started = maybe_start_sleep_talk(g, dlg, now)
-                        # (no sfx by default; sleep talk is subtle)
-
-                    # schedule next check (sleeping is calmer, slower)
-                    g.idle_next_at = now + random.uniform(float(cfg.SLEEP_SILENT_BEAT_MIN_SEC), float(cfg.SLEEP_SILENT_BEAT_MAX_SEC))
-                    continue
-
-# --- Drowsy transition ---
-                if sleep_stage == "drowsy":
-                    # Transitions are handled in step_sleep_system.
-                    g.idle_next_at = now + random.uniform(0.8, 1.4)
-                    continue
-
-                # --- Awake behavior ---
-                # In the dark, she can still talk / blink / wander, but she is likely to fall asleep.
-                if getattr(g, "lights_off", False):
-                    ready = now >= float(getattr(g, "sleep_ready_at", 0.0))
-                    p_sleep = float(cfg.SLEEP_CHANCE_DARK_READY if ready else cfg.SLEEP_CHANCE_DARK_PRE_READY)
-                    if random.random() < p_sleep:
-                        if maybe_start_pre_sleep(g, dlg, now):
-                            play_sfx("talk")
-                        # Next decision will be scheduled when the line ends.
-                        continue
 
-                # Otherwise: choose between walking and talking.
-                if random.random() < float(cfg.IDLE_DECIDE_WALK_CHANCE):
-                    _start_walking(g, now)
-                else:
-                    txt = dlg.pick(g.state) or "……"
-                    _set_line_auto(g, now, txt)
-                    play_sfx("talk")
-                # next decision will be scheduled when the line finishes (or by step_move rest)
-        if now - last_save > 5:
-            save(g)
-            last_save = now
-
-
-        # wardrobe outfits list (auto from loaded sprites)
-        outfits = sorted({k[len("clothes_"):] for k in sprites.keys() if k.startswith("clothes_")})
         # relayout is handled above when wardrobe.open is True
         btns = [btn_snack, btn_pet, btn_light, talk.btn_talk, *gear.all_buttons_for_draw()]
         # wardrobe buttons are drawn inside draw_frame, but keep hover calc independent
@@ -1321,37 +1722,57 @@ def main():
         if debug_hud:
             debug_lines = [
                 f"dt:{dt:.3f}  fps:{(1.0/dt):.1f}" if dt > 0 else "dt:0",
-                f"state:{getattr(g,'state','')} expr:{getattr(g,'expression','')} lights:{'OFF' if getattr(g,'lights_off',False) else 'ON'}",
-                f"outfit:{getattr(g,'outfit','')}  bg:{getattr(g,'bg_index',0)}",
+                f"state:{g.state} expr:{g.expression} lights:{'OFF' if g.lights_off else 'ON'}",
+                f"outfit:{g.outfit}  bg:{g.bg_index}",
                 f"talk_open:{getattr(talk,'open',False)} page:{getattr(talk,'page',0)} cat:{getattr(talk,'active_cat','')}",
                 f"gear_open:{getattr(gear,'open',False)}  wardrobe_open:{getattr(wardrobe,'open',False)} page:{getattr(wardrobe,'page',0)}",
                 f"snack_open:{getattr(snack_menu,'open',False)} page:{getattr(snack_menu,'page',0)} items:{len(getattr(snack_menu,'items',[]))}",
-                f"x_off:{getattr(g,'x_offset',0):.1f} vx:{getattr(g,'vx_px_per_sec',0):.1f}" if hasattr(g,'x_offset') or hasattr(g,'vx_px_per_sec') else None,
+                f"x_off:{g.x_offset:.1f} vx:{g.vx_px_per_sec:.1f}  sim:{cfg.SIM_HZ}Hz steps:{sim_steps} a:{g.rt.sim_alpha:.2f} drop:{sim_dropped:.1f}s",
+                f"sprites:{len(sprites)} uniq:{sprite_stats.get('unique', 0)} saved:{sprite_stats.get('bytes_saved', 0) // 1024}KB",
+                "sfx:{voices}/{channels} play:{plays} drop:{dropped} steal:{steals} lat:{latency_ms:.2f}ms".format(**audio.stats()),
+                "voice:{} blips cached:{cached} synth:{synth}".format(voice.preset, **voice.stats()),
+                f"bgm:{bgm.status()}",
+                startup.summary(),
+                "font:{} cache:{}".format(os.path.basename(jp_font_path or "default"), "hit" if font_stats.get("font_cache_hit") else "miss"),
+                "save req:{requests} write:{writes} skip:{skipped} coal:{coalesced} err:{errors} main:{request_ms:.2f}ms disk:{write_ms:.1f}ms {last_bytes}B".format(**saver.stats()),
+                "text fonts:{fonts} glyphs:{glyphs} surf:{surfaces} hit:{hits} miss:{misses}".format(**font_small.stats()),
+                "timers:{timers} heap:{heap} fired:{fired} stale:{stale}".format(**timers.stats()),
+                "friends:{n} asleep:{asleep} events:{events}  composites:{frames}/{packs}p hit:{hits} miss:{misses}".format(
+                    **companions.stats(), **composite_stats()),
+                "history buckets:{buckets} {bytes}B panel:{rebuilds}".format(rebuilds=history_panel.rebuilds, **history.stats()) if history is not None else None,
+                "simproc alive:{alive} steps:{steps} step:{step_us:.0f}us sent:{sent} ack:{ack} stale:{stale} torn:{torn}".format(
+                    **sim_proc.stats()) if sim_proc is not None else None,
             ]
 
         # decide current background
         bg_image = None
         bg_label = None
-        if getattr(g, "bg_mode", "theme") == "image":
-            bid = getattr(g, "bg_image_id", "") or ""
-            if bid and bid in bg_images:
-                bg_image = bg_images[bid]
+        if g.bg_mode == "image":
+            bid = g.bg_image_id or ""
+            img = bg_cache.get(bid) if bid else None
+            if img is not None:
+                bg_image = img
                 bg_label = bid
         if bg_label is None:
-            bg_label = (cfg.BG_THEMES[getattr(g, "bg_index", 0) % len(cfg.BG_THEMES)].get("name", "bg")
+            bg_label = (cfg.BG_THEMES[g.bg_index % len(cfg.BG_THEMES)].get("name", "bg")
                         if cfg.BG_THEMES else "bg")
 
+        # behaviour fields changed by this frame's clicks / idle beat -> worker
+        if sim_proc is not None:
+            sim_proc.push(g)
+
         draw_frame(
-            screen, font, font_small, sprites, g, btns, pygame.mouse.get_pos(),
+            screen, font, font_small, sprites, g, btns, inp.mouse_pos(),
             bg_image=bg_image, bg_label=bg_label,
-            gear=gear, talk=talk, wardrobe=wardrobe, bg_menu=bg_menu, snack_menu=snack_menu, journal_open=journal_open, journal_scroll=journal_scroll,
+            gear=gear, talk=talk, wardrobe=wardrobe, bg_menu=bg_menu, snack_menu=snack_menu, journal_open=journal_open, journal_scroll=journal_scroll, history_panel=history_panel,
             clothes_offsets=clothes_offsets,
+            companions=companions, companion_sprites=companion_sprites,
             debug_lines=debug_lines
         )
 
         # 右クリックメニュー描画
         if ctx_open:
-            mx, my = pygame.mouse.get_pos()
+            mx, my = inp.mouse_pos()
             # panel
             if ctx_buttons:
                 panel = ctx_buttons[0].rect.unionall([b.rect for b in ctx_buttons])
@@ -1362,6 +1783,15 @@ def main():
                     b.draw(screen, font_small, hover=b.hit((mx, my)))
         pygame.display.flip()
 
+    bgm.stop()
+    if history is not None:
+        saver.request_file(history.path, history.dumps())
+    saver.close()
+    if journal_log is not None:
+        journal_log.close()
+    inp.close(g)
+    if scratch_dir:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
     pygame.quit()
 
 
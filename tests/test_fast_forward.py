@@ -0,0 +1,85 @@
+"""sim.fast_forward: closed-form catch-up after time away."""
+import pytest
+
+from game.model import Girl, clamp
+from game.sim import SLEEP_POSE_AT, fast_forward, meter_rates
+
+T0 = 1_700_000_000.0
+WEEK = 7 * 24 * 3600.0
+
+
+def _girl(**kw):
+    g = Girl()
+    g.hunger, g.mood, g.sleepiness = 80.0, 80.0, 30.0
+    for k, v in kw.items():
+        setattr(g, k, v)
+    return g
+
+
+@pytest.mark.parametrize("seconds", [300.0, 5 * WEEK])
+def test_segments_are_bounded_and_meters_clamped(seconds):
+    g = _girl()
+    out = fast_forward(g, T0, T0 + seconds)
+    assert out["elapsed"] == seconds
+    assert out["segments"] <= 8
+    for v in (g.hunger, g.mood, g.sleepiness):
+        assert 0.0 <= v <= 100.0
+
+
+def test_five_minutes_and_five_weeks_cost_the_same():
+    short = fast_forward(_girl(), T0, T0 + 300.0)
+    long = fast_forward(_girl(), T0, T0 + 5 * WEEK)
+    assert long["segments"] - short["segments"] <= 4
+
+
+def test_long_absence_empties_hunger():
+    g = _girl()
+    fast_forward(g, T0, T0 + 5 * WEEK)
+    assert g.hunger == 0.0
+
+
+def test_asleep_in_the_dark_matches_the_sleep_rates():
+    g = _girl(lights_off=True, sleep_stage="sleep", state="sleep", sleep_ready_at=T0 - 1.0)
+    dt = 600.0
+    rates = meter_rates(True, "sleep", True)
+    expect = [clamp(x + r * dt) for x, r in zip((80.0, 80.0, 30.0), rates)]
+    out = fast_forward(g, T0, T0 + dt)
+    assert out["slept"] == pytest.approx(dt)
+    assert [g.hunger, g.mood, g.sleepiness] == pytest.approx(expect)
+    assert (g.sleep_stage, g.state) == ("sleep", "sleep")
+
+
+def test_falls_asleep_when_sleep_ready():
+    g = _girl(lights_off=True, sleep_ready_at=T0 + 100.0)
+    out = fast_forward(g, T0, T0 + 1000.0)
+    assert out["slept"] == pytest.approx(900.0, abs=1e-3)
+    assert g.sleep_stage == "sleep"
+
+
+def test_lights_on_wakes_her_up():
+    g = _girl(lights_off=False, sleep_stage="sleep", state="sleep")
+    out = fast_forward(g, T0, T0 + 600.0)
+    assert out["slept"] == 0.0
+    assert (g.sleep_stage, g.state) == ("awake", "idle")
+
+
+def test_awake_sleepiness_holds_at_the_sleep_pose():
+    g = _girl(sleepiness=80.0)
+    fast_forward(g, T0, T0 + WEEK)
+    assert g.sleepiness == pytest.approx(SLEEP_POSE_AT)
+
+
+def test_no_time_changes_no_meters():
+    g = _girl()
+    out = fast_forward(g, T0, T0)
+    assert out["segments"] == 0
+    assert (g.hunger, g.mood, g.sleepiness) == (80.0, 80.0, 30.0)
+
+
+def test_timers_are_rearmed_at_the_end():
+    g = _girl()
+    fast_forward(g, T0, T0 + 3600.0)
+    assert g.state_until == T0 + 3600.0
+    assert g.rt.timers.due("state") == T0 + 3600.0
+    assert g.rt.timers.due("sleep_stage") is None
+    assert g.vx_px_per_sec == 0.0
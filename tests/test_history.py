@@ -0,0 +1,72 @@
+"""MeterHistory: fixed-size rings, min/max downsampling, gaps, binary round-trip."""
+from game.history import METERS, MeterHistory
+
+LEVELS = (("min", 60, 10), ("hour", 3600, 4))
+HUNGER = METERS.index("hunger")
+
+
+def _hist(tmp_path):
+    return MeterHistory(str(tmp_path / "history.bin"), levels=LEVELS)
+
+
+def _feed(h, start: float, seconds: int, value):
+    for t in range(0, seconds, 10):
+        v = value(t) if callable(value) else value
+        h.record(start + t, [v, 50.0, 20.0, 0.0])
+
+
+def test_minute_buckets_keep_mean_min_max(tmp_path):
+    h = _hist(tmp_path)
+    _feed(h, 0.0, 120, lambda t: 10.0 if t < 60 else 30.0)
+    h.record(120.0, [0.0, 0.0, 0.0, 0.0])  # closes the second minute
+    lv = h.level("min")
+    assert lv.window(HUNGER, 1)[-2:] == [(10.0, 10.0, 10.0), (30.0, 30.0, 30.0)]
+
+
+def test_spikes_survive_downsampling(tmp_path):
+    h = _hist(tmp_path)
+    # one 90 sample in an otherwise flat hour
+    _feed(h, 0.0, 3600, lambda t: 90.0 if t == 1230 else 10.0)
+    h.record(3600.0, [10.0, 50.0, 20.0, 0.0])  # closes minute 59 and hour 0
+    avg, lo, hi = h.level("hour").window(HUNGER, 0)[-1]
+    assert (lo, hi) == (10.0, 90.0)
+    assert 10.0 < avg < 11.0
+
+
+def test_rings_do_not_grow_and_gaps_are_none(tmp_path):
+    h = _hist(tmp_path)
+    _feed(h, 0.0, 60 * 30, 10.0)  # 30 minutes into a 10-slot ring
+    lv = h.level("min")
+    assert len(lv.stamp) == 10
+    # app closed for 5 minutes, then one more minute
+    _feed(h, 60 * 35, 70, 20.0)
+    win = lv.window(HUNGER, 35)  # minutes 26..35
+    assert win[:4] == [(10.0, 10.0, 10.0)] * 4
+    assert win[4:9] == [None] * 5
+    assert win[9] == (20.0, 20.0, 20.0)
+
+
+def test_binary_round_trip_keeps_open_bucket(tmp_path):
+    h = _hist(tmp_path)
+    _feed(h, 0.0, 150, lambda t: float(t))
+    (tmp_path / "history.bin").write_bytes(h.dumps())
+
+    back = _hist(tmp_path)
+    assert back.load()
+    now = 150.0
+    assert back.columns("min", "hunger", 10, now) == h.columns("min", "hunger", 10, now)
+    assert back.level("min").acc_n == h.level("min").acc_n
+
+
+def test_changed_level_config_is_dropped(tmp_path):
+    h = _hist(tmp_path)
+    _feed(h, 0.0, 150, 10.0)
+    (tmp_path / "history.bin").write_bytes(h.dumps())
+    other = MeterHistory(str(tmp_path / "history.bin"), levels=(("min", 60, 20),))
+    assert other.load()
+    assert all(s == -1 for s in other.level("min").stamp)
+
+
+def test_bad_file_is_ignored(tmp_path):
+    (tmp_path / "history.bin").write_bytes(b"junk")
+    assert not _hist(tmp_path).load()
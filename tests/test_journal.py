@@ -0,0 +1,98 @@
+"""JournalLog: topic interning, segment rotation, legacy import, crash tails."""
+import gzip
+import json
+
+from game import config as cfg
+from game.journal import JournalLog
+
+
+def _lines(path):
+    return [json.loads(x) for x in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_topics_are_written_once_and_reloaded(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    j = JournalLog(str(path))
+    j.add("one", "cafe", "カフェの話", now=1.0)
+    j.add("two", "cafe", "カフェの話", now=2.0)
+    j.close()
+    recs = _lines(path)
+    assert sum(1 for r in recs if "id" in r) == 1
+
+    j = JournalLog(str(path))
+    assert [e["text"] for e in j.entries] == ["one", "two"]
+    assert j.entries[0]["topic_id"] == "cafe"
+    # the reopened log reuses the segment's topic number
+    j.add("three", "cafe", "カフェの話", now=3.0)
+    j.close()
+    assert sum(1 for r in _lines(path) if "id" in r) == 1
+
+
+def test_rotation_keeps_every_segment_readable(tmp_path, monkeypatch):
+    monkeypatch.setattr(cfg, "JOURNAL_SEGMENT_BYTES", 200)
+    monkeypatch.setattr(cfg, "JOURNAL_MAX_SEGMENTS", 0)
+    path = tmp_path / "journal.jsonl"
+    j = JournalLog(str(path), memory=100)
+    for i in range(20):
+        j.add(f"line {i}", "cafe", "カフェ", now=float(i))
+    j.close()
+    segs = sorted(tmp_path.glob("journal.*.jsonl.gz"))
+    assert len(segs) >= 2
+    # each segment carries its own topic table
+    with gzip.open(segs[-1], "rt", encoding="utf-8") as f:
+        assert any("id" in json.loads(x) for x in f)
+
+    j = JournalLog(str(path), memory=100)
+    assert [e["text"] for e in j.entries] == [f"line {i}" for i in range(20)]
+    assert all(e["topic_id"] == "cafe" for e in j.entries)
+
+
+def test_max_segments_drops_the_oldest(tmp_path, monkeypatch):
+    monkeypatch.setattr(cfg, "JOURNAL_SEGMENT_BYTES", 120)
+    monkeypatch.setattr(cfg, "JOURNAL_MAX_SEGMENTS", 2)
+    path = tmp_path / "journal.jsonl"
+    j = JournalLog(str(path))
+    for i in range(30):
+        j.add(f"line {i}", now=float(i))
+    j.close()
+    assert len(list(tmp_path.glob("journal.*.jsonl.gz"))) == 2
+
+
+def test_memory_keeps_only_the_tail(tmp_path):
+    j = JournalLog(str(tmp_path / "journal.jsonl"), memory=3)
+    for i in range(5):
+        j.add(str(i), now=float(i))
+    j.close()
+    assert [e["text"] for e in j.entries] == ["2", "3", "4"]
+
+
+def test_import_legacy_runs_once(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    old = [
+        {"t": 1.0, "text": "hi", "topic_id": "cafe", "topic_title": "カフェ"},
+        "not a dict",
+        {"t": 2.0, "text": "bye"},
+    ]
+    j = JournalLog(str(path))
+    assert j.import_legacy(old) == 2
+    assert j.import_legacy(old) == 0  # the log exists now
+    j.close()
+    j = JournalLog(str(path))
+    assert [(e["t"], e["text"]) for e in j.entries] == [(1.0, "hi"), (2.0, "bye")]
+    assert j.entries[0]["topic_title"] == "カフェ"
+
+
+def test_torn_tail_and_bad_topic_survive_a_reload(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    j = JournalLog(str(path))
+    j.add("one", "cafe", "カフェ", now=1.0)
+    j.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"t": 2, "text": "bad", "topic": "x"}\n{"t": 3, "text": "torn')
+
+    j = JournalLog(str(path))
+    assert [e["text"] for e in j.entries] == ["one"]
+    j.add("two", now=4.0)
+    j.close()
+    j = JournalLog(str(path))
+    assert [e["text"] for e in j.entries] == ["one", "two"]
@@ -0,0 +1,63 @@
+"""write_pak / PakArchive round-trip and the mounted-first virtual filesystem."""
+import pytest
+
+from game import pak
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "assets" / "sprite").mkdir(parents=True)
+    (tmp_path / "assets" / "sprite" / "atlas.png").write_bytes(b"\x89PNG fake")
+    (tmp_path / "assets" / "lines.json").write_text('{"lines": ["こんにちは"]}', encoding="utf-8")
+    yield tmp_path
+    pak.unmount_all()
+
+
+def _build(tree):
+    files = [
+        ("assets/sprite/atlas.png", str(tree / "assets" / "sprite" / "atlas.png")),
+        ("./assets/lines.json", str(tree / "assets" / "lines.json")),
+    ]
+    out = tree / "assets.pak"
+    assert pak.write_pak(str(out), files) == 2
+    return out
+
+
+def test_round_trip(tree):
+    a = pak.PakArchive(str(_build(tree)))
+    try:
+        assert sorted(a.index) == ["assets/lines.json", "assets/sprite/atlas.png"]
+        with a.open("assets/sprite/atlas.png") as f:
+            assert f.read() == b"\x89PNG fake"
+        assert a.verify("assets/lines.json")
+        assert a.dirs["assets"] == {"lines.json", "sprite"}
+    finally:
+        a.close()
+
+
+def test_bad_magic_is_rejected(tree):
+    bad = tree / "bad.pak"
+    bad.write_bytes(b"NOPE" + bytes(64))
+    with pytest.raises(ValueError):
+        pak.PakArchive(str(bad))
+    assert not pak.mount(str(bad))
+
+
+def test_mounted_archive_wins_over_loose_files(tree):
+    _build(tree)
+    (tree / "assets" / "lines.json").write_text('{"lines": []}', encoding="utf-8")
+    assert pak.mount(str(tree / "assets.pak"))
+    with pak.open("assets/lines.json", "r") as f:
+        assert "こんにちは" in f.read()
+    assert pak.isdir("assets/sprite")
+    assert pak.listdir("assets") == ["lines.json", "sprite"]
+
+
+def test_loose_fallback(tree):
+    _build(tree)
+    assert pak.mount(str(tree / "assets.pak"))
+    (tree / "assets" / "extra.txt").write_text("loose", encoding="utf-8")
+    assert pak.isfile("assets/extra.txt")
+    with pak.open("assets/extra.txt", "r") as f:
+        assert f.read() == "loose"
@@ -0,0 +1,96 @@
+"""Save schema migration and the sharded save (manifest + shards) round-trip."""
+import json
+
+from game.model import (
+    HOT_SHARD,
+    SAVE_SHARDS,
+    SCHEMA_VERSION,
+    Girl,
+    girl_from_save,
+    migrate,
+    read_save,
+    save,
+    save_dict,
+    shard_path,
+)
+
+
+def test_migrate_fills_coerces_and_clamps():
+    old = {
+        "hunger": "42.5",          # string from a hand-edited save
+        "sfx_muted": 1,
+        "sleep_stage": "hibernate",
+        "facing": 0,
+        "unlocked_topics": ["cafe", 3],
+        "flags": "broken",
+        "mood": None,
+    }
+    data = migrate(dict(old))
+    assert data["schema_version"] == SCHEMA_VERSION
+    assert data["hunger"] == 42.5
+    assert data["sfx_muted"] is True
+    assert data["sleep_stage"] == "awake"
+    assert data["facing"] == 1
+    assert data["unlocked_topics"] == ["cafe", "3"]
+    assert data["flags"] == {}
+    assert data["mood"] == save_dict(Girl())["mood"]
+    # every persisted field exists afterwards
+    assert set(save_dict(Girl())) <= set(data)
+
+
+def test_migrate_leaves_current_saves_alone():
+    data = dict(save_dict(Girl()), schema_version=SCHEMA_VERSION, hunger=12.0)
+    assert migrate(dict(data)) == data
+
+
+def test_girl_from_save_ignores_unknown_keys_and_bad_input():
+    g = girl_from_save({"hunger": 10.0, "journal": [{"text": "old"}]})
+    assert g.hunger == 10.0
+    assert girl_from_save(None) == Girl()
+    assert girl_from_save({"hunger": object()}).hunger == Girl().hunger
+
+
+def test_sharded_round_trip(tmp_path):
+    path = str(tmp_path / "save.json")
+    g = Girl()
+    g.hunger = 33.0
+    g.bg_index = 2
+    g.unlocked_topics = ["cafe"]
+    save(g, path)
+
+    manifest = json.loads((tmp_path / "save.json").read_text(encoding="utf-8"))
+    assert manifest["schema_version"] == SCHEMA_VERSION
+    settings = json.loads(open(shard_path(path, "settings"), encoding="utf-8").read())
+    hot = json.loads(open(shard_path(path, HOT_SHARD), encoding="utf-8").read())
+    assert set(settings) == set(SAVE_SHARDS["settings"])
+    assert "hunger" in hot and "bg_index" not in hot
+
+    assert girl_from_save(read_save(path)) == g
+
+
+def test_missing_shard_falls_back_to_defaults(tmp_path):
+    path = str(tmp_path / "save.json")
+    g = Girl()
+    g.hunger = 33.0
+    g.bg_index = 2
+    save(g, path)
+    (tmp_path / "save.settings.json").unlink()
+    back = girl_from_save(read_save(path))
+    assert back.hunger == 33.0
+    assert back.bg_index == Girl().bg_index
+
+
+def test_old_single_file_save_is_read_as_is(tmp_path):
+    path = tmp_path / "save.json"
+    path.write_text(json.dumps({"hunger": 5.0, "facing": -1}), encoding="utf-8")
+    data = read_save(str(path))
+    assert data == {"hunger": 5.0, "facing": -1}
+    g = girl_from_save(data)
+    assert (g.hunger, g.facing) == (5.0, -1)
+
+
+def test_unreadable_save_gives_none(tmp_path):
+    path = tmp_path / "save.json"
+    assert read_save(str(path)) is None
+    path.write_text("{not json", encoding="utf-8")
+    assert read_save(str(path)) is None
@@ -0,0 +1,92 @@
+"""Scheduler: due-only firing, moves / cancels skipped lazily, re-arming."""
+import math
+
+from game.scheduler import Scheduler
+
+
+def test_fires_only_due_timers():
+    s = Scheduler()
+    hits = []
+    s.on("a", lambda now: hits.append(("a", now)))
+    s.on("b", lambda now: hits.append(("b", now)))
+    s.at("a", 1.0)
+    s.at("b", 2.0)
+    assert s.run(0.5) == 0
+    assert s.run(1.0) == 1
+    assert hits == [("a", 1.0)]
+    assert s.due("a") is None and s.due("b") == 2.0
+    assert s.run(5.0) == 1
+    assert hits[-1] == ("b", 5.0)
+    assert s.next_at() == math.inf
+
+
+def test_moving_a_key_skips_the_old_entry():
+    s = Scheduler()
+    hits = []
+    s.on("k", hits.append)
+    s.at("k", 1.0)
+    s.at("k", 3.0)
+    assert s.due("k") == 3.0
+    assert s.run(2.0) == 0
+    assert hits == []
+    assert s.stats()["stale"] == 1
+    assert s.run(3.0) == 1
+    assert hits == [3.0]
+
+
+def test_cancel():
+    s = Scheduler()
+    hits = []
+    s.on("k", hits.append)
+    s.at("k", 1.0)
+    s.cancel("k")
+    s.cancel("missing")
+    assert s.due("k") is None
+    assert s.run(10.0) == 0
+    assert hits == []
+
+
+def test_next_at_skips_dead_entries():
+    s = Scheduler()
+    s.at("a", 1.0)
+    s.at("b", 4.0)
+    s.at("a", 6.0)   # moved past b
+    assert s.next_at() == 4.0
+    s.cancel("b")
+    assert s.next_at() == 6.0
+    assert s.stats()["heap"] == 1
+
+
+def test_rearm_for_now_runs_on_the_next_call():
+    s = Scheduler()
+    calls = []
+
+    def tick(now):
+        calls.append(now)
+        s.at("tick", now)  # due again immediately
+
+    s.on("tick", tick)
+    s.at("tick", 1.0)
+    assert s.run(1.0) == 1
+    assert calls == [1.0]
+    assert s.due("tick") == 1.0
+    assert s.run(1.0) == 1
+    assert calls == [1.0, 1.0]
+
+
+def test_key_without_handler_still_fires():
+    s = Scheduler()
+    s.at("blink_end", 1.0)
+    assert s.run(1.0) == 1
+    assert s.stats()["fired"] == 1 and s.stats()["timers"] == 0
+
+
+def test_heap_stays_bounded_under_many_moves():
+    s = Scheduler()
+    for i in range(10_000):
+        s.at(f"k{i % 5}", float(i))
+    st = s.stats()
+    assert st["timers"] == 5
+    assert st["heap"] <= 4 * 5 + 64
+    assert s.next_at() == 9995.0
+    assert s.run(1e9) == 5
@@ -0,0 +1,56 @@
+"""Fixed-step simulation: step_sim rates and wandering bounds."""
+import pytest
+
+from game import config as cfg
+from game.clock import seed
+from game.model import Girl, clamp
+from game.sim import meter_rates, step_sim
+
+T0 = 1_700_000_000.0
+DT = 1.0 / cfg.SIM_HZ
+
+
+@pytest.mark.parametrize("state", ["idle", "music", "grumpy"])
+def test_steps_add_up_to_the_rate(state):
+    g = Girl()
+    g.hunger, g.mood, g.sleepiness = 60.0, 60.0, 20.0
+    g.state = state
+    g.next_walk_at = T0 + 1e9  # no walking
+    n = 60 * cfg.SIM_HZ
+    for i in range(n):
+        step_sim(g, T0 + i * DT, DT)
+    rates = meter_rates(False, state, False)
+    expect = [clamp(x + r * n * DT) for x, r in zip((60.0, 60.0, 20.0), rates)]
+    assert [g.hunger, g.mood, g.sleepiness] == pytest.approx(expect)
+
+
+def test_meters_stay_clamped():
+    g = Girl()
+    g.hunger = 0.01
+    g.next_walk_at = T0 + 1e9
+    for i in range(1000):
+        step_sim(g, T0 + i * DT, DT)
+    assert g.hunger == 0.0
+
+
+def test_wandering_stays_in_the_panel():
+    seed(7)
+    g = Girl()
+    g.next_walk_at = T0
+    bound = max(0, cfg.RIGHT_PANEL_W // 2 - int(cfg.WALK_MARGIN_PX))
+    moved = False
+    for i in range(20 * 60 * cfg.SIM_HZ):  # 20 minutes
+        step_sim(g, T0 + i * DT, DT)
+        assert -bound <= g.x_offset <= bound
+        moved = moved or g.x_offset != 0.0
+    assert moved
+
+
+def test_no_walking_while_asleep():
+    g = Girl()
+    g.sleep_stage = "sleep"
+    g.vx_px_per_sec = 30.0
+    g.walk_until = T0 + 10.0
+    step_sim(g, T0, DT)
+    assert g.vx_px_per_sec == 0.0
+    assert g.next_walk_at > T0
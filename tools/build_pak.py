@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""build_pak.py
+assets/ 以下の素材を 1 ファイルのアーカイブ（assets.pak）にまとめます。
+ゲームは起動時に assets.pak があれば mmap で開き、そこから素材を読みます
+（無ければ従来どおり assets/ のファイルを直接読みます）。
+
+- assets/old（旧素材置き場）と assets/dialogue（ホットリロード用の会話JSON）は含めません
+- --verify を付けると、書き出し後に全メンバーのハッシュを検査します
+
+Usage:
+  python tools/build_pak.py [assets_dir] [out.pak] [--verify]
+"""
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from game.pak import PakArchive, write_pak, norm_name
+
+EXCLUDE_DIRS = {"old", "dialogue"}
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    verify = "--verify" in sys.argv[1:]
+    src = args[0] if len(args) >= 1 else "assets"
+    out = args[1] if len(args) >= 2 else "assets.pak"
+    if not os.path.isdir(src):
+        print("Missing assets dir:", src)
+        return 2
+
+    files = []
+    for root, dirs, fns in os.walk(src):
+        if os.path.normpath(root) == os.path.normpath(src):
+            dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        dirs.sort()
+        for fn in sorted(fns):
+            p = os.path.join(root, fn)
+            # member names match the relative paths the game builds ("assets/...")
+            files.append((norm_name(os.path.join(os.path.basename(os.path.normpath(src)), os.path.relpath(p, src))), p))
+
+    n = write_pak(out, files)
+    print(f"Wrote {n} files -> {out} ({os.path.getsize(out)} bytes)")
+
+    if verify:
+        a = PakArchive(out)
+        bad = [name for name in a.index if not a.verify(name)]
+        a.close()
+        if bad:
+            print("Hash mismatch:", ", ".join(bad))
+            return 1
+        print("Verify OK")
+    return 0
+
+if __name__=="__main__":
+    raise SystemExit(main())
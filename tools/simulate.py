@@ -0,0 +1,472 @@
+#!/usr/bin/env python
+"""simulate.py
+バランス調整用のヘッドレス・モンテカルロシミュレータ（NumPy）。
+
+数千人ぶんの仮想の子を NumPy の配列（1要素 = 1人）としてまとめて動かし、
+game/config.py の定数（HUNGER_DECAY, SLEEP_CHANCE_DARK_READY,
+IDLE_DECIDE_WALK_CHANCE, 寝言の確率など）でどうなるかを集計します。
+
+- メーターの変化率は game/sim.py の meter_rates() と同じ表を使う
+  （state の選び方は pick_idle_state と同じしきい値 / MUSIC_CHANCE）
+- 眠り・起床・寝言・セリフ・散歩は main.py の idle beat と同じ確率を
+  1秒あたりの率に直して判定する（眠る/起きるは2状態の連続時間モデルで、
+  --dt を変えても睡眠時間の割合は変わらない）
+- ユーザー操作はポリシーで指定:
+    none            なにもしない（電気もつけっぱなし）
+    random          在席時間中にランダムにおやつ・なでる、夜に消灯・朝に点灯
+    script:FILE     JSON の時刻表を毎日くり返す（下記）
+- 結果: メーターの分布（時間平均のパーセンタイル）、空腹0/不機嫌の割合、
+  1日あたりの睡眠時間、1時間あたりのセリフ数、トピック解放までの時間
+
+script の JSON:
+  [{"at": "08:00", "action": "lights_on"}, {"at": "12:30", "action": "feed"},
+   {"at": "21:00", "action": "pet", "jitter_min": 30}, {"at": "23:30", "action": "lights_off"}]
+  action: feed | pet | lights_on | lights_off
+
+Usage:
+  python tools/simulate.py [--girls 10000] [--days 7] [--dt 60] [--policy random]
+                           [--seed 1] [--start-hour 8] [--start-weekday 0] [--json out.json]
+                           [--set HUNGER_DECAY=0.015 ...]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency (also used by game/voice.py)
+    np = None
+
+from game import config as cfg
+
+DAY = 86400.0
+METERS = ("hunger", "mood", "sleepiness", "affection")
+
+# user behaviour for --policy random (per-girl jitter is added)
+RANDOM_POLICY = {
+    "present_from": 8.0,      # hour the user sits down
+    "present_to": 23.0,       # hour the user leaves
+    "feeds_per_day": 3.0,
+    "pets_per_day": 6.0,
+    "lights_off_at": 23.5,    # only if present_to covers it; otherwise on leaving
+    "lights_on_at": 7.5,
+    "jitter_hours": 1.0,
+}
+
+
+def _parse_args(argv):
+    opts = {
+        "girls": 10000, "days": 7.0, "dt": 60.0, "policy": "random", "seed": 1,
+        "start_hour": 8.0, "start_weekday": 0, "json": None, "set": [],
+    }
+    i = 0
+    while i < len(argv):
+        a = argv[i]
+        key = a[2:].replace("-", "_") if a.startswith("--") else None
+        if key not in opts:
+            raise SystemExit(f"unknown option: {a}")
+        i += 1
+        if i >= len(argv):
+            raise SystemExit(f"missing value for {a}")
+        v = argv[i]
+        if key == "set":
+            opts["set"].append(v)
+        elif key in ("girls", "seed", "start_weekday"):
+            opts[key] = int(v)
+        elif key in ("days", "dt", "start_hour"):
+            opts[key] = float(v)
+        else:
+            opts[key] = v
+        i += 1
+    return opts
+
+
+def _apply_overrides(pairs):
+    """--set NAME=VALUE: patch game.config before the rates are read."""
+    for p in pairs:
+        name, _, raw = p.partition("=")
+        if not hasattr(cfg, name):
+            raise SystemExit(f"unknown config constant: {name}")
+        try:
+            val = json.loads(raw)
+        except ValueError:
+            val = raw
+        setattr(cfg, name, val)
+
+
+def _hhmm(s: str) -> float:
+    h, _, m = str(s).partition(":")
+    return int(h) + int(m or 0) / 60.0
+
+
+def _mean(a, b) -> float:
+    return (float(a) + float(b)) / 2.0
+
+
+class Rates:
+    """Everything the step needs from config / sim, read once (after --set)."""
+
+    def __init__(self):
+        from game import sim
+        self.sim = sim
+        # (hunger, mood, sleepiness) per second, for lights on / off
+        self.idle = sim.meter_rates(False, "idle", False)
+        self.music = sim.meter_rates(False, "music", False)
+        self.grumpy = sim.meter_rates(False, "grumpy", False)
+        self.sleep_on = sim.meter_rates(True, "sleep", False)
+        self.sleep_off = sim.meter_rates(True, "sleep", True)
+
+        # beats (main.py idle beat scheduler)
+        line = _mean(cfg.IDLE_LINE_MIN_SEC, cfg.IDLE_LINE_MAX_SEC)
+        silent = _mean(cfg.IDLE_SILENT_AFTER_LINE_MIN_SEC, cfg.IDLE_SILENT_AFTER_LINE_MAX_SEC)
+        walk = _mean(cfg.WALK_MIN_SEC, cfg.WALK_MAX_SEC)
+        p_walk = float(cfg.IDLE_DECIDE_WALK_CHANCE)
+        self.awake_beat = p_walk * walk + (1.0 - p_walk) * line + silent
+        self.p_walk = p_walk
+        self.sleep_beat = _mean(cfg.SLEEP_SILENT_BEAT_MIN_SEC, cfg.SLEEP_SILENT_BEAT_MAX_SEC)
+        # pick_idle_state: a new state (and line, unless sleeping) every IDLE_MIN..MAX
+        self.state_period = _mean(cfg.IDLE_MIN_SEC, cfg.IDLE_MAX_SEC)
+
+        self.ready_min = float(cfg.SLEEP_READY_MIN_SEC)
+        self.ready_max = float(cfg.SLEEP_READY_MAX_SEC)
+        self.p_sleep_ready = float(cfg.SLEEP_CHANCE_DARK_READY)
+        self.p_sleep_pre = float(cfg.SLEEP_CHANCE_DARK_PRE_READY)
+        self.p_wake_dark = float(cfg.WAKE_CHANCE_DARK_WHILE_SLEEPING)
+        self.p_wake_bright = float(cfg.WAKE_CHANCE_BRIGHT_WHILE_SLEEPING)
+        self.p_talk_dark = float(cfg.SLEEP_TALK_CHANCE_DARK)
+        self.p_talk_bright = float(cfg.SLEEP_TALK_CHANCE_BRIGHT)
+
+
+class Population:
+    """Struct of arrays: one element per girl."""
+
+    def __init__(self, n: int, rng):
+        f32 = np.float32
+        self.n = n
+        self.hunger = np.full(n, 80.0, f32)
+        self.mood = np.full(n, 70.0, f32)
+        self.sleepiness = np.full(n, 20.0, f32)
+        self.affection = np.zeros(n, f32)
+        self.asleep = np.zeros(n, bool)
+        self.lights_off = np.zeros(n, bool)
+        self.sleep_ready_at = np.zeros(n, np.float64)
+        # accumulators (seconds / counts)
+        self.sum = {m: np.zeros(n, np.float64) for m in METERS}
+        self.t_starving = np.zeros(n, np.float64)
+        self.t_grumpy = np.zeros(n, np.float64)
+        self.t_asleep = np.zeros(n, np.float64)
+        self.lines = np.zeros(n, np.float64)
+        self.sleep_talk = np.zeros(n, np.float64)
+        self.feeds = np.zeros(n, np.int32)
+        self.pets = np.zeros(n, np.int32)
+
+
+# ---- user policies ----
+class NoPolicy:
+    def act(self, pop, t, tod, dt, rng):
+        return None, None, None, None
+
+
+class RandomPolicy:
+    """Present during the day, random feeds / pets, lights follow bedtime."""
+
+    def __init__(self, n, rng, params=None):
+        p = dict(RANDOM_POLICY, **(params or {}))
+        j = p["jitter_hours"]
+
+        def hours(base):
+            return (base + rng.uniform(-j, j, n)).astype(np.float32)
+
+        self.present_from = hours(p["present_from"])
+        self.present_to = hours(p["present_to"])
+        self.off_at = np.minimum(hours(p["lights_off_at"]), self.present_to)
+        self.on_at = hours(p["lights_on_at"])
+        secs = np.maximum(1.0, self.present_to - self.present_from) * 3600.0
+        # per-second chances (times dt on first use)
+        self.rates = np.stack([p["feeds_per_day"] / secs, p["pets_per_day"] / secs]).astype(np.float32)
+        self._dt = None
+
+    def act(self, pop, t, tod, dt, rng):
+        if dt != self._dt:
+            self._p, self._dt = self.rates * np.float32(dt), dt
+        hour = np.float32(tod / 3600.0)
+        present = (hour >= self.present_from) & (hour < self.present_to)
+        u = rng.random((2, pop.n), dtype=np.float32) < self._p
+        feed = present & u[0]
+        pet = present & u[1]
+        # lights: off after bedtime (and when leaving), on in the morning
+        want_off = (hour >= self.off_at) | (hour < self.on_at)
+        return feed, pet, want_off & ~pop.lights_off, ~want_off & pop.lights_off
+
+
+class ScriptPolicy:
+    """A daily timetable from JSON (see the module docstring)."""
+
+    def __init__(self, path, n, rng):
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        self.items = []
+        for it in items:
+            jit = float(it.get("jitter_min", 0)) * 60.0
+            at = _hhmm(it["at"]) * 3600.0 + (rng.uniform(-jit, jit, n) if jit else np.zeros(n))
+            self.items.append((str(it["action"]), np.mod(at, DAY)))
+
+    def act(self, pop, t, tod, dt, rng):
+        out = {a: np.zeros(pop.n, bool) for a in ("feed", "pet", "lights_off", "lights_on")}
+        for action, at in self.items:
+            # fires once per day, in the step that crosses `at`
+            hit = (tod <= at) & (at < tod + dt)
+            if action in out:
+                out[action] |= hit
+        return out["feed"], out["pet"], out["lights_off"] & ~pop.lights_off, out["lights_on"] & pop.lights_off
+
+
+def make_policy(spec: str, n: int, rng):
+    if spec == "none":
+        return NoPolicy()
+    if spec == "random":
+        return RandomPolicy(n, rng)
+    if spec.startswith("script:"):
+        return ScriptPolicy(spec[len("script:"):], n, rng)
+    raise SystemExit(f"unknown policy: {spec}")
+
+
+# ---- topic unlocks (vectorised game/topics.unlock_ok) ----
+def _unlock_mask(unlock, pop, t, tod, weekday):
+    typ = (unlock.get("type") or "always").strip()
+    n = pop.n
+    if typ == "always":
+        return np.ones(n, bool)
+    if typ == "affection_gte":
+        return pop.affection >= int(unlock.get("value", 0))
+    if typ == "days_since_first_gte":
+        return np.full(n, t / DAY >= int(unlock.get("value", 0)))
+    if typ == "weekday_in":
+        return np.full(n, weekday in [int(x) for x in unlock.get("values", [])])
+    if typ == "time_range":
+        try:
+            a = _hhmm(unlock["from"]) * 60
+            b = _hhmm(unlock["to"]) * 60
+        except (KeyError, ValueError):
+            return np.zeros(n, bool)
+        cur = (tod // 60) % 1440
+        ok = (a <= cur <= b) if a <= b else (cur >= a or cur <= b)
+        return np.full(n, ok)
+    if typ in ("all", "any"):
+        masks = [_unlock_mask(c, pop, t, tod, weekday) for c in unlock.get("conds", []) or [] if isinstance(c, dict)]
+        if not masks:
+            return np.full(n, typ == "all")
+        return np.logical_and.reduce(masks) if typ == "all" else np.logical_or.reduce(masks)
+    # flag_true etc.: flags come from conversations, not simulated
+    return np.zeros(n, bool)
+
+
+def _load_topics():
+    try:
+        with open(cfg.TOPICS_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return []
+    items = data.get("topics", []) if isinstance(data, dict) else data
+    return [(str(t.get("id", "")), t.get("unlock") or {"type": "always"}) for t in items if isinstance(t, dict)]
+
+
+# ---- simulation ----
+def _beats(dt, period):
+    return dt / period
+
+
+def _hazard(p, beat):
+    """A chance `p` tried once per `beat` seconds, as a rate per second."""
+    return -np.log1p(-min(p, 0.999999)) / beat
+
+
+def _two_state(fall, wake, dt):
+    """Exact awake <-> asleep transition chances over dt (continuous-time, two states).
+
+    Per-beat chances raised to dt / beat would make the share of time asleep
+    depend on --dt once a step holds several beats; this does not.
+    """
+    p_fall, p_wake = [], []
+    for f, w in zip(fall, wake):
+        total = f + w
+        settle = 1.0 - np.exp(-total * dt) if total > 0 else 0.0
+        p_fall.append(f / total * settle if total > 0 else 0.0)
+        p_wake.append(w / total * settle if total > 0 else 0.0)
+    return np.array(p_fall, np.float32), np.array(p_wake, np.float32)
+
+
+def simulate(n=10000, days=7.0, dt=60.0, policy="random", seed=1, start_hour=8.0, start_weekday=0):
+    if np is None:
+        raise SystemExit("NumPy is required: pip install numpy")
+    rng = np.random.default_rng(seed)
+    R = Rates()
+    pop = Population(n, rng)
+    pol = make_policy(policy, n, rng)
+    topics = _load_topics()
+    unlocked_at = {tid: np.full(n, np.nan) for tid, _ in topics}
+    pose_at = float(R.sim.SLEEP_POSE_AT)
+    grumpy_at = float(R.sim.GRUMPY_AT)
+    music = float(R.sim.MUSIC_CHANCE)
+
+    steps = int(round(days * DAY / dt))
+    t0_tod = start_hour * 3600.0
+    unlock_every = max(1, int(60.0 / dt))  # topic checks once per simulated minute
+
+    # rate table indexed by behaviour code: idle, music, grumpy, sleep (lights on), sleep (off)
+    table = np.array([R.idle, R.music, R.grumpy, R.sleep_on, R.sleep_off], np.float32) * np.float32(dt)
+    awake_beats = _beats(dt, R.awake_beat)
+    sleep_beats = _beats(dt, R.sleep_beat)
+    state_picks = _beats(dt, R.state_period)
+    # sleep stage transitions: index 0 = lights on, 1 = dark (not ready), 2 = dark (ready)
+    fall_rate = (0.0, _hazard(R.p_sleep_pre, R.awake_beat), _hazard(R.p_sleep_ready, R.awake_beat))
+    wake_rate = (_hazard(R.p_wake_bright, R.sleep_beat),) + (_hazard(R.p_wake_dark, R.sleep_beat),) * 2
+    p_fall, p_wake = _two_state(fall_rate, wake_rate, dt)
+    lines_per_step = np.float32(state_picks + awake_beats * (1.0 - R.p_walk))
+    talk_dark = np.float32(sleep_beats * R.p_talk_dark)
+    talk_bright = np.float32(sleep_beats * R.p_talk_bright)
+    meters = np.empty((3, n), np.float32)  # hunger, mood, sleepiness (rows are views below)
+    meters[0], meters[1], meters[2] = pop.hunger, pop.mood, pop.sleepiness
+    pop.hunger, pop.mood, pop.sleepiness = meters[0], meters[1], meters[2]
+    code = np.empty(n, np.intp)
+    rate = np.empty(n, np.float32)
+
+    for k in range(steps):
+        t = k * dt
+        tod = (t0_tod + t) % DAY
+        weekday = int((start_weekday + (t0_tod + t) // DAY) % 7)
+        u = rng.random((2, n), dtype=np.float32)
+
+        # ---- user ----
+        feed, pet, off, on = pol.act(pop, t, tod, dt, rng)
+        if feed is not None:
+            if feed.any():
+                pop.hunger[feed] += cfg.SNACK_HUNGER_RECOVER
+                pop.mood[feed] += 3
+                pop.affection[feed] += 1
+                pop.feeds += feed
+            if pet.any():
+                pop.mood[pet] += cfg.PET_MOOD_RECOVER
+                pop.affection[pet] += 2
+                pop.pets += pet
+            # action_toggle_lights
+            if off.any():
+                pop.lights_off[off] = True
+                pop.sleep_ready_at[off] = t + rng.uniform(R.ready_min, R.ready_max, int(off.sum()))
+            if on.any():
+                pop.lights_off[on] = False
+
+        # ---- sleep stage (idle beats folded into this step) ----
+        dark = pop.lights_off
+        np.multiply(dark, 1 + (t >= pop.sleep_ready_at), out=code)
+        u0 = u[0]
+        pop.asleep = np.where(pop.asleep, u0 >= np.take(p_wake, code), u0 < np.take(p_fall, code))
+
+        # ---- behaviour state (pick_idle_state) ----
+        grumpy = (pop.hunger <= grumpy_at) | (pop.mood <= grumpy_at)
+        pose = pop.asleep | (pop.sleepiness >= pose_at)
+        awake_state = ~pose
+        calm = awake_state & ~grumpy
+        np.multiply(calm & (u[1] < music), 1, out=code)
+        code += (awake_state & grumpy) * 2
+        code += pose * 3
+        code += pose & dark
+        for i in range(3):
+            np.take(table[:, i], code, out=rate)
+            meters[i] += rate
+        np.clip(meters, 0, 100, out=meters)
+
+        # ---- lines ----
+        # state picks say a line; idle beats that do not walk say another
+        pop.lines += awake_state * lines_per_step
+        pop.sleep_talk += pop.asleep * (talk_bright + dark * (talk_dark - talk_bright))
+
+        # ---- stats ----
+        for m in METERS:
+            pop.sum[m] += getattr(pop, m)
+        pop.t_starving += pop.hunger <= 0
+        pop.t_grumpy += grumpy & awake_state
+        pop.t_asleep += pop.asleep
+
+        if topics and k % unlock_every == 0:
+            for tid, unlock in topics:
+                first = unlocked_at[tid]
+                todo = np.isnan(first)
+                if todo.any():
+                    hit = todo & _unlock_mask(unlock, pop, t, tod, weekday)
+                    first[hit] = t
+
+    # time sums were kept in steps
+    for m in METERS:
+        pop.sum[m] *= dt
+    for a in (pop.t_starving, pop.t_grumpy, pop.t_asleep):
+        a *= dt
+    return pop, unlocked_at, steps * dt
+
+
+def _pct(a, ps=(5, 50, 95)):
+    return {f"p{p}": round(float(np.percentile(a, p)), 2) for p in ps}
+
+
+def report(pop, unlocked_at, total):
+    hours = total / 3600.0
+    out = {
+        "girls": pop.n,
+        "days": round(total / DAY, 2),
+        "meters_time_avg": {m: _pct(pop.sum[m] / total) for m in METERS},
+        "meters_end": {m: _pct(getattr(pop, m)) for m in METERS},
+        "starving_frac": _pct(pop.t_starving / total),
+        "grumpy_frac": _pct(pop.t_grumpy / total),
+        "asleep_hours_per_day": _pct(pop.t_asleep / total * 24.0),
+        "lines_per_hour": _pct(pop.lines / hours),
+        "sleep_talk_per_hour": _pct(pop.sleep_talk / hours),
+        "feeds_per_day": round(float(pop.feeds.mean() / (total / DAY)), 2),
+        "pets_per_day": round(float(pop.pets.mean() / (total / DAY)), 2),
+        "unlocks": {},
+    }
+    for tid, first in unlocked_at.items():
+        got = ~np.isnan(first)
+        entry = {"unlocked": round(float(got.mean()), 3)}
+        if got.any():
+            entry.update({k: round(v / 3600.0, 2) for k, v in _pct(first[got], (50, 90)).items()})
+            entry["unit"] = "hours"
+        out["unlocks"][tid] = entry
+    return out
+
+
+def _print(rep, secs):
+    print(f"{rep['girls']} girls x {rep['days']} days  ({secs:.1f}s)")
+    print("meters (time avg)   p5 / p50 / p95")
+    for m, v in rep["meters_time_avg"].items():
+        print(f"  {m:<11} {v['p5']:7.1f} {v['p50']:7.1f} {v['p95']:7.1f}")
+    for key in ("starving_frac", "grumpy_frac", "asleep_hours_per_day", "lines_per_hour", "sleep_talk_per_hour"):
+        v = rep[key]
+        print(f"{key:<21}{v['p5']:7.2f} {v['p50']:7.2f} {v['p95']:7.2f}")
+    print(f"user: feeds/day {rep['feeds_per_day']}  pets/day {rep['pets_per_day']}")
+    if rep["unlocks"]:
+        print("topic unlocks        share   p50h   p90h")
+        for tid, u in rep["unlocks"].items():
+            print(f"  {tid:<18} {u['unlocked']:6.1%} {u.get('p50', float('nan')):6.1f} {u.get('p90', float('nan')):6.1f}")
+
+
+def main():
+    opts = _parse_args(sys.argv[1:])
+    _apply_overrides(opts["set"])
+    t0 = time.perf_counter()
+    pop, unlocked_at, total = simulate(
+        n=opts["girls"], days=opts["days"], dt=opts["dt"], policy=opts["policy"],
+        seed=opts["seed"], start_hour=opts["start_hour"], start_weekday=opts["start_weekday"],
+    )
+    rep = report(pop, unlocked_at, total)
+    _print(rep, time.perf_counter() - t0)
+    if opts["json"]:
+        with open(opts["json"], "w", encoding="utf-8") as f:
+            json.dump(rep, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())